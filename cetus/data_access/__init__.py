@@ -1,16 +1,48 @@
+from .caching import (RequestsCoalescer,
+                      ResultsCache,
+                      requests_coalescer,
+                      results_cache,
+                      invalidate_tables)
+from .concurrency import (run_concurrently,
+                          fetch_partitioned)
 from .connectors import (get_connection_pool,
                          get_connection,
+                         acquire_connection,
+                         get_postgres_snapshot_connection_pool,
                          begin_transaction)
 from .deletion import delete
+from .execution import (PreparedStatementsRegistry,
+                        statements_registry,
+                        execute_prepared,
+                        fetch_row_prepared,
+                        fetch_rows_prepared)
+from .notifications import (InvalidationsListener,
+                            listen_invalidations,
+                            install_invalidation_triggers,
+                            uninstall_invalidation_triggers)
 from .reading import (fetch,
+                      fetch_pages,
+                      fetch_stream,
                       fetch_max_connections,
                       fetch_records_count,
                       fetch_max_column_value,
                       fetch_min_column_value,
                       group_wise_fetch,
+                      group_wise_fetch_stream,
                       group_wise_fetch_records_count,
                       group_wise_fetch_max_column_value)
+from .hedging import (LatencyTracker,
+                      ReadsHedger)
+from .monitoring import (QueriesMonitor,
+                         SlowQueriesLog,
+                         queries_monitor,
+                         slow_queries_log,
+                         generate_query_fingerprint,
+                         log_queries_statistics)
+from .routing import (RoutingConnectionPool,
+                      get_routing_connection_pool)
 from .saving import (insert,
                      insert_returning)
-from .updating import update
+from .updating import (update,
+                       update_many)
 from .utils import is_db_uri_mysql
@@ -0,0 +1,314 @@
+from asyncio import (CancelledError,
+                     Task,
+                     ensure_future,
+                     shield)
+from collections import (Counter,
+                         OrderedDict,
+                         defaultdict,
+                         namedtuple)
+from contextlib import contextmanager
+from functools import (partial,
+                       wraps)
+from time import monotonic
+from typing import (Any,
+                    Optional,
+                    Callable,
+                    Coroutine,
+                    Hashable,
+                    Dict,
+                    Set)
+from weakref import WeakSet
+
+from cetus.queries import to_hashable
+from cetus.types import ConnectionType
+
+from .utils import estimate_record_size
+
+# in seconds
+DEFAULT_RESULTS_TTL = 60
+DEFAULT_RESULTS_CACHE_SIZE = 1024
+
+ResultsCacheStatistics = namedtuple('ResultsCacheStatistics',
+                                    ['hits', 'misses', 'hit_ratio',
+                                     'evictions', 'expirations',
+                                     'invalidations',
+                                     'size', 'max_size',
+                                     'bytes', 'max_bytes'])
+CoalescingStatistics = namedtuple('CoalescingStatistics',
+                                  ['requests_count', 'coalesced_count',
+                                   'in_flight_count'])
+CacheEntry = namedtuple('CacheEntry',
+                        ['value', 'table_name',
+                         'size', 'expiration_time'])
+
+# distinguishes missing entries from cached `None` results
+MISSING = object()
+
+# every cache and coalescer is invalidated on writes
+results_caches = WeakSet()
+requests_coalescers = WeakSet()
+# tables written within transactions by connections,
+# they are invalidated once more when transaction ends
+# since concurrent reads may cache previous data before commit
+transactions_written_tables: Dict[ConnectionType, Set[str]] = {}
+
+
+class ResultsCache:
+    # results of reading functions keyed by query and its arguments,
+    # entries expire after "ttl" seconds and least recently used ones
+    # are evicted when "max_size" entries or "max_bytes" estimated bytes
+    # are exceeded, table entries are invalidated by writes
+    # with data access functions within the process,
+    # so one cache should be used only for one database
+    def __init__(self, *, ttl: float = DEFAULT_RESULTS_TTL,
+                 max_size: int = DEFAULT_RESULTS_CACHE_SIZE,
+                 max_bytes: Optional[int] = None) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._tables_keys = defaultdict(set)
+        # results fetched before table invalidation are not stored
+        self._tables_generations = Counter()
+        results_caches.add(self)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        try:
+            entry = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        if entry.expiration_time <= monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def put(self, key: Hashable, value: Any, *,
+            table_name: str) -> None:
+        if key in self._entries:
+            self._remove(key)
+        size = estimate_result_size(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        self._entries[key] = CacheEntry(
+            value=value,
+            table_name=table_name,
+            size=size,
+            expiration_time=monotonic() + self.ttl)
+        self._tables_keys[table_name].add(key)
+        self.bytes += size
+        while (len(self._entries) > self.max_size
+               or (self.max_bytes is not None
+                   and self.bytes > self.max_bytes)):
+            least_recently_used_key = next(iter(self._entries))
+            self._remove(least_recently_used_key)
+            self.evictions += 1
+
+    async def get_or_fetch(self, key: Hashable,
+                           fetch: Callable[[], Coroutine], *,
+                           table_name: str) -> Any:
+        value = self.get(key, MISSING)
+        if value is MISSING:
+            generation = self._tables_generations[table_name]
+            value = await fetch()
+            if self._tables_generations[table_name] == generation:
+                self.put(key, value,
+                         table_name=table_name)
+        return copy_result(value)
+
+    def invalidate(self, table_name: str) -> None:
+        self._tables_generations[table_name] += 1
+        for key in self._tables_keys.pop(table_name, set()):
+            self._remove(key)
+            self.invalidations += 1
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self.bytes -= entry.size
+        table_keys = self._tables_keys.get(entry.table_name)
+        if table_keys is not None:
+            table_keys.discard(key)
+            if not table_keys:
+                del self._tables_keys[entry.table_name]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._tables_keys.clear()
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+        self.expirations = self.invalidations = 0
+
+    @property
+    def statistics(self) -> ResultsCacheStatistics:
+        requests_count = self.hits + self.misses
+        hit_ratio = (self.hits / requests_count
+                     if requests_count
+                     else 0.)
+        return ResultsCacheStatistics(hits=self.hits,
+                                      misses=self.misses,
+                                      hit_ratio=hit_ratio,
+                                      evictions=self.evictions,
+                                      expirations=self.expirations,
+                                      invalidations=self.invalidations,
+                                      size=len(self._entries),
+                                      max_size=self.max_size,
+                                      bytes=self.bytes,
+                                      max_bytes=self.max_bytes)
+
+
+results_cache = ResultsCache()
+
+
+class RequestsCoalescer:
+    # concurrent requests with the same key share single in-flight query
+    # and get its result or exception,
+    # query runs on connection of the first caller,
+    # so it is cancelled only with the first caller
+    # and the rest of callers retry with their own connections then;
+    # queries started before table invalidation are not shared
+    # with later callers, as well as results cache
+    # one coalescer should be used only for one database
+    def __init__(self) -> None:
+        self.requests_count = 0
+        self.coalesced_count = 0
+        self._tasks = {}
+        self._tables_keys = defaultdict(set)
+        requests_coalescers.add(self)
+
+    async def run(self, key: Hashable,
+                  fetch: Callable[[], Coroutine], *,
+                  table_name: str) -> Any:
+        self.requests_count += 1
+        while True:
+            task = self._tasks.get(key)
+            if task is None:
+                task = ensure_future(fetch())
+                self._register(key, task,
+                               table_name=table_name)
+                return await task
+            try:
+                res = await shield(task)
+            except CancelledError:
+                if not task.cancelled():
+                    raise
+                continue
+            except Exception:
+                # exception of shared query
+                self.coalesced_count += 1
+                raise
+            self.coalesced_count += 1
+            return copy_result(res)
+
+    def invalidate(self, table_name: str) -> None:
+        for key in self._tables_keys.pop(table_name, set()):
+            del self._tasks[key]
+
+    def _register(self, key: Hashable, task: Task, *,
+                  table_name: str) -> None:
+        self._tasks[key] = task
+        self._tables_keys[table_name].add(key)
+        task.add_done_callback(partial(self._forget, key,
+                                       table_name=table_name))
+
+    def _forget(self, key: Hashable, task: Task, *,
+                table_name: str) -> None:
+        # task may be already replaced after invalidation
+        if self._tasks.get(key) is not task:
+            return
+        del self._tasks[key]
+        table_keys = self._tables_keys[table_name]
+        table_keys.discard(key)
+        if not table_keys:
+            del self._tables_keys[table_name]
+
+    @property
+    def statistics(self) -> CoalescingStatistics:
+        return CoalescingStatistics(requests_count=self.requests_count,
+                                    coalesced_count=self.coalesced_count,
+                                    in_flight_count=len(self._tasks))
+
+
+requests_coalescer = RequestsCoalescer()
+
+
+def generate_result_key(query: str,
+                        *args: Any,
+                        **options: Any) -> Hashable:
+    # options are parameters which affect result
+    # besides query and its arguments (e.g. "native")
+    return query, to_hashable(args), to_hashable(options)
+
+
+def copy_result(value: Any) -> Any:
+    # shared lists should not be modified by callers
+    return list(value) if isinstance(value, list) else value
+
+
+def estimate_result_size(value: Any) -> int:
+    if isinstance(value, list):
+        return sum(map(estimate_record_size, value))
+    if isinstance(value, tuple):
+        return estimate_record_size(value)
+    return estimate_record_size((value,))
+
+
+def invalidate_tables(*table_names: str,
+                      connection: Optional[ConnectionType] = None
+                      ) -> None:
+    for cache in [*results_caches, *requests_coalescers]:
+        for table_name in table_names:
+            cache.invalidate(table_name)
+    if connection in transactions_written_tables:
+        transactions_written_tables[connection].update(table_names)
+
+
+def is_in_transaction(connection: ConnectionType, *,
+                      is_mysql: bool) -> bool:
+    # transactions started not by data access functions
+    # are checked with driver
+    if connection in transactions_written_tables:
+        return True
+    if is_mysql:
+        return connection.in_transaction
+    return connection.is_in_transaction()
+
+
+@contextmanager
+def track_transaction_writes(connection: ConnectionType):
+    # only the outermost transaction is tracked
+    is_outermost = connection not in transactions_written_tables
+    if is_outermost:
+        transactions_written_tables[connection] = set()
+    try:
+        yield
+    finally:
+        if is_outermost:
+            invalidate_tables(
+                *transactions_written_tables.pop(connection))
+
+
+def invalidates_results(function: Callable[..., Coroutine]
+                        ) -> Callable[..., Coroutine]:
+    # for writing functions with "table_name"
+    # and "connection" keyword arguments,
+    # results are invalidated even if writing fails
+    # since some of rows may be already written
+    @wraps(function)
+    async def decorated(**kwargs: Any):
+        try:
+            return await function(**kwargs)
+        finally:
+            invalidate_tables(kwargs['table_name'],
+                              connection=kwargs['connection'])
+
+    return decorated
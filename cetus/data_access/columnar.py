@@ -0,0 +1,126 @@
+from typing import (Any,
+                    Optional,
+                    Sequence,
+                    List,
+                    Dict)
+
+import numpy as np
+from cetus.types import (ConnectionType,
+                         ColumnValueType,
+                         FiltersType,
+                         OrderingType)
+
+from .execution import DEFAULT_STREAM_PREFETCH
+from .reading import fetch_stream
+from .utils import generate_table_columns_aliases
+
+ArrayType = np.ndarray
+DataType = Any
+
+# columns with values of these kinds are stored as objects,
+# since fixed-width types inferred from the first chunk
+# may truncate values from the next ones
+OBJECT_DATA_TYPES_KINDS = {'U', 'S', 'O'}
+
+
+class ColumnBuilder:
+    def __init__(self, data_type: Optional[DataType] = None) -> None:
+        self.data_type = (np.dtype(data_type)
+                          if data_type is not None
+                          else None)
+        self.data_chunks = []
+        self.mask_chunks = []
+        self.is_nullable = False
+
+    def extend(self, values: Sequence[ColumnValueType]) -> None:
+        mask = np.fromiter((value is None for value in values),
+                           dtype=bool,
+                           count=len(values))
+        has_nulls = mask.any()
+        if self.data_type is None:
+            self.data_type = infer_data_type(
+                [value for value in values if value is not None]
+                if has_nulls
+                else values)
+        if has_nulls:
+            fill_value = generate_fill_value(self.data_type)
+            values = [fill_value if value is None else value
+                      for value in values]
+            self.is_nullable = True
+        self.data_chunks.append(np.array(values,
+                                         dtype=self.data_type))
+        self.mask_chunks.append(mask)
+
+    def build(self) -> ArrayType:
+        if not self.data_chunks:
+            data_type = (np.dtype(object)
+                         if self.data_type is None
+                         else self.data_type)
+            return np.empty(0, dtype=data_type)
+        data = np.concatenate(self.data_chunks)
+        if not self.is_nullable:
+            return data
+        mask = np.concatenate(self.mask_chunks)
+        return np.ma.masked_array(data, mask=mask)
+
+
+def infer_data_type(values: Sequence[ColumnValueType]) -> DataType:
+    if not values:
+        return np.dtype(object)
+    data_type = np.asarray(values).dtype
+    if data_type.kind in OBJECT_DATA_TYPES_KINDS:
+        return np.dtype(object)
+    return data_type
+
+
+def generate_fill_value(data_type: DataType) -> Any:
+    if data_type.kind == 'O':
+        return None
+    return np.zeros((), dtype=data_type)[()]
+
+
+async def fetch_columns(
+        *, table_name: str,
+        columns_names: List[str],
+        columns_aliases: Optional[Dict[str, str]] = None,
+        filters: Optional[FiltersType] = None,
+        orderings: Optional[List[OrderingType]] = None,
+        groupings: List[str] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        data_types: Optional[Dict[str, DataType]] = None,
+        prefetch: int = DEFAULT_STREAM_PREFETCH,
+        is_mysql: bool,
+        connection: ConnectionType) -> Dict[str, ArrayType]:
+    # returns arrays by columns aliases,
+    # data types which are not specified in "data_types"
+    # are inferred from the first chunk of records,
+    # columns with nulls are returned as masked arrays
+    data_types = data_types or {}
+    aliases = generate_table_columns_aliases(
+        columns_names=columns_names,
+        columns_aliases=columns_aliases)
+    columns_builders = [ColumnBuilder(data_types.get(alias))
+                        for alias in aliases]
+    records_chunks = fetch_stream(
+        table_name=table_name,
+        columns_names=columns_names,
+        columns_aliases=columns_aliases,
+        filters=filters,
+        orderings=orderings,
+        groupings=groupings,
+        limit=limit,
+        offset=offset,
+        prefetch=prefetch,
+        chunked=True,
+        native=True,
+        is_mysql=is_mysql,
+        connection=connection)
+    async for records_chunk in records_chunks:
+        # transposing only current chunk
+        columns_values = zip(*records_chunk)
+        for column_builder, column_values in zip(columns_builders,
+                                                 columns_values):
+            column_builder.extend(column_values)
+    return {alias: column_builder.build()
+            for alias, column_builder in zip(aliases, columns_builders)}
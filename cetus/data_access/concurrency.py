@@ -0,0 +1,271 @@
+from asyncio import (FIRST_EXCEPTION,
+                     Queue,
+                     Semaphore,
+                     ensure_future,
+                     wait)
+from typing import (Any,
+                    Optional,
+                    Callable,
+                    Coroutine,
+                    AsyncIterator,
+                    Iterable,
+                    Union,
+                    List,
+                    Dict)
+
+from cetus.types import (ConnectionPoolType,
+                         FiltersType,
+                         OrderingType,
+                         RecordType)
+
+from .connectors import acquire_connection
+from .execution import DEFAULT_STREAM_PREFETCH
+from .reading import (fetch_stream,
+                      fetch_min_column_value,
+                      fetch_max_column_value)
+from .utils import iterate_records
+
+DEFAULT_PARTITIONS_COUNT = 4
+# chunks buffered for each partition
+DEFAULT_PARTITION_QUEUE_SIZE = 2
+PARTITION_END = object()
+
+
+async def run_concurrently(
+        functions: Iterable[Callable[..., Coroutine]], *,
+        max_concurrency: Optional[int] = None,
+        connection_pool: ConnectionPoolType) -> List[Any]:
+    # each function (e.g. `functools.partial` of `fetch`
+    # with all parameters except "connection")
+    # is called with separate connection acquired from pool,
+    # results are returned in order of functions,
+    # on first failure the rest of calls are cancelled
+    semaphore = (Semaphore(max_concurrency)
+                 if max_concurrency is not None
+                 else None)
+    tasks = [ensure_future(run_on_pooled_connection(
+        function,
+        semaphore=semaphore,
+        connection_pool=connection_pool))
+        for function in functions]
+    if not tasks:
+        return []
+    try:
+        _, pending = await wait(tasks,
+                                return_when=FIRST_EXCEPTION)
+    except BaseException:
+        await cancel_tasks(tasks)
+        raise
+    if pending:
+        await cancel_tasks(pending)
+    for task in tasks:
+        if task.cancelled():
+            continue
+        exception = task.exception()
+        if exception is not None:
+            raise exception
+    return [task.result() for task in tasks]
+
+
+async def run_on_pooled_connection(
+        function: Callable[..., Coroutine], *,
+        semaphore: Optional[Semaphore] = None,
+        connection_pool: ConnectionPoolType) -> Any:
+    if semaphore is not None:
+        async with semaphore:
+            res = await run_on_pooled_connection(
+                function,
+                connection_pool=connection_pool)
+            return res
+    async with acquire_connection(connection_pool) as connection:
+        res = await function(connection=connection)
+        return res
+
+
+async def cancel_tasks(tasks: Iterable) -> None:
+    tasks = list(tasks)
+    for task in tasks:
+        task.cancel()
+    # waiting for cancelled tasks to release connections
+    await wait(tasks)
+
+
+def fetch_partitioned(
+        *, table_name: str,
+        columns_names: List[str],
+        columns_aliases: Optional[Dict[str, str]] = None,
+        filters: Optional[FiltersType] = None,
+        key_column_name: str,
+        partitions_count: int = DEFAULT_PARTITIONS_COUNT,
+        ordered: bool = False,
+        prefetch: int = DEFAULT_STREAM_PREFETCH,
+        queue_size: int = DEFAULT_PARTITION_QUEUE_SIZE,
+        chunked: bool = False,
+        is_mysql: bool,
+        connection_pool: ConnectionPoolType
+) -> AsyncIterator[Union[RecordType, List[RecordType]]]:
+    # "key_column_name" should be an integer column (e.g. primary key),
+    # table is split into ranges of its values
+    # which are streamed concurrently with separate pooled connections,
+    # with "ordered" flag set records are yielded
+    # in ascending order of key column values
+    records_chunks = fetch_partitions_chunks(
+        table_name=table_name,
+        columns_names=columns_names,
+        columns_aliases=columns_aliases,
+        filters=filters,
+        key_column_name=key_column_name,
+        partitions_count=partitions_count,
+        ordered=ordered,
+        prefetch=prefetch,
+        queue_size=queue_size,
+        is_mysql=is_mysql,
+        connection_pool=connection_pool)
+    return iterate_records(records_chunks,
+                           chunked=chunked)
+
+
+async def fetch_partitions_chunks(
+        *, table_name: str,
+        columns_names: List[str],
+        columns_aliases: Optional[Dict[str, str]] = None,
+        filters: Optional[FiltersType] = None,
+        key_column_name: str,
+        partitions_count: int,
+        ordered: bool,
+        prefetch: int,
+        queue_size: int,
+        is_mysql: bool,
+        connection_pool: ConnectionPoolType
+) -> AsyncIterator[List[RecordType]]:
+    if partitions_count < 1:
+        err_msg = ('Invalid partitions count: '
+                   'should be positive integer, '
+                   f'but found: "{partitions_count}".')
+        raise ValueError(err_msg)
+    async with acquire_connection(connection_pool) as connection:
+        min_key = await fetch_min_column_value(
+            table_name=table_name,
+            column_name=key_column_name,
+            filters=filters,
+            is_mysql=is_mysql,
+            connection=connection)
+        max_key = await fetch_max_column_value(
+            table_name=table_name,
+            column_name=key_column_name,
+            filters=filters,
+            is_mysql=is_mysql,
+            connection=connection)
+    if min_key is None:
+        return
+    partitions_filters = generate_partitions_filters(
+        filters,
+        key_column_name=key_column_name,
+        min_key=min_key,
+        max_key=max_key,
+        partitions_count=partitions_count)
+    orderings = [(key_column_name, 'ASC')] if ordered else None
+    # with ordering each partition has own queue
+    # which are read one after another,
+    # since ranges are disjoint and sorted
+    # this gives the same result as k-way merge
+    queues = ([Queue(queue_size) for _ in partitions_filters]
+              if ordered
+              else [Queue(queue_size * len(partitions_filters))])
+    producers = [ensure_future(produce_partition_chunks(
+        queue=queues[index] if ordered else queues[0],
+        table_name=table_name,
+        columns_names=columns_names,
+        columns_aliases=columns_aliases,
+        filters=partition_filters,
+        orderings=orderings,
+        prefetch=prefetch,
+        is_mysql=is_mysql,
+        connection_pool=connection_pool))
+        for index, partition_filters in enumerate(partitions_filters)]
+    try:
+        if ordered:
+            for queue in queues:
+                async for records_chunk in consume_partitions_chunks(
+                        queue,
+                        partitions_count=1):
+                    yield records_chunk
+        else:
+            async for records_chunk in consume_partitions_chunks(
+                    queues[0],
+                    partitions_count=len(partitions_filters)):
+                yield records_chunk
+    finally:
+        await cancel_tasks(producers)
+
+
+def generate_partitions_filters(filters: Optional[FiltersType], *,
+                                key_column_name: str,
+                                min_key: int,
+                                max_key: int,
+                                partitions_count: int
+                                ) -> List[FiltersType]:
+    keys_count = max_key - min_key + 1
+    partitions_count = min(partitions_count, keys_count)
+    # ceiling division
+    partition_size = -(-keys_count // partitions_count)
+    res = []
+    for lower_key in range(min_key, max_key + 1, partition_size):
+        upper_key = lower_key + partition_size
+        range_filters = [('>=', (key_column_name, lower_key))]
+        if upper_key <= max_key:
+            range_filters.append(('<', (key_column_name, upper_key)))
+        else:
+            range_filters.append(('<=', (key_column_name, max_key)))
+        if filters is not None:
+            range_filters.append(filters)
+        res.append(('AND', range_filters))
+    return res
+
+
+async def produce_partition_chunks(
+        *, queue: Queue,
+        table_name: str,
+        columns_names: List[str],
+        columns_aliases: Optional[Dict[str, str]],
+        filters: FiltersType,
+        orderings: Optional[List[OrderingType]],
+        prefetch: int,
+        is_mysql: bool,
+        connection_pool: ConnectionPoolType) -> None:
+    try:
+        async with acquire_connection(connection_pool) as connection:
+            records_chunks = fetch_stream(
+                table_name=table_name,
+                columns_names=columns_names,
+                columns_aliases=columns_aliases,
+                filters=filters,
+                orderings=orderings,
+                prefetch=prefetch,
+                chunked=True,
+                is_mysql=is_mysql,
+                connection=connection)
+            try:
+                async for records_chunk in records_chunks:
+                    await queue.put(records_chunk)
+            finally:
+                await records_chunks.aclose()
+    except Exception as err:
+        # passing error to consumer
+        await queue.put(err)
+        return
+    await queue.put(PARTITION_END)
+
+
+async def consume_partitions_chunks(queue: Queue, *,
+                                    partitions_count: int
+                                    ) -> AsyncIterator[List[RecordType]]:
+    finished_partitions_count = 0
+    while finished_partitions_count < partitions_count:
+        item = await queue.get()
+        if item is PARTITION_END:
+            finished_partitions_count += 1
+            continue
+        if isinstance(item, Exception):
+            raise item
+        yield item
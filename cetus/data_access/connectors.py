@@ -1,18 +1,33 @@
+import re
 from asyncio import AbstractEventLoop
+from typing import (Optional,
+                    Callable,
+                    Coroutine)
 
 import aiomysql.sa
 import asyncpg
 from asyncio_extras import async_contextmanager
+from cetus.tracing import get_tracer
 from cetus.types import (ConnectionType,
+                         ConnectionPoolType,
                          MySQLConnectionType,
                          PostgresConnectionType)
 from sqlalchemy.engine.url import URL
 
+from .caching import track_transaction_writes
+
 DEFAULT_MYSQL_PORT = 3306
 DEFAULT_POSTGRES_PORT = 5432
 
 DEFAULT_MIN_CONNECTIONS_LIMIT = 10
 DEFAULT_CONNECTION_TIMEOUT = 60
+# `asyncpg` defaults
+DEFAULT_STATEMENT_CACHE_SIZE = 100
+DEFAULT_MAX_CACHED_STATEMENT_LIFETIME = 300
+
+SNAPSHOT_ISOLATION = 'repeatable_read'
+# snapshot identifiers are like "00000003-0000001B-1"
+SNAPSHOT_ID_PATTERN = re.compile(r'[0-9A-Fa-f]+(-[0-9A-Fa-f]+)*')
 
 
 @async_contextmanager
@@ -22,25 +37,52 @@ async def get_connection_pool(
         timeout: float = DEFAULT_CONNECTION_TIMEOUT,
         min_size: int = DEFAULT_MIN_CONNECTIONS_LIMIT,
         max_size: int,
+        statement_cache_size: int = DEFAULT_STATEMENT_CACHE_SIZE,
+        max_cached_statement_lifetime: int
+        = DEFAULT_MAX_CACHED_STATEMENT_LIFETIME,
+        init: Optional[Callable[[PostgresConnectionType],
+                                Coroutine]] = None,
         loop: AbstractEventLoop):
+    # statements caching settings and "init" callback
+    # (e.g. warming up prepared statements registry)
+    # are used only for Postgres
+    span = get_tracer().start_span(
+        'connection_pool.create',
+        backend='MySQL' if is_mysql else 'PostgreSQL',
+        min_size=min_size,
+        max_size=max_size)
     if is_mysql:
-        async with get_mysql_connection_pool(
-                db_uri,
-                timeout=timeout,
-                min_size=min_size,
-                max_size=max_size,
-                loop=loop) as connection_pool:
-            yield connection_pool
+        connection_pool_context = get_mysql_connection_pool(
+            db_uri,
+            timeout=timeout,
+            min_size=min_size,
+            max_size=max_size,
+            loop=loop)
     else:
-        async with get_postgres_connection_pool(
-                db_uri,
-                timeout=timeout,
-                min_size=min_size,
-                max_size=max_size,
-                loop=loop) as connection_pool:
+        connection_pool_context = get_postgres_connection_pool(
+            db_uri,
+            timeout=timeout,
+            min_size=min_size,
+            max_size=max_size,
+            statement_cache_size=statement_cache_size,
+            max_cached_statement_lifetime=max_cached_statement_lifetime,
+            init=init,
+            loop=loop)
+    with span:
+        async with connection_pool_context as connection_pool:
+            span.finish()
             yield connection_pool
 
 
+@async_contextmanager
+async def acquire_connection(connection_pool: ConnectionPoolType):
+    # measures only waiting for connection
+    with get_tracer().start_span('connection_pool.acquire') as span:
+        async with connection_pool.acquire() as connection:
+            span.finish()
+            yield connection
+
+
 @async_contextmanager
 async def get_mysql_connection_pool(
         db_uri: URL, *,
@@ -76,6 +118,11 @@ async def get_postgres_connection_pool(
         timeout: float = DEFAULT_CONNECTION_TIMEOUT,
         min_size: int = DEFAULT_MIN_CONNECTIONS_LIMIT,
         max_size: int,
+        statement_cache_size: int = DEFAULT_STATEMENT_CACHE_SIZE,
+        max_cached_statement_lifetime: int
+        = DEFAULT_MAX_CACHED_STATEMENT_LIFETIME,
+        init: Optional[Callable[[PostgresConnectionType],
+                                Coroutine]] = None,
         loop: AbstractEventLoop):
     # for symmetry with MySQL case
     port = db_uri.port or DEFAULT_POSTGRES_PORT
@@ -88,6 +135,9 @@ async def get_postgres_connection_pool(
             timeout=timeout,
             min_size=min_size,
             max_size=max_size,
+            statement_cache_size=statement_cache_size,
+            max_cached_statement_lifetime=max_cached_statement_lifetime,
+            init=init,
             loop=loop) as pool:
         yield pool
 
@@ -95,12 +145,15 @@ async def get_postgres_connection_pool(
 @async_contextmanager
 async def begin_transaction(
         *, connection: ConnectionType,
+        isolation: Optional[str] = 'read_committed',
         is_mysql: bool):
+    # "isolation" is used only for PostgreSQL
     if is_mysql:
         async with begin_mysql_transaction(connection):
             yield
     else:
-        async with begin_postgres_transaction(connection):
+        async with begin_postgres_transaction(connection,
+                                              isolation=isolation):
             yield
 
 
@@ -108,24 +161,90 @@ async def begin_transaction(
 async def begin_mysql_transaction(
         connection: MySQLConnectionType):
     transaction = connection.begin()
-    async with transaction:
-        yield
+    with track_transaction_writes(connection):
+        async with transaction:
+            yield
 
 
 @async_contextmanager
 async def begin_postgres_transaction(
         connection: PostgresConnectionType,
-        *, isolation: str = 'read_committed',
+        *, isolation: Optional[str] = 'read_committed',
         read_only: bool = False,
         deferrable: bool = False):
+    # `None` "isolation" means isolation of outer transaction
+    # (e.g. of snapshot one) or server default
     transaction = connection.transaction(
         isolation=isolation,
         readonly=read_only,
         deferrable=deferrable)
-    async with transaction:
+    with track_transaction_writes(connection):
+        async with transaction:
+            yield
+
+
+@async_contextmanager
+async def export_postgres_snapshot(
+        connection: PostgresConnectionType):
+    # yields identifier of snapshot
+    # which stays valid until the end of context
+    async with begin_postgres_transaction(connection,
+                                          isolation=SNAPSHOT_ISOLATION,
+                                          read_only=True):
+        snapshot_id = await connection.fetchval(
+            'SELECT pg_export_snapshot()')
+        yield snapshot_id
+
+
+@async_contextmanager
+async def begin_postgres_snapshot_transaction(
+        connection: PostgresConnectionType,
+        *, snapshot_id: str):
+    if SNAPSHOT_ID_PATTERN.fullmatch(snapshot_id) is None:
+        err_msg = ('Invalid snapshot identifier: '
+                   f'"{snapshot_id}".')
+        raise ValueError(err_msg)
+    async with begin_postgres_transaction(connection,
+                                          isolation=SNAPSHOT_ISOLATION,
+                                          read_only=True):
+        # should be the first statement of transaction,
+        # parameters are not supported here
+        await connection.execute('SET TRANSACTION SNAPSHOT '
+                                 f'\'{snapshot_id}\'')
         yield
 
 
+class PostgresSnapshotConnectionPool:
+    # connections acquired from this pool
+    # see the same consistent state of database
+    # and can be used instead of plain pool
+    # (e.g. with `run_concurrently` or `fetch_partitioned`)
+    def __init__(self, connection_pool: ConnectionPoolType, *,
+                 snapshot_id: str) -> None:
+        self.connection_pool = connection_pool
+        self.snapshot_id = snapshot_id
+
+    @async_contextmanager
+    async def acquire(self):
+        async with acquire_connection(self.connection_pool) as connection:
+            async with begin_postgres_snapshot_transaction(
+                    connection,
+                    snapshot_id=self.snapshot_id):
+                yield connection
+
+
+@async_contextmanager
+async def get_postgres_snapshot_connection_pool(
+        connection_pool: ConnectionPoolType):
+    # coordinator connection holds exported snapshot
+    # until the end of context
+    async with connection_pool.acquire() as connection:
+        async with export_postgres_snapshot(connection) as snapshot_id:
+            yield PostgresSnapshotConnectionPool(
+                connection_pool,
+                snapshot_id=snapshot_id)
+
+
 @async_contextmanager
 async def get_connection(
         *, db_uri: URL,
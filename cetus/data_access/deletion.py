@@ -1,18 +1,43 @@
 from typing import Optional
 
-from cetus.queries import generate_delete_query
+from cetus.queries import (generate_delete_query,
+                           split_inclusion_filters,
+                           start_query_build_span)
 from cetus.types import (ConnectionType,
                          FiltersType)
 
+from .caching import invalidates_results
+from .connectors import begin_transaction
 from .execution import execute
+from .utils import MYSQL_MAX_INCLUSION_VALUES_COUNT
 
 
+@invalidates_results
 async def delete(*, table_name: str,
                  filters: Optional[FiltersType] = None,
                  is_mysql: bool,
                  connection: ConnectionType) -> None:
-    query = generate_delete_query(
-        table_name=table_name,
-        filters=filters)
-    await execute(query, is_mysql=is_mysql,
+    if is_mysql:
+        filters_chunks = split_inclusion_filters(
+            filters,
+            max_values_count=MYSQL_MAX_INCLUSION_VALUES_COUNT)
+        if len(filters_chunks) > 1:
+            async with begin_transaction(connection=connection,
+                                         is_mysql=is_mysql):
+                for filters_chunk in filters_chunks:
+                    await delete(table_name=table_name,
+                                 filters=filters_chunk,
+                                 is_mysql=is_mysql,
+                                 connection=connection)
+            return
+
+    with start_query_build_span('delete',
+                                table_name=table_name):
+        query, args = generate_delete_query(
+            table_name=table_name,
+            filters=filters,
+            is_mysql=is_mysql,
+            parametrized=True)
+    await execute(query, *args,
+                  is_mysql=is_mysql,
                   connection=connection)
@@ -1,67 +1,375 @@
-from typing import (Union,
+from collections import namedtuple
+from typing import (Optional,
+                    Union,
+                    AsyncIterator,
                     Iterable,
-                    Tuple, List)
+                    Tuple,
+                    List,
+                    Dict)
+from weakref import WeakKeyDictionary
 
+from aiomysql import SSCursor
+from asyncpg import PostgresError
+from asyncpg.pool import PoolConnectionProxy
+from asyncpg.prepared_stmt import PreparedStatement
+from cetus.tracing import get_tracer
 from cetus.types import (ConnectionType,
+                         PostgresConnectionType,
+                         PostgresRecordClassType,
                          RecordType,
+                         RecordsType,
                          ColumnValueType)
 
-from .utils import handle_exceptions
+from .connectors import begin_postgres_transaction
+from .monitoring import (count_no_rows,
+                         count_row,
+                         monitor_queries)
+from .utils import (check_record_class,
+                    estimate_record_size,
+                    handle_exceptions,
+                    handle_stream_exceptions,
+                    split_records_async)
 
+DEFAULT_STREAM_PREFETCH = 1000
 
+StatementsStatistics = namedtuple('StatementsStatistics',
+                                  ['hits', 'misses',
+                                   'queries_count', 'connections_count'])
+
+
+class PreparedStatementsRegistry:
+    def __init__(self, queries: Optional[Dict[str, str]] = None
+                 ) -> None:
+        # hot queries by names
+        self.queries = dict(queries or {})
+        self.hits = 0
+        self.misses = 0
+        # prepared statements by names for each underlying connection,
+        # entries are dropped along with closed connections
+        self._statements = WeakKeyDictionary()
+
+    def register(self, name: str, query: str) -> None:
+        self.queries[name] = query
+        for statements in self._statements.values():
+            statements.pop(name, None)
+
+    def get_query(self, name: str) -> str:
+        try:
+            return self.queries[name]
+        except KeyError as err:
+            err_msg = ('Invalid prepared statement name: '
+                       f'"{name}" is not registered.')
+            raise ValueError(err_msg) from err
+
+    def get_template(self, name: str) -> str:
+        # for connections without server-side prepared statements
+        # registered query is reused as is
+        query = self.get_query(name)
+        self.hits += 1
+        return query
+
+    async def get_statement(self, name: str, *,
+                            connection: PostgresConnectionType
+                            ) -> PreparedStatement:
+        query = self.get_query(name)
+        statements = self._statements.setdefault(
+            to_underlying_connection(connection), {})
+        try:
+            statement = statements[name]
+        except KeyError:
+            self.misses += 1
+            statement = await connection.prepare(query)
+            statements[name] = statement
+        else:
+            self.hits += 1
+        return statement
+
+    async def prepare(self, connection: PostgresConnectionType) -> None:
+        # can be passed as "init" callback
+        # to prepare statements once per pooled connection
+        for name in self.queries:
+            await self.get_statement(name,
+                                     connection=connection)
+
+    def clear(self) -> None:
+        self._statements.clear()
+        self.hits = self.misses = 0
+
+    @property
+    def statistics(self) -> StatementsStatistics:
+        return StatementsStatistics(
+            hits=self.hits,
+            misses=self.misses,
+            queries_count=len(self.queries),
+            connections_count=len(self._statements))
+
+
+statements_registry = PreparedStatementsRegistry()
+
+
+def to_underlying_connection(connection: PostgresConnectionType
+                             ) -> PostgresConnectionType:
+    # connections acquired from pool are wrapped into proxies
+    # which are different for each acquisition,
+    # `asyncpg` has no public accessor of wrapped connection
+    # and proxy forwards missing attributes to it,
+    # so its slot is read directly
+    if not isinstance(connection, PoolConnectionProxy):
+        return connection
+    try:
+        res = object.__getattribute__(connection, '_con')
+    except AttributeError as err:
+        err_msg = ('Invalid connection: '
+                   'pool connection proxy should wrap connection '
+                   'in "_con" attribute, '
+                   'but it is missing in this "asyncpg" version.')
+        raise ValueError(err_msg) from err
+    if res is None:
+        err_msg = ('Invalid connection: '
+                   'should be acquired from pool, '
+                   f'but found released one: "{connection}".')
+        raise ValueError(err_msg)
+    return res
+
+
+@monitor_queries(count_rows=count_no_rows)
 @handle_exceptions
 async def execute(query: str,
                   *args: Tuple[RecordType],
                   is_mysql: bool,
                   connection: ConnectionType
                   ) -> Union[int, str]:
-    if is_mysql:
-        async with connection.connection.cursor() as cursor:
-            resp = await cursor.execute(query, args=args)
-    else:
-        resp = await connection.execute(query, *args)
+    with start_round_trip_span(query,
+                               is_mysql=is_mysql):
+        if is_mysql:
+            async with connection.connection.cursor() as cursor:
+                resp = await cursor.execute(query, args=args)
+        else:
+            resp = await connection.execute(query, *args)
     return resp
 
 
+@monitor_queries(count_rows=count_no_rows)
 @handle_exceptions
 async def execute_many(query: str, *,
                        args: Iterable[RecordType],
                        is_mysql: bool,
                        connection: ConnectionType
                        ) -> None:
-    if is_mysql:
-        async with connection.connection.cursor() as cursor:
-            await cursor.executemany(query, args=args)
-    else:
-        await connection.executemany(query, args=args)
+    with start_round_trip_span(query,
+                               is_mysql=is_mysql):
+        if is_mysql:
+            async with connection.connection.cursor() as cursor:
+                await cursor.executemany(query, args=args)
+        else:
+            await connection.executemany(query, args=args)
 
 
+@monitor_queries(count_rows=count_row)
 @handle_exceptions
-async def fetch_row(query: str, *,
+async def fetch_row(query: str,
+                    *args: Tuple[ColumnValueType],
+                    native: bool = False,
+                    record_class: Optional[PostgresRecordClassType] = None,
                     is_mysql: bool,
                     connection: ConnectionType
                     ) -> RecordType:
+    # with "native" flag set (or "record_class" specified)
+    # driver's rows are returned without copying into tuples
+    check_record_class(record_class,
+                       is_mysql=is_mysql)
     if is_mysql:
         async with connection.connection.cursor() as cursor:
-            await cursor.execute(query)
+            with start_round_trip_span(query,
+                                       is_mysql=is_mysql):
+                await cursor.execute(query, args=args)
             resp = await cursor.fetchone()
             return resp
     else:
-        resp = await connection.fetchrow(query)
-        if resp is not None:
-            return tuple(resp.values())
+        with start_round_trip_span(query,
+                                   is_mysql=is_mysql):
+            resp = await connection.fetchrow(query, *args,
+                                             record_class=record_class)
+        if resp is None or native or record_class is not None:
+            return resp
+        return tuple(resp.values())
 
 
+@monitor_queries(count_rows=len)
 @handle_exceptions
 async def fetch_rows(query: str,
                      *args: Tuple[ColumnValueType],
+                     native: bool = False,
+                     record_class: Optional[PostgresRecordClassType] = None,
                      is_mysql: bool,
                      connection: ConnectionType
                      ) -> List[RecordType]:
+    check_record_class(record_class,
+                       is_mysql=is_mysql)
     if is_mysql:
         async with connection.connection.cursor() as cursor:
+            # buffered cursor reads all rows while executing
+            with start_round_trip_span(query,
+                                       is_mysql=is_mysql) as span:
+                span.set_attribute('rows', await cursor.execute(query,
+                                                                args=args))
+            if native:
+                resp = await cursor.fetchall()
+                return resp
+            with start_rows_decoding_span() as span:
+                res = [row async for row in cursor]
+                set_rows_attributes(span, res)
+            return res
+    else:
+        with start_round_trip_span(query,
+                                   is_mysql=is_mysql) as span:
+            resp = await connection.fetch(query, *args,
+                                          record_class=record_class)
+            span.set_attribute('rows', len(resp))
+        if native or record_class is not None:
+            return resp
+        with start_rows_decoding_span() as span:
+            res = [tuple(row.values()) for row in resp]
+            set_rows_attributes(span, res)
+        return res
+
+
+@handle_stream_exceptions
+async def fetch_rows_stream(query: str,
+                            *args: Tuple[ColumnValueType],
+                            prefetch: int = DEFAULT_STREAM_PREFETCH,
+                            native: bool = False,
+                            record_class: Optional[
+                                PostgresRecordClassType] = None,
+                            is_mysql: bool,
+                            connection: ConnectionType
+                            ) -> AsyncIterator[List[RecordType]]:
+    # yields chunks of at most "prefetch" rows
+    # using server-side cursors,
+    # so only one chunk is held in memory at a time
+    check_record_class(record_class,
+                       is_mysql=is_mysql)
+    if is_mysql:
+        # unbuffered cursor reads rows from socket on demand
+        async with connection.connection.cursor(SSCursor) as cursor:
             await cursor.execute(query, args=args)
-            return [row async for row in cursor]
+            while True:
+                resp = await cursor.fetchmany(prefetch)
+                if not resp:
+                    break
+                yield list(resp)
     else:
-        resp = await connection.fetch(query, *args)
-        return [tuple(row.values()) for row in resp]
+        # `asyncpg` cursors are available only inside transactions
+        async with begin_postgres_transaction(connection,
+                                              isolation=None):
+            cursor = await connection.cursor(query, *args,
+                                             record_class=record_class)
+            while True:
+                resp = await cursor.fetch(prefetch)
+                if not resp:
+                    break
+                if native or record_class is not None:
+                    yield resp
+                    continue
+                yield [tuple(row.values()) for row in resp]
+
+
+def start_round_trip_span(query: str, *,
+                          is_mysql: bool):
+    return get_tracer().start_span(
+        'query.round_trip',
+        query=query,
+        backend='MySQL' if is_mysql else 'PostgreSQL')
+
+
+def start_rows_decoding_span():
+    return get_tracer().start_span('rows.decode')
+
+
+def set_rows_attributes(span, rows: List[RecordType]) -> None:
+    span.set_attribute('rows', len(rows))
+    # estimating size is costly, so done only for real spans
+    if span.recording:
+        span.set_attribute('bytes', sum(map(estimate_record_size, rows)))
+
+
+@handle_exceptions
+async def execute_prepared(name: str,
+                           *args: Tuple[ColumnValueType],
+                           registry: PreparedStatementsRegistry
+                           = statements_registry,
+                           is_mysql: bool,
+                           connection: ConnectionType
+                           ) -> Union[int, str]:
+    if is_mysql:
+        # `aiomysql` has no server-side prepared statements
+        resp = await execute(registry.get_template(name), *args,
+                             is_mysql=is_mysql,
+                             connection=connection)
+        return resp
+    statement = await registry.get_statement(name,
+                                             connection=connection)
+    await statement.fetch(*args)
+    return statement.get_statusmsg()
+
+
+@handle_exceptions
+async def fetch_row_prepared(name: str,
+                             *args: Tuple[ColumnValueType],
+                             registry: PreparedStatementsRegistry
+                             = statements_registry,
+                             is_mysql: bool,
+                             connection: ConnectionType
+                             ) -> RecordType:
+    if is_mysql:
+        resp = await fetch_row(registry.get_template(name), *args,
+                               is_mysql=is_mysql,
+                               connection=connection)
+        return resp
+    statement = await registry.get_statement(name,
+                                             connection=connection)
+    resp = await statement.fetchrow(*args)
+    if resp is not None:
+        return tuple(resp.values())
+
+
+@handle_exceptions
+async def fetch_rows_prepared(name: str,
+                              *args: Tuple[ColumnValueType],
+                              registry: PreparedStatementsRegistry
+                              = statements_registry,
+                              is_mysql: bool,
+                              connection: ConnectionType
+                              ) -> List[RecordType]:
+    if is_mysql:
+        resp = await fetch_rows(registry.get_template(name), *args,
+                                is_mysql=is_mysql,
+                                connection=connection)
+        return resp
+    statement = await registry.get_statement(name,
+                                             connection=connection)
+    resp = await statement.fetch(*args)
+    return [tuple(row.values()) for row in resp]
+
+
+async def copy_records(table_name: str, *,
+                       columns_names: List[str],
+                       records: RecordsType,
+                       chunk_size: int,
+                       connection: PostgresConnectionType) -> None:
+    # using binary `COPY` protocol,
+    # records are streamed by chunks to keep memory usage bounded
+    try:
+        async with begin_postgres_transaction(connection,
+                                              isolation=None):
+            async for records_chunk in split_records_async(
+                    records,
+                    batch_size=chunk_size):
+                await connection.copy_records_to_table(
+                    table_name,
+                    records=records_chunk,
+                    columns=columns_names)
+    except PostgresError as err:
+        err_msg = ('Error while copying records '
+                   f'to table: "{table_name}".')
+        raise IOError(err_msg) from err
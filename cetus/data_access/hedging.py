@@ -0,0 +1,167 @@
+from asyncio import (FIRST_COMPLETED,
+                     CancelledError,
+                     ensure_future,
+                     wait)
+from collections import (deque,
+                         namedtuple)
+from time import monotonic
+from typing import (Any,
+                    Optional,
+                    Callable,
+                    Coroutine,
+                    List)
+
+from cetus.types import (ConnectionType,
+                         ConnectionPoolType)
+
+from .concurrency import cancel_tasks
+from .connectors import acquire_connection
+from .execution import execute
+
+DEFAULT_LATENCY_PERCENTILE = 95
+DEFAULT_LATENCIES_WINDOW_SIZE = 1000
+# hedging starts only after enough latencies are collected
+DEFAULT_MIN_LATENCIES_COUNT = 20
+
+HedgingStatistics = namedtuple('HedgingStatistics',
+                               ['requests_count', 'hedges_count',
+                                'hedges_wins_count', 'hedge_rate',
+                                'hedge_delay'])
+
+
+class LatencyTracker:
+    def __init__(self, *,
+                 percentile: float = DEFAULT_LATENCY_PERCENTILE,
+                 window_size: int = DEFAULT_LATENCIES_WINDOW_SIZE,
+                 min_latencies_count: int = DEFAULT_MIN_LATENCIES_COUNT
+                 ) -> None:
+        if not 0 < percentile <= 100:
+            err_msg = ('Invalid percentile: '
+                       'should be in (0, 100] range, '
+                       f'but found: "{percentile}".')
+            raise ValueError(err_msg)
+        self.percentile = percentile
+        self.min_latencies_count = min_latencies_count
+        self._latencies = deque(maxlen=window_size)
+
+    def record(self, latency: float) -> None:
+        self._latencies.append(latency)
+
+    def get_percentile_latency(self) -> Optional[float]:
+        if len(self._latencies) < self.min_latencies_count:
+            return None
+        latencies = sorted(self._latencies)
+        # nearest-rank method
+        index = -(-len(latencies) * self.percentile // 100) - 1
+        return latencies[int(index)]
+
+
+class ReadsHedger:
+    # if reading function is not finished within percentile
+    # of recent latencies, it is issued again with another pool,
+    # the first result wins and the other call is cancelled,
+    # should be used only for reading functions
+    # since the same call may be executed twice
+    def __init__(self, *,
+                 latency_tracker: Optional[LatencyTracker] = None,
+                 is_mysql: bool) -> None:
+        self.latency_tracker = latency_tracker or LatencyTracker()
+        self.is_mysql = is_mysql
+        self.requests_count = 0
+        self.hedges_count = 0
+        self.hedges_wins_count = 0
+        self._cancellation_tasks = set()
+
+    async def run(self, function: Callable[..., Coroutine], *,
+                  connection_pools: List[ConnectionPoolType]) -> Any:
+        # "function" is called with "connection" keyword argument,
+        # first pool is used for original call, second one for hedge,
+        # each pool should connect to single server
+        # (e.g. replicas of routing pool) since MySQL query
+        # is killed with another connection from the same pool
+        self.requests_count += 1
+        primary_connection_pool, *rest_connection_pools = connection_pools
+        delay = self.latency_tracker.get_percentile_latency()
+        if delay is None or not rest_connection_pools:
+            res = await self.attempt(function,
+                                     connection_pool=primary_connection_pool)
+            return res
+        hedge_connection_pool, *_ = rest_connection_pools
+        attempt = ensure_future(self.attempt(
+            function,
+            connection_pool=primary_connection_pool))
+        pending = {attempt}
+        try:
+            done, pending = await wait(pending,
+                                       timeout=delay)
+            if done:
+                return attempt.result()
+            self.hedges_count += 1
+            hedge_attempt = ensure_future(self.attempt(
+                function,
+                connection_pool=hedge_connection_pool))
+            pending.add(hedge_attempt)
+            error = None
+            while pending:
+                done, pending = await wait(pending,
+                                           return_when=FIRST_COMPLETED)
+                for finished_attempt in done:
+                    exception = finished_attempt.exception()
+                    if exception is None:
+                        if finished_attempt is hedge_attempt:
+                            self.hedges_wins_count += 1
+                        return finished_attempt.result()
+                    error = error or exception
+            raise error
+        finally:
+            # result is returned without waiting for losing attempt
+            # to be cancelled (e.g. for MySQL query to be killed)
+            if pending:
+                task = ensure_future(cancel_tasks(pending))
+                self._cancellation_tasks.add(task)
+                task.add_done_callback(self._cancellation_tasks.discard)
+
+    async def wait_cancellations(self) -> None:
+        # e.g. before closing connection pools
+        if self._cancellation_tasks:
+            await wait(list(self._cancellation_tasks))
+
+    async def attempt(self, function: Callable[..., Coroutine], *,
+                      connection_pool: ConnectionPoolType) -> Any:
+        async with acquire_connection(connection_pool) as connection:
+            start = monotonic()
+            try:
+                res = await function(connection=connection)
+            except CancelledError:
+                # `asyncpg` cancels query on server by itself
+                if self.is_mysql:
+                    await kill_mysql_query(connection,
+                                           connection_pool=connection_pool)
+                raise
+            self.latency_tracker.record(monotonic() - start)
+            return res
+
+    @property
+    def statistics(self) -> HedgingStatistics:
+        hedge_rate = (self.hedges_count / self.requests_count
+                      if self.requests_count
+                      else 0.)
+        return HedgingStatistics(
+            requests_count=self.requests_count,
+            hedges_count=self.hedges_count,
+            hedges_wins_count=self.hedges_wins_count,
+            hedge_rate=hedge_rate,
+            hedge_delay=self.latency_tracker.get_percentile_latency())
+
+
+async def kill_mysql_query(connection: ConnectionType, *,
+                           connection_pool: ConnectionPoolType) -> None:
+    raw_connection = connection.connection
+    thread_id = raw_connection.thread_id()
+    async with connection_pool.acquire() as killing_connection:
+        await execute(f'KILL QUERY {thread_id}',
+                      is_mysql=True,
+                      connection=killing_connection)
+    # connection may have unread results of killed query,
+    # so it is closed to be dropped by pool instead of reused
+    raw_connection.close()
@@ -0,0 +1,350 @@
+import json
+import logging
+import re
+from asyncio import (ensure_future,
+                     wait)
+from bisect import bisect_left
+from collections import (deque,
+                         namedtuple)
+from functools import (lru_cache,
+                       wraps)
+from time import (monotonic,
+                  perf_counter,
+                  time)
+from typing import (Any,
+                    Optional,
+                    Callable,
+                    Coroutine,
+                    Tuple,
+                    List,
+                    Dict)
+
+from cetus.types import ConnectionPoolType
+
+from .utils import STAGING_TABLE_NAME_PREFIX
+
+FINGERPRINTS_CACHE_SIZE = 1024
+# statistics of queries with new fingerprints
+# are accumulated in overflow entry after limit is reached
+MAX_FINGERPRINTS_COUNT = 1000
+OVERFLOW_FINGERPRINT = '<other>'
+# in seconds, from 0.1 ms up to ~105 s
+LATENCY_BUCKETS_BOUNDS = [0.0001 * 2 ** power
+                          for power in range(21)]
+REPORTED_PERCENTILES = (50, 95, 99)
+
+STRING_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL_PATTERN = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDER_PATTERN = re.compile(r'\$\d+|%s')
+VALUES_LIST_PATTERN = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'
+                                 r'(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))*')
+WHITESPACES_PATTERN = re.compile(r'\s+')
+# generated staging tables names are unique for each insert
+STAGING_TABLE_NAME_PATTERN = re.compile(
+    rf'\b{STAGING_TABLE_NAME_PREFIX}[0-9a-f]+\b')
+
+DEFAULT_SLOW_QUERIES_LOG_SIZE = 100
+# in seconds
+DEFAULT_MIN_EXPLAIN_INTERVAL = 1
+MAX_LOGGED_ARGUMENTS_LENGTH = 1000
+EXPLAINABLE_STATEMENTS = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH')
+
+QueryStatisticsSnapshot = namedtuple('QueryStatisticsSnapshot',
+                                     ['calls_count', 'errors_count',
+                                      'rows_count', 'total_latency',
+                                      'p50', 'p95', 'p99'])
+ExporterType = Callable[[Dict[str, QueryStatisticsSnapshot]], None]
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(FINGERPRINTS_CACHE_SIZE)
+def generate_query_fingerprint(query: str) -> str:
+    # literals and placeholders are replaced with "?"
+    # and lists of them are collapsed,
+    # so queries which differ only by values
+    # or by number of values have the same fingerprint
+    res = STRING_LITERAL_PATTERN.sub('?', query)
+    res = STAGING_TABLE_NAME_PATTERN.sub(STAGING_TABLE_NAME_PREFIX + '?',
+                                         res)
+    res = PLACEHOLDER_PATTERN.sub('?', res)
+    res = NUMBER_LITERAL_PATTERN.sub('?', res)
+    res = VALUES_LIST_PATTERN.sub('(...)', res)
+    res = WHITESPACES_PATTERN.sub(' ', res)
+    return res.strip()
+
+
+class LatencyHistogram:
+    def __init__(self) -> None:
+        # the last bucket is for latencies
+        # greater than the greatest bound
+        self.buckets_counts = [0] * (len(LATENCY_BUCKETS_BOUNDS) + 1)
+        self.count = 0
+        self.max_latency = 0.
+
+    def record(self, latency: float) -> None:
+        self.buckets_counts[bisect_left(LATENCY_BUCKETS_BOUNDS,
+                                        latency)] += 1
+        self.count += 1
+        self.max_latency = max(self.max_latency, latency)
+
+    def get_percentile(self, percentile: float) -> float:
+        # upper bound of bucket containing percentile,
+        # so the estimate is never less than actual value
+        if not self.count:
+            return 0.
+        rank = self.count * percentile / 100
+        cumulative_count = 0
+        for bound, bucket_count in zip(LATENCY_BUCKETS_BOUNDS,
+                                       self.buckets_counts):
+            cumulative_count += bucket_count
+            if cumulative_count >= rank:
+                return min(bound, self.max_latency)
+        return self.max_latency
+
+
+class QueryStatistics:
+    def __init__(self) -> None:
+        self.calls_count = 0
+        self.errors_count = 0
+        self.rows_count = 0
+        self.total_latency = 0.
+        self.histogram = LatencyHistogram()
+
+    def record(self, *, latency: float,
+               rows_count: int,
+               failed: bool) -> None:
+        self.calls_count += 1
+        self.errors_count += failed
+        self.rows_count += rows_count
+        self.total_latency += latency
+        self.histogram.record(latency)
+
+    def snapshot(self) -> QueryStatisticsSnapshot:
+        p50, p95, p99 = map(self.histogram.get_percentile,
+                            REPORTED_PERCENTILES)
+        return QueryStatisticsSnapshot(calls_count=self.calls_count,
+                                       errors_count=self.errors_count,
+                                       rows_count=self.rows_count,
+                                       total_latency=self.total_latency,
+                                       p50=p50,
+                                       p95=p95,
+                                       p99=p99)
+
+
+class QueriesMonitor:
+    def __init__(self, *, enabled: bool = True,
+                 max_fingerprints_count: int = MAX_FINGERPRINTS_COUNT
+                 ) -> None:
+        self.enabled = enabled
+        self.max_fingerprints_count = max_fingerprints_count
+        self.exporters = []
+        self._statistics = {}
+
+    def record(self, query: str, *,
+               latency: float,
+               rows_count: int = 0,
+               failed: bool = False) -> None:
+        if not self.enabled:
+            return
+        fingerprint = generate_query_fingerprint(query)
+        try:
+            statistics = self._statistics[fingerprint]
+        except KeyError:
+            if len(self._statistics) >= self.max_fingerprints_count:
+                fingerprint = OVERFLOW_FINGERPRINT
+            statistics = self._statistics.get(fingerprint)
+            if statistics is None:
+                statistics = self._statistics[fingerprint] = (
+                    QueryStatistics())
+        statistics.record(latency=latency,
+                          rows_count=rows_count,
+                          failed=failed)
+
+    def snapshot(self) -> Dict[str, QueryStatisticsSnapshot]:
+        return {fingerprint: statistics.snapshot()
+                for fingerprint, statistics in self._statistics.items()}
+
+    def add_exporter(self, exporter: ExporterType) -> None:
+        self.exporters.append(exporter)
+
+    def export(self) -> None:
+        snapshot = self.snapshot()
+        for exporter in self.exporters:
+            exporter(snapshot)
+
+    def reset(self) -> None:
+        self._statistics.clear()
+
+
+queries_monitor = QueriesMonitor()
+
+
+class SlowQuery:
+    def __init__(self, *, query: str,
+                 args: Tuple[Any, ...],
+                 backend: str,
+                 duration: float,
+                 timestamp: float) -> None:
+        self.query = query
+        self.args = args
+        self.backend = backend
+        self.duration = duration
+        self.timestamp = timestamp
+        # filled after capturing
+        self.plan = None
+
+
+class SlowQueriesLog:
+    # queries with duration greater than "threshold" are logged
+    # and kept in ring buffer, if "connection_pool" is set
+    # their plans are captured with spare connection
+    # not more often than once in "min_explain_interval"
+    def __init__(self, *, threshold: Optional[float] = None,
+                 max_size: int = DEFAULT_SLOW_QUERIES_LOG_SIZE,
+                 min_explain_interval: float = DEFAULT_MIN_EXPLAIN_INTERVAL,
+                 connection_pool: Optional[ConnectionPoolType] = None
+                 ) -> None:
+        self.threshold = threshold
+        self.min_explain_interval = min_explain_interval
+        self.connection_pool = connection_pool
+        self.entries = deque(maxlen=max_size)
+        self._last_explain_time = None
+        self._explain_tasks = set()
+
+    def record(self, query: str, *args: Any,
+               duration: float,
+               explainable: bool = True,
+               is_mysql: bool) -> None:
+        if self.threshold is None or duration <= self.threshold:
+            return
+        slow_query = SlowQuery(query=query,
+                               args=args,
+                               backend='MySQL' if is_mysql else 'PostgreSQL',
+                               duration=duration,
+                               timestamp=time())
+        self.entries.append(slow_query)
+        args_str = repr(args)[:MAX_LOGGED_ARGUMENTS_LENGTH]
+        logger.warning(f'Slow query on {slow_query.backend} '
+                       f'took {duration:.3f} s: "{query}", '
+                       f'arguments: {args_str}.')
+        if explainable and self.should_explain(query):
+            self._last_explain_time = monotonic()
+            task = ensure_future(self.explain(slow_query,
+                                              is_mysql=is_mysql))
+            self._explain_tasks.add(task)
+            task.add_done_callback(self._explain_tasks.discard)
+
+    def should_explain(self, query: str) -> bool:
+        if self.connection_pool is None:
+            return False
+        if not query.lstrip().upper().startswith(EXPLAINABLE_STATEMENTS):
+            return False
+        return (self._last_explain_time is None
+                or (monotonic() - self._last_explain_time
+                    >= self.min_explain_interval))
+
+    async def explain(self, slow_query: SlowQuery, *,
+                      is_mysql: bool) -> None:
+        # raw driver calls are used
+        # to avoid monitoring of explaining queries
+        try:
+            async with self.connection_pool.acquire() as connection:
+                if is_mysql:
+                    async with connection.connection.cursor() as cursor:
+                        await cursor.execute('EXPLAIN FORMAT=JSON '
+                                             + slow_query.query,
+                                             args=slow_query.args)
+                        plan, = await cursor.fetchone()
+                else:
+                    plan = await connection.fetchval(
+                        'EXPLAIN (FORMAT JSON) ' + slow_query.query,
+                        *slow_query.args)
+        except Exception as err:
+            logger.warning('Error while explaining slow query: '
+                           f'"{slow_query.query}": "{err}".')
+            return
+        slow_query.plan = json.loads(plan) if isinstance(plan, str) else plan
+
+    async def wait_explains(self) -> None:
+        # e.g. before closing "connection_pool"
+        if self._explain_tasks:
+            await wait(list(self._explain_tasks))
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+
+slow_queries_log = SlowQueriesLog()
+
+
+def monitor_queries(*, count_rows: Callable[[Any], int]
+                    ) -> Callable[[Callable[..., Coroutine]],
+                                  Callable[..., Coroutine]]:
+    def decorator(function: Callable[..., Coroutine]
+                  ) -> Callable[..., Coroutine]:
+        @wraps(function)
+        async def decorated(query: str,
+                            *args: Tuple[Any, ...],
+                            **kwargs: Dict[str, Any]):
+            # rows of batch statements are passed as "args" keyword,
+            # so their queries are not explained without arguments
+            explainable = 'args' not in kwargs
+            start = perf_counter()
+            try:
+                res = await function(query, *args, **kwargs)
+            except Exception:
+                latency = perf_counter() - start
+                queries_monitor.record(query,
+                                       latency=latency,
+                                       failed=True)
+                slow_queries_log.record(query, *args,
+                                        duration=latency,
+                                        explainable=explainable,
+                                        is_mysql=kwargs['is_mysql'])
+                raise
+            latency = perf_counter() - start
+            queries_monitor.record(query,
+                                   latency=latency,
+                                   rows_count=count_rows(res))
+            slow_queries_log.record(query, *args,
+                                    duration=latency,
+                                    explainable=explainable,
+                                    is_mysql=kwargs['is_mysql'])
+            return res
+
+        return decorated
+
+    return decorator
+
+
+def count_no_rows(_: Any) -> int:
+    return 0
+
+
+def count_row(row: Any) -> int:
+    return int(row is not None)
+
+
+def log_queries_statistics(snapshot: Dict[str, QueryStatisticsSnapshot],
+                           *,
+                           top_size: int = 10) -> None:
+    # exporter which logs queries with the greatest total latency
+    for fingerprint in get_top_fingerprints(snapshot,
+                                            top_size=top_size):
+        statistics = snapshot[fingerprint]
+        logger.info(f'Query "{fingerprint}": '
+                    f'{statistics.calls_count} calls, '
+                    f'{statistics.errors_count} errors, '
+                    f'{statistics.rows_count} rows, '
+                    f'total {statistics.total_latency:.3f} s, '
+                    f'p50 {statistics.p50:.4f} s, '
+                    f'p95 {statistics.p95:.4f} s, '
+                    f'p99 {statistics.p99:.4f} s.')
+
+
+def get_top_fingerprints(snapshot: Dict[str, QueryStatisticsSnapshot], *,
+                         top_size: int) -> List[str]:
+    return sorted(snapshot,
+                  key=lambda fingerprint: snapshot[fingerprint].total_latency,
+                  reverse=True)[:top_size]
@@ -0,0 +1,177 @@
+import logging
+from asyncio import (AbstractEventLoop,
+                     CancelledError,
+                     Event,
+                     ensure_future,
+                     sleep,
+                     wait_for)
+from typing import (Any,
+                    List)
+
+from asyncio_extras import async_contextmanager
+from cetus.types import PostgresConnectionType
+from cetus.utils import MAX_IDENTIFIER_LENGTH
+from sqlalchemy.engine.url import URL
+
+from .caching import invalidate_tables
+from .connectors import (DEFAULT_CONNECTION_TIMEOUT,
+                         begin_transaction,
+                         get_postgres_connection)
+from .execution import execute
+
+INVALIDATION_CHANNEL_PREFIX = 'cetus_invalidation_'
+INVALIDATION_FUNCTION_NAME = 'cetus_notify_invalidation'
+INVALIDATION_TRIGGER_NAME = 'cetus_invalidation'
+# in seconds
+DEFAULT_RECONNECTION_INTERVAL = 1
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidationsListener:
+    # listens to tables channels with dedicated connection
+    # and invalidates cached results of notified tables in the process,
+    # tables should have triggers installed
+    # with `install_invalidation_triggers`;
+    # notifications may be missed while connection is lost,
+    # so all tables are invalidated on (re)connection and disconnection
+    def __init__(self, *, db_uri: URL,
+                 tables_names: List[str],
+                 timeout: float = DEFAULT_CONNECTION_TIMEOUT,
+                 reconnection_interval: float
+                 = DEFAULT_RECONNECTION_INTERVAL,
+                 loop: AbstractEventLoop) -> None:
+        self.db_uri = db_uri
+        self.tables_names = tables_names
+        self.timeout = timeout
+        self.reconnection_interval = reconnection_interval
+        self.loop = loop
+        self.channels_tables_names = {
+            generate_invalidation_channel(table_name): table_name
+            for table_name in tables_names}
+        self.notifications_count = 0
+        self.subscribed = Event()
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.listen()
+            except CancelledError:
+                raise
+            except Exception as err:
+                # listening should go on after connection loss
+                logger.warning('Error while listening to invalidations, '
+                               'reconnecting: '
+                               f'"{err}".')
+            await sleep(self.reconnection_interval)
+
+    async def listen(self) -> None:
+        async with get_postgres_connection(
+                self.db_uri,
+                timeout=self.timeout,
+                loop=self.loop) as connection:
+            terminated = Event()
+            connection.add_termination_listener(
+                lambda _: terminated.set())
+            for channel in self.channels_tables_names:
+                await connection.add_listener(channel,
+                                              self.handle_notification)
+            invalidate_tables(*self.tables_names)
+            self.subscribed.set()
+            try:
+                await terminated.wait()
+            finally:
+                self.subscribed.clear()
+                invalidate_tables(*self.tables_names)
+
+    def handle_notification(self, connection: PostgresConnectionType,
+                            pid: int,
+                            channel: str,
+                            payload: Any) -> None:
+        self.notifications_count += 1
+        invalidate_tables(self.channels_tables_names[channel])
+
+
+@async_contextmanager
+async def listen_invalidations(
+        *, db_uri: URL,
+        tables_names: List[str],
+        timeout: float = DEFAULT_CONNECTION_TIMEOUT,
+        reconnection_interval: float = DEFAULT_RECONNECTION_INTERVAL,
+        loop: AbstractEventLoop):
+    # yields listener after it is subscribed to all channels
+    listener = InvalidationsListener(
+        db_uri=db_uri,
+        tables_names=tables_names,
+        timeout=timeout,
+        reconnection_interval=reconnection_interval,
+        loop=loop)
+    task = ensure_future(listener.run())
+    try:
+        await wait_for(listener.subscribed.wait(),
+                       timeout=timeout)
+        yield listener
+    finally:
+        task.cancel()
+        try:
+            await task
+        except CancelledError:
+            pass
+
+
+def generate_invalidation_channel(table_name: str) -> str:
+    channel = INVALIDATION_CHANNEL_PREFIX + table_name
+    if len(channel) > MAX_IDENTIFIER_LENGTH:
+        err_msg = ('Invalid table name: '
+                   'invalidation channel name should not be longer '
+                   f'than {MAX_IDENTIFIER_LENGTH} characters, '
+                   f'but found: "{channel}".')
+        raise ValueError(err_msg)
+    return channel
+
+
+async def install_invalidation_triggers(
+        *, tables_names: List[str],
+        connection: PostgresConnectionType) -> None:
+    # statement-level triggers notify table channel
+    # after each writing statement, notifications are sent on commit
+    # and duplicates within transaction are collapsed by Postgres
+    async with begin_transaction(connection=connection,
+                                 is_mysql=False):
+        await execute(
+            f'CREATE OR REPLACE FUNCTION {INVALIDATION_FUNCTION_NAME}() '
+            'RETURNS trigger AS $$ '
+            'BEGIN '
+            'PERFORM pg_notify(TG_ARGV[0], TG_TABLE_NAME); '
+            'RETURN NULL; '
+            'END; '
+            '$$ LANGUAGE plpgsql',
+            is_mysql=False,
+            connection=connection)
+        for table_name in tables_names:
+            channel = generate_invalidation_channel(table_name)
+            await execute('DROP TRIGGER IF EXISTS '
+                          f'{INVALIDATION_TRIGGER_NAME} ON {table_name}',
+                          is_mysql=False,
+                          connection=connection)
+            await execute(f'CREATE TRIGGER {INVALIDATION_TRIGGER_NAME} '
+                          'AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE '
+                          f'ON {table_name} '
+                          'FOR EACH STATEMENT '
+                          'EXECUTE PROCEDURE '
+                          f'{INVALIDATION_FUNCTION_NAME}(\'{channel}\')',
+                          is_mysql=False,
+                          connection=connection)
+
+
+async def uninstall_invalidation_triggers(
+        *, tables_names: List[str],
+        connection: PostgresConnectionType) -> None:
+    # trigger function is kept since it may be used by other tables
+    async with begin_transaction(connection=connection,
+                                 is_mysql=False):
+        for table_name in tables_names:
+            await execute('DROP TRIGGER IF EXISTS '
+                          f'{INVALIDATION_TRIGGER_NAME} ON {table_name}',
+                          is_mysql=False,
+                          connection=connection)
@@ -1,23 +1,48 @@
+from asyncio import ensure_future
 from functools import partial
-from typing import (Optional,
+from typing import (Any,
+                    Optional,
+                    Callable,
+                    Coroutine,
+                    AsyncIterator,
+                    Union,
                     List,
                     Dict)
 
 from cetus.queries import (ALL_COLUMNS_ALIAS,
+                           queries_cache,
+                           generate_query_key,
+                           generate_filters_shape,
+                           start_query_build_span,
                            generate_select_query,
-                           generate_group_wise_query)
+                           generate_select_query_args,
+                           generate_group_wise_query,
+                           generate_group_wise_query_args,
+                           split_inclusion_filters)
 from cetus.types import (ConnectionType,
+                         PostgresRecordClassType,
                          RecordType,
                          ColumnValueType,
                          FiltersType,
                          OrderingType)
 
-from .execution import (fetch_row,
-                        fetch_rows)
-from .utils import (normalize_pagination,
+from .caching import (RequestsCoalescer,
+                      ResultsCache,
+                      generate_result_key,
+                      is_in_transaction)
+from .execution import (DEFAULT_STREAM_PREFETCH,
+                        fetch_row,
+                        fetch_rows,
+                        fetch_rows_stream)
+from .utils import (MYSQL_MAX_INCLUSION_VALUES_COUNT,
+                    are_plain_columns_names,
+                    normalize_pagination,
+                    iterate_records,
                     generate_table_columns_names,
                     generate_table_columns_aliases)
 
+DEFAULT_PAGE_SIZE = 1000
+
 
 async def fetch_column_function(
         *,
@@ -26,20 +51,29 @@ async def fetch_column_function(
         column_name: str,
         filters: Optional[FiltersType] = None,
         orderings: Optional[List[OrderingType]] = None,
+        results_cache: Optional[ResultsCache] = None,
+        coalescer: Optional[RequestsCoalescer] = None,
         is_mysql: bool,
         connection: ConnectionType,
         default: ColumnValueType = None) -> int:
     column_alias = f'{column_function_name}_1'
     function_column = (f'{column_function_name}({column_name}) '
                        f'AS {column_alias}')
-    query = generate_select_query(
-        table_name=table_name,
-        columns_names=[function_column],
-        filters=filters,
-        orderings=orderings)
-    res, = await fetch_row(query,
-                           is_mysql=is_mysql,
-                           connection=connection)
+    with start_query_build_span('fetch_column_function',
+                                table_name=table_name):
+        query, args = generate_select_query(
+            table_name=table_name,
+            columns_names=[function_column],
+            filters=filters,
+            orderings=orderings,
+            is_mysql=is_mysql,
+            parametrized=True)
+    res, = await fetch_cached(fetch_row, query, *args,
+                              table_name=table_name,
+                              results_cache=results_cache,
+                              coalescer=coalescer,
+                              is_mysql=is_mysql,
+                              connection=connection)
     return res if res is not None else default
 
 
@@ -62,25 +96,32 @@ async def group_wise_fetch_column_function(
         groupings: List[str],
         filters: Optional[FiltersType] = None,
         is_maximum: bool = True,
+        results_cache: Optional[ResultsCache] = None,
+        coalescer: Optional[RequestsCoalescer] = None,
         is_mysql: bool,
         connection: ConnectionType,
         default: ColumnValueType = 0) -> int:
     column_alias = f'{column_function_name}_1'
     function_column = (f'{column_function_name}({column_name}) '
                        f'AS {column_alias}')
-    query = generate_group_wise_query(
-        table_name=table_name,
-        columns_names=[function_column],
-
-        target_column_name=target_column_name,
-        filters=filters,
-        groupings=groupings,
-        is_maximum=is_maximum,
-        is_mysql=is_mysql)
+    with start_query_build_span('group_wise_fetch_column_function',
+                                table_name=table_name):
+        query, args = generate_group_wise_query(
+            table_name=table_name,
+            columns_names=[function_column],
+            target_column_name=target_column_name,
+            filters=filters,
+            groupings=groupings,
+            is_maximum=is_maximum,
+            is_mysql=is_mysql,
+            parametrized=True)
 
-    resp = await fetch_row(query,
-                           is_mysql=is_mysql,
-                           connection=connection)
+    resp = await fetch_cached(fetch_row, query, *args,
+                              table_name=table_name,
+                              results_cache=results_cache,
+                              coalescer=coalescer,
+                              is_mysql=is_mysql,
+                              connection=connection)
     return resp[0] if resp is not None else default
 
 
@@ -99,13 +140,173 @@ async def fetch(
         groupings: List[str] = None,
         limit: Optional[int] = None,
         offset: Optional[int] = None,
+        cursor: Optional[RecordType] = None,
+        native: bool = False,
+        record_class: Optional[PostgresRecordClassType] = None,
+        results_cache: Optional[ResultsCache] = None,
+        coalescer: Optional[RequestsCoalescer] = None,
         is_mysql: bool,
         connection: ConnectionType) -> List[RecordType]:
+    # in MySQL large `IN` predicates are split into chunks
+    # if the result doesn't depend on rows from other chunks
+    filters_can_be_split = (is_mysql
+                            and are_plain_columns_names(columns_names)
+                            and not (orderings
+                                     or groupings
+                                     or limit is not None
+                                     or offset is not None
+                                     or cursor is not None))
+    if filters_can_be_split:
+        filters_chunks = split_inclusion_filters(
+            filters,
+            max_values_count=MYSQL_MAX_INCLUSION_VALUES_COUNT)
+        if len(filters_chunks) > 1:
+            res = []
+            for filters_chunk in filters_chunks:
+                res += await fetch(table_name=table_name,
+                                   columns_names=columns_names,
+                                   columns_aliases=columns_aliases,
+                                   filters=filters_chunk,
+                                   native=native,
+                                   record_class=record_class,
+                                   results_cache=results_cache,
+                                   coalescer=coalescer,
+                                   is_mysql=is_mysql,
+                                   connection=connection)
+            return res
+
+    limit, offset = normalize_pagination(
+        limit=limit,
+        offset=offset,
+        is_mysql=is_mysql)
+
+    query = generate_cached_fetch_query(
+        table_name=table_name,
+        columns_names=columns_names,
+        columns_aliases=columns_aliases,
+        filters=filters,
+        orderings=orderings,
+        groupings=groupings,
+        limit=limit,
+        offset=offset,
+        cursor=cursor,
+        is_mysql=is_mysql)
+    args = generate_select_query_args(filters=filters,
+                                      limit=limit,
+                                      offset=offset,
+                                      cursor=cursor,
+                                      is_mysql=is_mysql)
+
+    resp = await fetch_cached(fetch_rows, query, *args,
+                              table_name=table_name,
+                              results_cache=results_cache,
+                              coalescer=coalescer,
+                              native=native,
+                              record_class=record_class,
+                              is_mysql=is_mysql,
+                              connection=connection)
+    return resp
+
+
+def fetch_stream(
+        *, table_name: str,
+        columns_names: List[str],
+        columns_aliases: Optional[Dict[str, str]] = None,
+        filters: Optional[FiltersType] = None,
+        orderings: Optional[List[OrderingType]] = None,
+        groupings: List[str] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        prefetch: int = DEFAULT_STREAM_PREFETCH,
+        chunked: bool = False,
+        native: bool = False,
+        record_class: Optional[PostgresRecordClassType] = None,
+        is_mysql: bool,
+        connection: ConnectionType
+) -> AsyncIterator[Union[RecordType, List[RecordType]]]:
+    # yields records (or chunks of records if "chunked" is set)
+    # fetched by server-side cursor,
+    # "connection" should not be used by caller until iteration stops
     limit, offset = normalize_pagination(
         limit=limit,
         offset=offset,
         is_mysql=is_mysql)
 
+    query = generate_cached_fetch_query(
+        table_name=table_name,
+        columns_names=columns_names,
+        columns_aliases=columns_aliases,
+        filters=filters,
+        orderings=orderings,
+        groupings=groupings,
+        limit=limit,
+        offset=offset,
+        is_mysql=is_mysql)
+    args = generate_select_query_args(filters=filters,
+                                      limit=limit,
+                                      offset=offset,
+                                      is_mysql=is_mysql)
+
+    records_chunks = fetch_rows_stream(query, *args,
+                                       prefetch=prefetch,
+                                       native=native,
+                                       record_class=record_class,
+                                       is_mysql=is_mysql,
+                                       connection=connection)
+    return iterate_records(records_chunks,
+                           chunked=chunked)
+
+
+def generate_cached_fetch_query(
+        *, table_name: str,
+        columns_names: List[str],
+        columns_aliases: Optional[Dict[str, str]] = None,
+        filters: Optional[FiltersType] = None,
+        orderings: Optional[List[OrderingType]] = None,
+        groupings: List[str] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        cursor: Optional[RecordType] = None,
+        is_mysql: bool) -> str:
+    query_key = generate_query_key(
+        'fetch',
+        table_name=table_name,
+        columns_names=columns_names,
+        columns_aliases=columns_aliases,
+        filters=generate_filters_shape(filters,
+                                       is_mysql=is_mysql),
+        orderings=orderings,
+        groupings=groupings,
+        limit=limit is not None,
+        offset=offset is not None,
+        cursor=cursor is not None,
+        is_mysql=is_mysql)
+    return queries_cache.get_or_generate(
+        query_key,
+        partial(generate_fetch_query,
+                table_name=table_name,
+                columns_names=columns_names,
+                columns_aliases=columns_aliases,
+                filters=filters,
+                orderings=orderings,
+                groupings=groupings,
+                limit=limit,
+                offset=offset,
+                cursor=cursor,
+                is_mysql=is_mysql))
+
+
+def generate_fetch_query(
+        *, table_name: str,
+        columns_names: List[str],
+        columns_aliases: Optional[Dict[str, str]] = None,
+        filters: Optional[FiltersType] = None,
+        orderings: Optional[List[OrderingType]] = None,
+        groupings: List[str] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        cursor: Optional[RecordType] = None,
+        is_mysql: bool) -> str:
     columns_aliases = generate_table_columns_aliases(
         columns_names=columns_names,
         columns_aliases=columns_aliases)
@@ -113,20 +314,80 @@ async def fetch(
         columns_names=columns_names,
         columns_aliases=columns_aliases)
 
-    query = generate_select_query(
+    query, _ = generate_select_query(
         table_name=table_name,
         columns_names=columns_names,
         filters=filters,
         orderings=orderings,
         groupings=groupings,
         limit=limit,
-        offset=offset)
-
-    resp = await fetch_rows(
-        query,
+        offset=offset,
+        cursor=cursor,
         is_mysql=is_mysql,
-        connection=connection)
-    return resp
+        parametrized=True)
+    return query
+
+
+async def fetch_pages(
+        *, table_name: str,
+        columns_names: List[str],
+        columns_aliases: Optional[Dict[str, str]] = None,
+        filters: Optional[FiltersType] = None,
+        orderings: List[OrderingType],
+        page_size: int = DEFAULT_PAGE_SIZE,
+        prefetch: bool = True,
+        is_mysql: bool,
+        connection: ConnectionType
+) -> AsyncIterator[List[RecordType]]:
+    # "orderings" columns should be a part of "columns_names"
+    # and should uniquely identify rows (e.g. end with primary key),
+    # with prefetching enabled "connection" should not be used
+    # by caller until iteration stops
+    cursor_indices = generate_cursor_indices(columns_names=columns_names,
+                                             orderings=orderings)
+    fetch_page = partial(fetch,
+                         table_name=table_name,
+                         columns_names=columns_names,
+                         columns_aliases=columns_aliases,
+                         filters=filters,
+                         orderings=orderings,
+                         limit=page_size,
+                         is_mysql=is_mysql,
+                         connection=connection)
+    page = await fetch_page()
+    while page:
+        if len(page) < page_size:
+            yield page
+            return
+        last_record = page[-1]
+        cursor = tuple(last_record[index]
+                       for index in cursor_indices)
+        if not prefetch:
+            yield page
+            page = await fetch_page(cursor=cursor)
+            continue
+        next_page = ensure_future(fetch_page(cursor=cursor))
+        try:
+            yield page
+        except BaseException:
+            next_page.cancel()
+            raise
+        page = await next_page
+
+
+def generate_cursor_indices(*, columns_names: List[str],
+                            orderings: List[OrderingType]) -> List[int]:
+    missing_columns_names = [column_name
+                             for column_name, _ in orderings or []
+                             if column_name not in columns_names]
+    if not orderings or missing_columns_names:
+        err_msg = ('Invalid keyset pagination parameters: '
+                   '"orderings" should be non-empty list '
+                   'with columns from "columns_names", '
+                   f'but found: "{orderings}".')
+        raise ValueError(err_msg)
+    return [columns_names.index(column_name)
+            for column_name, _ in orderings]
 
 
 async def group_wise_fetch(
@@ -140,6 +401,10 @@ async def group_wise_fetch(
         offset: Optional[int] = None,
         orderings: Optional[List[OrderingType]] = None,
         is_maximum: bool = True,
+        native: bool = False,
+        record_class: Optional[PostgresRecordClassType] = None,
+        results_cache: Optional[ResultsCache] = None,
+        coalescer: Optional[RequestsCoalescer] = None,
         is_mysql: bool,
         connection: ConnectionType) -> List[RecordType]:
     limit, offset = normalize_pagination(
@@ -147,6 +412,138 @@ async def group_wise_fetch(
         offset=offset,
         is_mysql=is_mysql)
 
+    query = generate_cached_group_wise_fetch_query(
+        table_name=table_name,
+        columns_names=columns_names,
+        columns_aliases=columns_aliases,
+        target_column_name=target_column_name,
+        groupings=groupings,
+        filters=filters,
+        limit=limit,
+        offset=offset,
+        orderings=orderings,
+        is_maximum=is_maximum,
+        is_mysql=is_mysql)
+    args = generate_group_wise_query_args(filters=filters,
+                                          limit=limit,
+                                          offset=offset,
+                                          is_mysql=is_mysql)
+
+    resp = await fetch_cached(fetch_rows, query, *args,
+                              table_name=table_name,
+                              results_cache=results_cache,
+                              coalescer=coalescer,
+                              native=native,
+                              record_class=record_class,
+                              is_mysql=is_mysql,
+                              connection=connection)
+    return resp
+
+
+def group_wise_fetch_stream(
+        *, table_name: str,
+        columns_names: List[str],
+        columns_aliases: Optional[Dict[str, str]] = None,
+        target_column_name: str,
+        groupings: List[str],
+        filters: Optional[FiltersType] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        orderings: Optional[List[OrderingType]] = None,
+        is_maximum: bool = True,
+        prefetch: int = DEFAULT_STREAM_PREFETCH,
+        chunked: bool = False,
+        native: bool = False,
+        record_class: Optional[PostgresRecordClassType] = None,
+        is_mysql: bool,
+        connection: ConnectionType
+) -> AsyncIterator[Union[RecordType, List[RecordType]]]:
+    limit, offset = normalize_pagination(
+        limit=limit,
+        offset=offset,
+        is_mysql=is_mysql)
+
+    query = generate_cached_group_wise_fetch_query(
+        table_name=table_name,
+        columns_names=columns_names,
+        columns_aliases=columns_aliases,
+        target_column_name=target_column_name,
+        groupings=groupings,
+        filters=filters,
+        limit=limit,
+        offset=offset,
+        orderings=orderings,
+        is_maximum=is_maximum,
+        is_mysql=is_mysql)
+    args = generate_group_wise_query_args(filters=filters,
+                                          limit=limit,
+                                          offset=offset,
+                                          is_mysql=is_mysql)
+
+    records_chunks = fetch_rows_stream(query, *args,
+                                       prefetch=prefetch,
+                                       native=native,
+                                       record_class=record_class,
+                                       is_mysql=is_mysql,
+                                       connection=connection)
+    return iterate_records(records_chunks,
+                           chunked=chunked)
+
+
+def generate_cached_group_wise_fetch_query(
+        *, table_name: str,
+        columns_names: List[str],
+        columns_aliases: Optional[Dict[str, str]] = None,
+        target_column_name: str,
+        groupings: List[str],
+        filters: Optional[FiltersType] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        orderings: Optional[List[OrderingType]] = None,
+        is_maximum: bool,
+        is_mysql: bool) -> str:
+    query_key = generate_query_key(
+        'group_wise_fetch',
+        table_name=table_name,
+        columns_names=columns_names,
+        columns_aliases=columns_aliases,
+        target_column_name=target_column_name,
+        groupings=groupings,
+        filters=generate_filters_shape(filters,
+                                       is_mysql=is_mysql),
+        limit=limit is not None,
+        offset=offset is not None,
+        orderings=orderings,
+        is_maximum=is_maximum,
+        is_mysql=is_mysql)
+    return queries_cache.get_or_generate(
+        query_key,
+        partial(generate_group_wise_fetch_query,
+                table_name=table_name,
+                columns_names=columns_names,
+                columns_aliases=columns_aliases,
+                target_column_name=target_column_name,
+                groupings=groupings,
+                filters=filters,
+                limit=limit,
+                offset=offset,
+                orderings=orderings,
+                is_maximum=is_maximum,
+                is_mysql=is_mysql))
+
+
+def generate_group_wise_fetch_query(
+        *, table_name: str,
+        columns_names: List[str],
+        columns_aliases: Optional[Dict[str, str]] = None,
+        target_column_name: str,
+        groupings: List[str],
+        filters: Optional[FiltersType] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        orderings: Optional[List[OrderingType]] = None,
+        is_maximum: bool,
+        is_mysql: bool) -> str:
     columns_aliases = generate_table_columns_aliases(
         columns_names=columns_names,
         columns_aliases=columns_aliases)
@@ -154,7 +551,7 @@ async def group_wise_fetch(
         columns_names=columns_names,
         columns_aliases=columns_aliases)
 
-    query = generate_group_wise_query(
+    query, _ = generate_group_wise_query(
         table_name=table_name,
         columns_names=columns_names,
         target_column_name=target_column_name,
@@ -164,12 +561,45 @@ async def group_wise_fetch(
         offset=offset,
         orderings=orderings,
         is_maximum=is_maximum,
-        is_mysql=is_mysql)
+        is_mysql=is_mysql,
+        parametrized=True)
+    return query
 
-    resp = await fetch_rows(query,
-                            is_mysql=is_mysql,
-                            connection=connection)
-    return resp
+
+async def fetch_cached(fetch_function: Callable[..., Coroutine],
+                       query: str,
+                       *args: ColumnValueType,
+                       table_name: str,
+                       results_cache: Optional[ResultsCache],
+                       coalescer: Optional[RequestsCoalescer],
+                       connection: ConnectionType,
+                       **options: Any) -> Any:
+    # "fetch_function" is `fetch_row` or `fetch_rows`,
+    # "options" are its parameters which affect result,
+    # with both cache and coalescer specified
+    # concurrent cache misses share single query;
+    # results read within transaction may be uncommitted
+    # or belong to old snapshot, so they are neither cached
+    # nor shared with other connections
+    fetch_result = partial(fetch_function, query, *args,
+                           connection=connection,
+                           **options)
+    if ((results_cache is not None or coalescer is not None)
+            and is_in_transaction(connection,
+                                  is_mysql=options['is_mysql'])):
+        results_cache = coalescer = None
+    if results_cache is None and coalescer is None:
+        return await fetch_result()
+    key = generate_result_key(query, *args,
+                              fetch_function_name=fetch_function.__name__,
+                              **options)
+    if coalescer is not None:
+        fetch_result = partial(coalescer.run, key, fetch_result,
+                               table_name=table_name)
+    if results_cache is None:
+        return await fetch_result()
+    return await results_cache.get_or_fetch(key, fetch_result,
+                                            table_name=table_name)
 
 
 async def fetch_max_connections(*, is_mysql: bool,
@@ -204,3 +634,17 @@ async def fetch_postgres_setting(*, setting_name: str,
                            is_mysql=False,
                            connection=connection)
     return resp[0]
+
+
+async def fetch_postgres_columns_types(*, table_name: str,
+                                       connection: ConnectionType
+                                       ) -> Dict[str, str]:
+    resp = await fetch_rows(
+        'SELECT attname, format_type(atttypid, atttypmod) '
+        'FROM pg_attribute '
+        'WHERE attrelid = $1::regclass '
+        'AND attnum > 0 AND NOT attisdropped',
+        table_name,
+        is_mysql=False,
+        connection=connection)
+    return dict(resp)
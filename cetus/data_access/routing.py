@@ -0,0 +1,250 @@
+import logging
+from asyncio import (AbstractEventLoop,
+                     CancelledError,
+                     ensure_future,
+                     sleep)
+from contextlib import AsyncExitStack
+from functools import partial
+from math import inf
+from typing import (Any,
+                    Optional,
+                    Callable,
+                    Coroutine,
+                    List)
+
+from asyncio_extras import async_contextmanager
+from cetus.types import (ConnectionType,
+                         ConnectionPoolType)
+from sqlalchemy.engine.url import URL
+
+from .connectors import (DEFAULT_CONNECTION_TIMEOUT,
+                         DEFAULT_MIN_CONNECTIONS_LIMIT,
+                         acquire_connection,
+                         get_connection_pool)
+from .execution import fetch_row
+from .hedging import ReadsHedger
+from .reading import (fetch,
+                      fetch_column_function,
+                      group_wise_fetch,
+                      group_wise_fetch_column_function)
+
+# in seconds
+DEFAULT_MAX_REPLICATION_LAG = 10
+DEFAULT_LAG_CHECK_INTERVAL = 5
+
+# functions which can be safely run on replicas
+READING_FUNCTIONS = {fetch,
+                     group_wise_fetch,
+                     fetch_column_function,
+                     group_wise_fetch_column_function}
+
+logger = logging.getLogger(__name__)
+
+
+class Replica:
+    # can be used as connection pool of single server
+    def __init__(self, connection_pool: ConnectionPoolType) -> None:
+        self.connection_pool = connection_pool
+        self.outstanding_requests_count = 0
+        # unknown until the first check
+        self.lag = inf
+
+    @async_contextmanager
+    async def acquire(self):
+        self.outstanding_requests_count += 1
+        try:
+            async with acquire_connection(
+                    self.connection_pool) as connection:
+                yield connection
+        finally:
+            self.outstanding_requests_count -= 1
+
+
+class RoutingConnectionPool:
+    # connections acquired with `acquire` are from primary
+    # and should be used for writes and transactions,
+    # connections acquired with `acquire_reading` are from replica
+    # with the least number of outstanding requests
+    # among ones which lag is within "max_replication_lag",
+    # falling back to primary if there are none
+    def __init__(self, *, primary_connection_pool: ConnectionPoolType,
+                 replicas_connection_pools: List[ConnectionPoolType],
+                 max_replication_lag: float = DEFAULT_MAX_REPLICATION_LAG,
+                 is_mysql: bool) -> None:
+        self.primary_connection_pool = primary_connection_pool
+        self.replicas = [Replica(connection_pool)
+                         for connection_pool in replicas_connection_pools]
+        self.max_replication_lag = max_replication_lag
+        self.is_mysql = is_mysql
+
+    def acquire(self):
+        return acquire_connection(self.primary_connection_pool)
+
+    def acquire_reading(self):
+        fresh_replicas = self.get_fresh_replicas()
+        if not fresh_replicas:
+            return acquire_connection(self.primary_connection_pool)
+        replica, *_ = fresh_replicas
+        return replica.acquire()
+
+    def get_fresh_replicas(self) -> List[Replica]:
+        # ordered by number of outstanding requests
+        return sorted((replica
+                       for replica in self.replicas
+                       if replica.lag <= self.max_replication_lag),
+                      key=lambda replica:
+                      replica.outstanding_requests_count)
+
+    def get_hedging_connection_pools(self) -> List[Any]:
+        # pools of different servers, so hedge doesn't hit
+        # the same server and MySQL query is killed
+        # on the server it runs on, if there are less than two
+        # fresh replicas then there is nothing to hedge with
+        fresh_replicas = self.get_fresh_replicas()
+        if not fresh_replicas:
+            return [self.primary_connection_pool]
+        return fresh_replicas[:2]
+
+    @property
+    def reading(self) -> 'ReadingConnectionPool':
+        return ReadingConnectionPool(self)
+
+    async def run(self, function: Callable[..., Coroutine], *,
+                  hedger: Optional[ReadsHedger] = None) -> Any:
+        # "function" is called with "connection" keyword argument,
+        # reading functions are routed to replicas
+        # and hedged with another replica if "hedger" is specified
+        if is_reading_function(function):
+            if hedger is not None:
+                res = await hedger.run(
+                    function,
+                    connection_pools=self.get_hedging_connection_pools())
+                return res
+            acquire = self.acquire_reading
+        else:
+            acquire = self.acquire
+        async with acquire() as connection:
+            res = await function(connection=connection)
+            return res
+
+    async def check_replicas_lags(self) -> None:
+        for replica in self.replicas:
+            try:
+                async with replica.connection_pool.acquire() as connection:
+                    replica.lag = await fetch_replication_lag(
+                        is_mysql=self.is_mysql,
+                        connection=connection)
+            except Exception as err:
+                # monitoring should go on if replica is unavailable
+                logger.warning('Error while checking replication lag, '
+                               'excluding replica from routing: '
+                               f'"{err}".')
+                replica.lag = inf
+
+    async def monitor_replicas_lags(self, *, interval: float) -> None:
+        while True:
+            await self.check_replicas_lags()
+            await sleep(interval)
+
+
+class ReadingConnectionPool:
+    # can be passed where plain pool is expected
+    # (e.g. to `run_concurrently` or `fetch_partitioned`)
+    def __init__(self, routing_connection_pool: RoutingConnectionPool
+                 ) -> None:
+        self.routing_connection_pool = routing_connection_pool
+
+    def acquire(self):
+        return self.routing_connection_pool.acquire_reading()
+
+
+def is_reading_function(function: Callable[..., Coroutine]) -> bool:
+    # nested partials are flattened by `functools`
+    while isinstance(function, partial):
+        function = function.func
+    return function in READING_FUNCTIONS
+
+
+async def fetch_replication_lag(*, is_mysql: bool,
+                                connection: ConnectionType) -> float:
+    if is_mysql:
+        return await fetch_mysql_replication_lag(connection)
+    return await fetch_postgres_replication_lag(connection)
+
+
+async def fetch_mysql_replication_lag(connection: ConnectionType
+                                      ) -> float:
+    async with connection.connection.cursor() as cursor:
+        await cursor.execute('SHOW SLAVE STATUS')
+        row = await cursor.fetchone()
+        if row is None:
+            # not a replica
+            return 0
+        columns_names = [column[0] for column in cursor.description]
+    lag = row[columns_names.index('Seconds_Behind_Master')]
+    # `NULL` means that replication is stopped
+    return inf if lag is None else lag
+
+
+async def fetch_postgres_replication_lag(connection: ConnectionType
+                                         ) -> float:
+    # replica with all received WAL replayed has no lag
+    # even if there were no recent transactions on primary,
+    # but only while WAL receiver is running (it has row
+    # in `pg_stat_wal_receiver` visible without privileges),
+    # otherwise replica may fall behind unnoticed,
+    # so its lag is unknown
+    lag, = await fetch_row(
+        'SELECT CASE '
+        'WHEN NOT pg_is_in_recovery() '
+        'THEN 0 '
+        'WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver) '
+        'THEN NULL '
+        'WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() '
+        'THEN 0 '
+        'ELSE EXTRACT(EPOCH FROM '
+        'now() - pg_last_xact_replay_timestamp()) '
+        'END',
+        is_mysql=False,
+        connection=connection)
+    return inf if lag is None else float(lag)
+
+
+@async_contextmanager
+async def get_routing_connection_pool(
+        *, primary_db_uri: URL,
+        replicas_db_uris: List[URL],
+        is_mysql: bool,
+        timeout: float = DEFAULT_CONNECTION_TIMEOUT,
+        min_size: int = DEFAULT_MIN_CONNECTIONS_LIMIT,
+        max_size: int,
+        max_replication_lag: float = DEFAULT_MAX_REPLICATION_LAG,
+        lag_check_interval: float = DEFAULT_LAG_CHECK_INTERVAL,
+        loop: AbstractEventLoop):
+    async with AsyncExitStack() as stack:
+        primary_connection_pool, *replicas_connection_pools = [
+            await stack.enter_async_context(get_connection_pool(
+                db_uri=db_uri,
+                is_mysql=is_mysql,
+                timeout=timeout,
+                min_size=min_size,
+                max_size=max_size,
+                loop=loop))
+            for db_uri in [primary_db_uri, *replicas_db_uris]]
+        connection_pool = RoutingConnectionPool(
+            primary_connection_pool=primary_connection_pool,
+            replicas_connection_pools=replicas_connection_pools,
+            max_replication_lag=max_replication_lag,
+            is_mysql=is_mysql)
+        # replicas are used only after their lags are known
+        await connection_pool.check_replicas_lags()
+        monitor = ensure_future(connection_pool.monitor_replicas_lags(
+            interval=lag_check_interval))
+        try:
+            yield connection_pool
+        finally:
+            monitor.cancel()
+            try:
+                await monitor
+            except CancelledError:
+                pass
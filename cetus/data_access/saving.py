@@ -1,30 +1,125 @@
+from collections import (defaultdict,
+                         deque)
+from collections.abc import AsyncIterable
+from functools import partial
 from itertools import chain
+from uuid import uuid4
 from typing import (Optional,
                     Iterable,
+                    Iterator,
                     List)
 
-from cetus.queries import (generate_insert_query,
+from cetus.queries import (queries_cache,
+                           generate_query_key,
+                           generate_insert_query,
+                           generate_staging_table_query,
+                           generate_staged_insert_query,
                            generate_select_query,
-                           generate_postgres_insert_returning_query)
+                           generate_postgres_insert_returning_query,
+                           start_query_build_span)
 from cetus.types import (ConnectionType,
                          RecordType,
-                         ColumnValueType)
+                         RecordsType,
+                         ColumnValueType,
+                         FiltersType)
 
+from .caching import invalidates_results
+from .connectors import begin_transaction
 from .execution import (execute_many,
-                        execute)
-from .reading import fetch_rows
+                        execute,
+                        fetch_row,
+                        copy_records)
+from .reading import (fetch_rows,
+                      fetch_mysql_setting)
+from .utils import (STAGING_TABLE_NAME_PREFIX,
+                    split_records)
 
+# `asyncpg` doesn't allow more than 32767 query arguments,
+# while PostgreSQL protocol itself allows 65535
+MAX_POSTGRES_QUERY_ARGUMENTS_COUNT = 32767
+# leaving room for query text and protocol overhead
+MYSQL_PACKET_SIZE_USAGE_RATIO = 0.9
+DEFAULT_COPY_CHUNK_SIZE = 10000
+DEFAULT_STAGING_BATCH_SIZE = 1000
+DEFAULT_RETURNING_BATCH_SIZE = 1000
 
+
+@invalidates_results
 async def insert(
         *,
         table_name: str,
         columns_names: List[str],
         unique_columns_names: Optional[List[str]] = None,
-        records: Iterable[RecordType],
+        records: RecordsType,
         merge: bool = False,
+        batch_size: Optional[int] = None,
+        max_packet_size: Optional[int] = None,
+        use_copy: bool = False,
+        copy_chunk_size: int = DEFAULT_COPY_CHUNK_SIZE,
+        staged: bool = False,
         is_mysql: bool,
         connection: ConnectionType) -> Optional[ColumnValueType]:
-    query = generate_insert_query(
+    # with "batch_size" specified records are inserted
+    # by multi-row statements instead of `executemany`,
+    # "max_packet_size" is MySQL "max_allowed_packet" setting value
+    # and is fetched from server if not specified;
+    # "use_copy" selects PostgreSQL binary `COPY` for plain inserts;
+    # "staged" makes upserts load records into temporary table
+    # and merge them with single set-based statement
+    if staged:
+        if not unique_columns_names:
+            err_msg = ('Invalid insertion parameters: '
+                       '"staged" is available only for upserts '
+                       'with "unique_columns_names", '
+                       f'but found: "{unique_columns_names}".')
+            raise ValueError(err_msg)
+        await insert_staged(table_name=table_name,
+                            columns_names=columns_names,
+                            unique_columns_names=unique_columns_names,
+                            records=records,
+                            merge=merge,
+                            batch_size=batch_size,
+                            max_packet_size=max_packet_size,
+                            copy_chunk_size=copy_chunk_size,
+                            is_mysql=is_mysql,
+                            connection=connection)
+        return
+
+    if use_copy and is_mysql:
+        err_msg = ('Invalid insertion parameters: '
+                   '"use_copy" is available only for PostgreSQL, '
+                   f'but found "is_mysql": "{is_mysql}".')
+        raise ValueError(err_msg)
+    if use_copy and unique_columns_names:
+        err_msg = ('Invalid insertion parameters: '
+                   '"use_copy" can not be combined '
+                   'with "unique_columns_names", '
+                   f'but found: "{unique_columns_names}".')
+        raise ValueError(err_msg)
+    if use_copy:
+        await copy_records(table_name,
+                           columns_names=columns_names,
+                           records=records,
+                           chunk_size=copy_chunk_size,
+                           connection=connection)
+        return
+
+    if isinstance(records, AsyncIterable):
+        records = [record async for record in records]
+
+    if batch_size is not None:
+        await insert_batches(table_name=table_name,
+                             columns_names=columns_names,
+                             unique_columns_names=unique_columns_names,
+                             records=records,
+                             merge=merge,
+                             batch_size=batch_size,
+                             max_packet_size=max_packet_size,
+                             is_mysql=is_mysql,
+                             connection=connection)
+        return
+
+    query = generate_cached_insert_query(
         table_name=table_name,
         columns_names=columns_names,
         unique_columns_names=unique_columns_names,
@@ -37,6 +132,206 @@ async def insert(
                        connection=connection)
 
 
+async def insert_staged(
+        *,
+        table_name: str,
+        columns_names: List[str],
+        unique_columns_names: List[str],
+        records: RecordsType,
+        merge: bool = False,
+        batch_size: Optional[int] = None,
+        max_packet_size: Optional[int] = None,
+        copy_chunk_size: int = DEFAULT_COPY_CHUNK_SIZE,
+        is_mysql: bool,
+        connection: ConnectionType) -> None:
+    staging_table_name = generate_staging_table_name()
+    with start_query_build_span('insert_staged',
+                                table_name=table_name):
+        staging_table_query = generate_staging_table_query(
+            table_name=table_name,
+            staging_table_name=staging_table_name,
+            columns_names=columns_names,
+            is_mysql=is_mysql)
+        staged_insert_query = generate_staged_insert_query(
+            table_name=table_name,
+            staging_table_name=staging_table_name,
+            columns_names=columns_names,
+            unique_columns_names=unique_columns_names,
+            merge=merge,
+            is_mysql=is_mysql)
+    async with begin_transaction(connection=connection,
+                                 is_mysql=is_mysql):
+        await execute(staging_table_query,
+                      is_mysql=is_mysql,
+                      connection=connection)
+        try:
+            if is_mysql:
+                if isinstance(records, AsyncIterable):
+                    records = [record async for record in records]
+                await insert_batches(
+                    table_name=staging_table_name,
+                    columns_names=columns_names,
+                    records=records,
+                    batch_size=batch_size or DEFAULT_STAGING_BATCH_SIZE,
+                    max_packet_size=max_packet_size,
+                    is_mysql=is_mysql,
+                    connection=connection)
+            else:
+                await copy_records(staging_table_name,
+                                   columns_names=columns_names,
+                                   records=records,
+                                   chunk_size=copy_chunk_size,
+                                   connection=connection)
+            await execute(staged_insert_query,
+                          is_mysql=is_mysql,
+                          connection=connection)
+        finally:
+            # PostgreSQL staging table is dropped on commit
+            if is_mysql:
+                await execute(f'DROP TEMPORARY TABLE {staging_table_name}',
+                              is_mysql=is_mysql,
+                              connection=connection)
+
+
+def generate_staging_table_name() -> str:
+    return STAGING_TABLE_NAME_PREFIX + uuid4().hex
+
+
+async def insert_batches(
+        *,
+        table_name: str,
+        columns_names: List[str],
+        unique_columns_names: Optional[List[str]] = None,
+        records: Iterable[RecordType],
+        merge: bool = False,
+        batch_size: int,
+        max_packet_size: Optional[int] = None,
+        is_mysql: bool,
+        connection: ConnectionType) -> None:
+    records_batches = await split_records_by_limits(
+        records,
+        columns_count=len(columns_names),
+        batch_size=batch_size,
+        max_packet_size=max_packet_size,
+        is_mysql=is_mysql,
+        connection=connection)
+    if unique_columns_names:
+        key_indices = [columns_names.index(column_name)
+                       for column_name in unique_columns_names]
+        records_batches = chain.from_iterable(
+            split_records_by_keys(records_batch,
+                                  key_indices=key_indices)
+            for records_batch in records_batches)
+    # batches are inserted atomically as by single `executemany`
+    async with begin_transaction(connection=connection,
+                                 isolation=None,
+                                 is_mysql=is_mysql):
+        for records_batch in records_batches:
+            query = generate_batch_insert_query(
+                table_name=table_name,
+                columns_names=columns_names,
+                unique_columns_names=unique_columns_names,
+                merge=merge,
+                records_count=len(records_batch),
+                batch_size=batch_size,
+                is_mysql=is_mysql)
+            await execute(query, *chain.from_iterable(records_batch),
+                          is_mysql=is_mysql,
+                          connection=connection)
+
+
+async def split_records_by_limits(
+        records: Iterable[RecordType], *,
+        columns_count: int,
+        batch_size: int,
+        max_packet_size: Optional[int] = None,
+        is_mysql: bool,
+        connection: ConnectionType) -> Iterator[List[RecordType]]:
+    if is_mysql:
+        if max_packet_size is None:
+            max_packet_size = int(await fetch_mysql_setting(
+                setting_name='max_allowed_packet',
+                connection=connection))
+        max_batch_size_in_bytes = int(max_packet_size
+                                      * MYSQL_PACKET_SIZE_USAGE_RATIO)
+        return split_records(
+            records,
+            batch_size=batch_size,
+            max_batch_size_in_bytes=max_batch_size_in_bytes)
+    batch_size = limit_postgres_batch_size(batch_size,
+                                           columns_count=columns_count)
+    return split_records(records,
+                         batch_size=batch_size)
+
+
+def limit_postgres_batch_size(batch_size: int, *,
+                              columns_count: int) -> int:
+    return min(batch_size,
+               MAX_POSTGRES_QUERY_ARGUMENTS_COUNT // columns_count)
+
+
+def generate_batch_insert_query(
+        *,
+        table_name: str,
+        columns_names: List[str],
+        unique_columns_names: Optional[List[str]] = None,
+        merge: bool,
+        records_count: int,
+        batch_size: int,
+        is_mysql: bool) -> str:
+    # only templates of full batches are cached
+    # since they may be large and remainders sizes vary
+    if not is_mysql:
+        batch_size = limit_postgres_batch_size(
+            batch_size,
+            columns_count=len(columns_names))
+    if records_count == batch_size:
+        return generate_cached_insert_query(
+            table_name=table_name,
+            columns_names=columns_names,
+            unique_columns_names=unique_columns_names,
+            merge=merge,
+            records_count=records_count,
+            is_mysql=is_mysql)
+    with start_query_build_span('insert',
+                                table_name=table_name):
+        return generate_insert_query(
+            table_name=table_name,
+            columns_names=columns_names,
+            unique_columns_names=unique_columns_names,
+            merge=merge,
+            records_count=records_count,
+            is_mysql=is_mysql)
+
+
+def generate_cached_insert_query(
+        *,
+        table_name: str,
+        columns_names: List[str],
+        unique_columns_names: Optional[List[str]] = None,
+        merge: bool,
+        records_count: int = 1,
+        is_mysql: bool) -> str:
+    query_key = generate_query_key(
+        'insert',
+        table_name=table_name,
+        columns_names=columns_names,
+        unique_columns_names=unique_columns_names,
+        merge=merge,
+        records_count=records_count,
+        is_mysql=is_mysql)
+    return queries_cache.get_or_generate(
+        query_key,
+        partial(generate_insert_query,
+                table_name=table_name,
+                columns_names=columns_names,
+                unique_columns_names=unique_columns_names,
+                merge=merge,
+                records_count=records_count,
+                is_mysql=is_mysql))
+
+
+@invalidates_results
 async def insert_returning(
         *,
         table_name: str,
@@ -46,49 +341,332 @@ async def insert_returning(
         primary_key: Optional[str] = None,
         records: Iterable[RecordType],
         merge: bool = False,
+        batch_size: Optional[int] = None,
         connection: ConnectionType,
-        is_mysql: bool) -> Optional[ColumnValueType]:
+        is_mysql: bool) -> List[Optional[RecordType]]:
+    # for PostgreSQL records are inserted one per statement
+    # unless "batch_size" is specified,
+    # for MySQL they are always inserted by batches
     if is_mysql:
         if primary_key is None:
             raise ValueError('In case of MySQL processing '
                              'primary key has to be specified, '
                              f'but found: "{primary_key}".')
-        insert_query = generate_insert_query(
+        resp = await insert_mysql_batches_returning(
             table_name=table_name,
             columns_names=columns_names,
             unique_columns_names=unique_columns_names,
+            returning_columns_names=returning_columns_names,
+            primary_key=primary_key,
+            records=records,
             merge=merge,
-            is_mysql=is_mysql)
-
-        for record in records:
-            await execute(insert_query,
-                          *record,
-                          is_mysql=is_mysql,
-                          connection=connection)
-        resp = await fetch_rows(
-            f'SELECT LAST_INSERT_ID({primary_key}) '
-            f'FROM {table_name}',
-            is_mysql=is_mysql,
+            batch_size=(DEFAULT_RETURNING_BATCH_SIZE
+                        if batch_size is None
+                        else batch_size),
             connection=connection)
-        primary_key_values = [row[0] for row in resp]
-        filters = 'IN', (primary_key, primary_key_values)
-        query = generate_select_query(table_name=table_name,
-                                      columns_names=returning_columns_names,
-                                      filters=filters)
-        resp = await fetch_rows(query,
-                                is_mysql=is_mysql,
-                                connection=connection)
     else:
-        query = generate_postgres_insert_returning_query(
+        resp = await insert_postgres_batches_returning(
+            table_name=table_name,
+            columns_names=columns_names,
+            unique_columns_names=unique_columns_names,
+            returning_columns_names=returning_columns_names,
+            records=records,
+            merge=merge,
+            batch_size=batch_size,
+            connection=connection)
+    return resp
+
+
+async def insert_postgres_batches_returning(
+        *,
+        table_name: str,
+        columns_names: List[str],
+        unique_columns_names: Optional[List[str]] = None,
+        returning_columns_names: List[str],
+        records: Iterable[RecordType],
+        merge: bool = False,
+        batch_size: Optional[int] = None,
+        connection: ConnectionType) -> List[Optional[RecordType]]:
+    # without "batch_size" records skipped
+    # by `ON CONFLICT DO NOTHING` have no rows,
+    # otherwise row is returned for each record
+    # and skipped records have `None` rows
+    if batch_size is None:
+        query = generate_cached_postgres_insert_returning_query(
             table_name=table_name,
             columns_names=columns_names,
             unique_columns_names=unique_columns_names,
             returning_columns_names=returning_columns_names,
             merge=merge)
-        resp = list(chain.from_iterable(
-            [await fetch_rows(query,
-                              *record,
-                              is_mysql=is_mysql,
+        return list(chain.from_iterable(
+            [await fetch_rows(query, *record,
+                              is_mysql=False,
                               connection=connection)
              for record in records]))
-    return resp
+
+    # order of rows returned by multi-row statement is not guaranteed,
+    # so they are matched with records by unique columns values
+    # (or by all inserted values if there are no unique columns)
+    key_columns_names = unique_columns_names or columns_names
+    key_indices = [columns_names.index(column_name)
+                   for column_name in key_columns_names]
+    batch_size = limit_postgres_batch_size(
+        batch_size,
+        columns_count=len(columns_names))
+    res = []
+    # unmatched rows error rolls back inserted batches
+    async with begin_transaction(connection=connection,
+                                 isolation=None,
+                                 is_mysql=False):
+        for records_batch in split_records(records,
+                                           batch_size=batch_size):
+            records_chunks = (
+                split_records_by_keys(records_batch,
+                                      key_indices=key_indices)
+                if unique_columns_names
+                else [records_batch])
+            for records_chunk in records_chunks:
+                query = generate_batch_insert_returning_query(
+                    table_name=table_name,
+                    columns_names=columns_names,
+                    unique_columns_names=unique_columns_names,
+                    returning_columns_names=[*key_columns_names,
+                                             *returning_columns_names],
+                    merge=merge,
+                    records_count=len(records_chunk),
+                    batch_size=batch_size)
+                rows = await fetch_rows(
+                    query, *chain.from_iterable(records_chunk),
+                    is_mysql=False,
+                    connection=connection)
+                res.extend(match_returned_rows(records_chunk, rows,
+                                               key_indices=key_indices))
+    return res
+
+
+def generate_batch_insert_returning_query(
+        *,
+        table_name: str,
+        columns_names: List[str],
+        unique_columns_names: Optional[List[str]] = None,
+        returning_columns_names: List[str],
+        merge: bool,
+        records_count: int,
+        batch_size: int) -> str:
+    # as well as for plain inserts
+    # only templates of full batches are cached
+    if records_count == batch_size:
+        return generate_cached_postgres_insert_returning_query(
+            table_name=table_name,
+            columns_names=columns_names,
+            unique_columns_names=unique_columns_names,
+            returning_columns_names=returning_columns_names,
+            merge=merge,
+            records_count=records_count)
+    with start_query_build_span('insert_returning',
+                                table_name=table_name):
+        return generate_postgres_insert_returning_query(
+            table_name=table_name,
+            columns_names=columns_names,
+            unique_columns_names=unique_columns_names,
+            returning_columns_names=returning_columns_names,
+            merge=merge,
+            records_count=records_count)
+
+
+def generate_cached_postgres_insert_returning_query(
+        *,
+        table_name: str,
+        columns_names: List[str],
+        unique_columns_names: Optional[List[str]] = None,
+        returning_columns_names: List[str],
+        merge: bool,
+        records_count: int = 1) -> str:
+    query_key = generate_query_key(
+        'insert_returning',
+        table_name=table_name,
+        columns_names=columns_names,
+        unique_columns_names=unique_columns_names,
+        returning_columns_names=returning_columns_names,
+        merge=merge,
+        records_count=records_count)
+    return queries_cache.get_or_generate(
+        query_key,
+        partial(generate_postgres_insert_returning_query,
+                table_name=table_name,
+                columns_names=columns_names,
+                unique_columns_names=unique_columns_names,
+                returning_columns_names=returning_columns_names,
+                merge=merge,
+                records_count=records_count))
+
+
+def split_records_by_keys(records: List[RecordType], *,
+                          key_indices: List[int]
+                          ) -> Iterator[List[RecordType]]:
+    # records with the same key are put into different chunks
+    # since single upsert statement can't affect row twice
+    records_chunk = []
+    records_chunk_keys = set()
+    for record in records:
+        key = tuple(record[index] for index in key_indices)
+        if key in records_chunk_keys:
+            yield records_chunk
+            records_chunk = []
+            records_chunk_keys = set()
+        records_chunk.append(record)
+        records_chunk_keys.add(key)
+    if records_chunk:
+        yield records_chunk
+
+
+def match_returned_rows(records: List[RecordType],
+                        rows: List[RecordType], *,
+                        key_indices: List[int]
+                        ) -> List[Optional[RecordType]]:
+    # each row starts with key columns values
+    key_columns_count = len(key_indices)
+    rows_by_keys = defaultdict(deque)
+    for row in rows:
+        rows_by_keys[tuple(row[:key_columns_count])].append(
+            tuple(row[key_columns_count:]))
+    res = []
+    for record in records:
+        key = tuple(record[index] for index in key_indices)
+        key_rows = rows_by_keys.get(key)
+        res.append(key_rows.popleft() if key_rows else None)
+    unmatched_rows_count = sum(map(len, rows_by_keys.values()))
+    if unmatched_rows_count:
+        # e.g. if values are changed by column type coercion
+        err_msg = ('Invalid returned rows: '
+                   'should match inserted records by key columns values, '
+                   f'but found {unmatched_rows_count} unmatched rows.')
+        raise ValueError(err_msg)
+    return res
+
+
+async def insert_mysql_batches_returning(
+        *,
+        table_name: str,
+        columns_names: List[str],
+        unique_columns_names: Optional[List[str]] = None,
+        returning_columns_names: List[str],
+        primary_key: str,
+        records: Iterable[RecordType],
+        merge: bool = False,
+        batch_size: int,
+        connection: ConnectionType) -> List[RecordType]:
+    # inserted rows are looked up by primary key values
+    # if they are specified explicitly (since then
+    # `LAST_INSERT_ID()` is not updated), by unique columns values
+    # in case of upsert (since then affected rows count
+    # includes updated rows twice), otherwise by range
+    # of generated primary key values
+    # which is consecutive for multi-row insert
+    # with known number of rows
+    if primary_key in columns_names:
+        lookup_columns_names = [primary_key]
+    elif unique_columns_names:
+        lookup_columns_names = unique_columns_names
+    else:
+        lookup_columns_names = None
+    if lookup_columns_names is not None:
+        lookup_columns_indices = [columns_names.index(column_name)
+                                  for column_name in lookup_columns_names]
+    records_batches = await split_records_by_limits(
+        records,
+        columns_count=len(columns_names),
+        batch_size=batch_size,
+        is_mysql=True,
+        connection=connection)
+    res = []
+    # missing rows error rolls back inserted batches
+    async with begin_transaction(connection=connection,
+                                 is_mysql=True):
+        for records_batch in records_batches:
+            query = generate_cached_insert_query(
+                table_name=table_name,
+                columns_names=columns_names,
+                unique_columns_names=unique_columns_names,
+                merge=merge,
+                records_count=len(records_batch),
+                is_mysql=True)
+            inserted_records_count = await execute(
+                query, *chain.from_iterable(records_batch),
+                is_mysql=True,
+                connection=connection)
+            if lookup_columns_names is None:
+                lookup_keys = await fetch_mysql_inserted_primary_keys(
+                    inserted_records_count=inserted_records_count,
+                    connection=connection)
+                if not lookup_keys:
+                    continue
+                filters = 'BETWEEN', (primary_key, (lookup_keys[0][0],
+                                                    lookup_keys[-1][0]))
+                rows_lookup_columns_names = [primary_key]
+            else:
+                lookup_keys = [tuple(record[index]
+                                     for index in lookup_columns_indices)
+                               for record in records_batch]
+                filters = generate_lookup_filters(
+                    lookup_columns_names=lookup_columns_names,
+                    lookup_keys=lookup_keys)
+                rows_lookup_columns_names = lookup_columns_names
+            with start_query_build_span('insert_returning_lookup',
+                                        table_name=table_name):
+                query, args = generate_select_query(
+                    table_name=table_name,
+                    columns_names=[*rows_lookup_columns_names,
+                                   *returning_columns_names],
+                    filters=filters,
+                    is_mysql=True,
+                    parametrized=True)
+            rows = await fetch_rows(query, *args,
+                                    is_mysql=True,
+                                    connection=connection)
+            lookup_columns_count = len(rows_lookup_columns_names)
+            rows_by_lookup_keys = {
+                tuple(row[:lookup_columns_count]): tuple(
+                    row[lookup_columns_count:])
+                for row in rows}
+            # keys may not match rows after collation or type coercion
+            missing_lookup_keys = [lookup_key
+                                   for lookup_key in lookup_keys
+                                   if lookup_key not in rows_by_lookup_keys]
+            if missing_lookup_keys:
+                err_msg = ('Inserted rows should be found by '
+                           f'"{rows_lookup_columns_names}" values, '
+                           'but not found rows for: '
+                           f'"{missing_lookup_keys}".')
+                raise ValueError(err_msg)
+            res.extend(rows_by_lookup_keys[lookup_key]
+                       for lookup_key in lookup_keys)
+    return res
+
+
+async def fetch_mysql_inserted_primary_keys(
+        *,
+        inserted_records_count: int,
+        connection: ConnectionType) -> List[RecordType]:
+    # `LAST_INSERT_ID()` returns value generated
+    # for the first row of the last insert statement
+    first_primary_key, increment = await fetch_row(
+        'SELECT LAST_INSERT_ID(), @@auto_increment_increment',
+        is_mysql=True,
+        connection=connection)
+    return [(first_primary_key + increment * index,)
+            for index in range(inserted_records_count)]
+
+
+def generate_lookup_filters(*,
+                            lookup_columns_names: List[str],
+                            lookup_keys: List[RecordType]) -> FiltersType:
+    if len(lookup_columns_names) == 1:
+        lookup_column_name, = lookup_columns_names
+        return 'IN', (lookup_column_name,
+                      [lookup_key[0] for lookup_key in lookup_keys])
+    return 'OR', [('AND', [('=', (column_name, value))
+                           for column_name, value in zip(
+                               lookup_columns_names,
+                               lookup_key)])
+                  for lookup_key in lookup_keys]
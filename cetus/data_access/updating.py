@@ -1,13 +1,33 @@
-from typing import Optional
+from functools import partial
+from itertools import chain
+from typing import (Optional,
+                    Iterable,
+                    List)
 
 from cetus.data_access.execution import execute
-from cetus.queries import generate_update_query
+from cetus.queries import (queries_cache,
+                           generate_query_key,
+                           generate_filters_shape,
+                           generate_update_query,
+                           generate_update_query_args,
+                           generate_update_many_query,
+                           split_inclusion_filters)
 from cetus.types import (ConnectionType,
                          ColumnValueType,
+                         RecordType,
                          UpdatesType,
                          FiltersType)
 
+from .caching import invalidates_results
+from .connectors import begin_transaction
+from .reading import fetch_postgres_columns_types
+from .saving import split_records_by_limits
+from .utils import MYSQL_MAX_INCLUSION_VALUES_COUNT
 
+DEFAULT_UPDATE_MANY_BATCH_SIZE = 1000
+
+
+@invalidates_results
 async def update(
         *,
         table_name: str,
@@ -15,11 +35,118 @@ async def update(
         filters: Optional[FiltersType] = None,
         is_mysql: bool,
         connection: ConnectionType) -> Optional[ColumnValueType]:
-    query = generate_update_query(
+    if is_mysql:
+        filters_chunks = split_inclusion_filters(
+            filters,
+            max_values_count=MYSQL_MAX_INCLUSION_VALUES_COUNT)
+        if len(filters_chunks) > 1:
+            async with begin_transaction(connection=connection,
+                                         is_mysql=is_mysql):
+                for filters_chunk in filters_chunks:
+                    await update(table_name=table_name,
+                                 updates=updates,
+                                 filters=filters_chunk,
+                                 is_mysql=is_mysql,
+                                 connection=connection)
+            return
+
+    query_key = generate_query_key(
+        'update',
         table_name=table_name,
-        updates=updates,
-        filters=filters)
+        updates=list(updates.keys()),
+        filters=generate_filters_shape(filters,
+                                       is_mysql=is_mysql),
+        is_mysql=is_mysql)
+    query = queries_cache.get_or_generate(
+        query_key,
+        partial(generate_update_query_str,
+                table_name=table_name,
+                updates=updates,
+                filters=filters,
+                is_mysql=is_mysql))
+    args = generate_update_query_args(updates=updates,
+                                      filters=filters,
+                                      is_mysql=is_mysql)
 
-    await execute(query,
+    await execute(query, *args,
                   is_mysql=is_mysql,
                   connection=connection)
+
+
+def generate_update_query_str(
+        *,
+        table_name: str,
+        updates: UpdatesType,
+        filters: Optional[FiltersType] = None,
+        is_mysql: bool) -> str:
+    query, _ = generate_update_query(
+        table_name=table_name,
+        updates=updates,
+        filters=filters,
+        is_mysql=is_mysql,
+        parametrized=True)
+    return query
+
+
+@invalidates_results
+async def update_many(
+        *,
+        table_name: str,
+        key_columns_names: List[str],
+        update_columns_names: List[str],
+        records: Iterable[RecordType],
+        batch_size: int = DEFAULT_UPDATE_MANY_BATCH_SIZE,
+        max_packet_size: Optional[int] = None,
+        is_mysql: bool,
+        connection: ConnectionType) -> None:
+    # each record contains values of key columns
+    # followed by values of update columns,
+    # rows are updated by batches within single transaction
+    columns_names = [*key_columns_names, *update_columns_names]
+    if is_mysql:
+        columns_types = None
+    else:
+        table_columns_types = await fetch_postgres_columns_types(
+            table_name=table_name,
+            connection=connection)
+        unknown_columns_names = [column_name
+                                 for column_name in columns_names
+                                 if column_name not in table_columns_types]
+        if unknown_columns_names:
+            err_msg = ('Invalid column name: '
+                       f'should be column of "{table_name}" table, '
+                       f'but found: "{unknown_columns_names}".')
+            raise ValueError(err_msg)
+        columns_types = {column_name: table_columns_types[column_name]
+                         for column_name in columns_names}
+    records_batches = await split_records_by_limits(
+        records,
+        columns_count=len(columns_names),
+        batch_size=batch_size,
+        max_packet_size=max_packet_size,
+        is_mysql=is_mysql,
+        connection=connection)
+    async with begin_transaction(connection=connection,
+                                 is_mysql=is_mysql):
+        for records_batch in records_batches:
+            records_count = len(records_batch)
+            query_key = generate_query_key(
+                'update_many',
+                table_name=table_name,
+                key_columns_names=key_columns_names,
+                update_columns_names=update_columns_names,
+                records_count=records_count,
+                columns_types=columns_types,
+                is_mysql=is_mysql)
+            query = queries_cache.get_or_generate(
+                query_key,
+                partial(generate_update_many_query,
+                        table_name=table_name,
+                        key_columns_names=key_columns_names,
+                        update_columns_names=update_columns_names,
+                        records_count=records_count,
+                        columns_types=columns_types,
+                        is_mysql=is_mysql))
+            await execute(query, *chain.from_iterable(records_batch),
+                          is_mysql=is_mysql,
+                          connection=connection)
@@ -1,20 +1,35 @@
 import logging
+import re
+from collections.abc import AsyncIterable
 from functools import wraps
 from typing import (Any,
                     Optional,
                     Callable,
                     Coroutine,
+                    AsyncIterator,
+                    Iterable,
+                    Iterator,
                     Dict,
                     Tuple,
+                    Union,
                     List)
 
 from asyncpg import PostgresError
 from pymysql import Error
+from cetus.types import (RecordType,
+                         RecordsType,
+                         PostgresRecordClassType)
 from sqlalchemy.engine.url import URL
 
 MYSQL_DRIVER_NAME_PREFIX = 'mysql'
 # to make pagination without limit
 MYSQL_MAX_BIGINT_VALUE = 18_446_744_073_709_551_615
+# larger `IN` predicates are split into several statements
+MYSQL_MAX_INCLUSION_VALUES_COUNT = 1000
+# optionally qualified column name or all columns alias
+PLAIN_COLUMN_NAME_PATTERN = re.compile(r'(\w+\.)?(\w+|\*)')
+# results in names not longer than `MAX_IDENTIFIER_LENGTH`
+STAGING_TABLE_NAME_PREFIX = 'cetus_staging_'
 
 logger = logging.getLogger(__name__)
 
@@ -36,11 +51,50 @@ def handle_exceptions(function: Callable[..., Coroutine]
     return decorated
 
 
+def handle_stream_exceptions(function: Callable[..., AsyncIterator]
+                             ) -> Callable[..., AsyncIterator]:
+    @wraps(function)
+    async def decorated(query: str,
+                        *args: Tuple[Any, ...],
+                        **kwargs: Dict[str, Any]):
+        stream = function(query, *args, **kwargs)
+        try:
+            async for res in stream:
+                yield res
+        except (Error, PostgresError) as err:
+            err_msg = ('Error while processing '
+                       f'query: "{query}".')
+            raise IOError(err_msg) from err
+        finally:
+            # releasing server-side cursor
+            # even if iteration was interrupted
+            await stream.aclose()
+
+    return decorated
+
+
 def is_db_uri_mysql(db_uri: URL) -> bool:
     backend_name = db_uri.get_backend_name()
     return backend_name == MYSQL_DRIVER_NAME_PREFIX
 
 
+def are_plain_columns_names(columns_names: List[str]) -> bool:
+    # e.g. aggregates or `DISTINCT` are not plain columns
+    return all(PLAIN_COLUMN_NAME_PATTERN.fullmatch(column_name.strip())
+               for column_name in columns_names)
+
+
+def check_record_class(record_class: Optional[PostgresRecordClassType],
+                       *,
+                       is_mysql: bool) -> None:
+    if is_mysql and record_class is not None:
+        err_msg = ('Invalid record class: '
+                   'custom record classes are supported '
+                   'only for Postgres connections, '
+                   f'but found: "{record_class}".')
+        raise ValueError(err_msg)
+
+
 def normalize_pagination(
         *, limit: Optional[int],
         offset: Optional[int],
@@ -79,3 +133,81 @@ def generate_table_columns_aliases(
     return [
         f'{columns_aliases.get(column_name, column_name)}'
         for column_name in columns_names]
+
+
+def check_batch_size(batch_size: int) -> None:
+    # otherwise records are never split
+    if batch_size <= 0:
+        err_msg = ('Invalid batch size: '
+                   'should be positive integer, '
+                   f'but found: "{batch_size}".')
+        raise ValueError(err_msg)
+
+
+def split_records(records: Iterable[RecordType], *,
+                  batch_size: int,
+                  max_batch_size_in_bytes: Optional[int] = None
+                  ) -> Iterator[List[RecordType]]:
+    check_batch_size(batch_size)
+    batch = []
+    batch_size_in_bytes = 0
+    for record in records:
+        if max_batch_size_in_bytes is not None:
+            record_size_in_bytes = estimate_record_size(record)
+            batch_is_overflowed = (batch_size_in_bytes + record_size_in_bytes
+                                   > max_batch_size_in_bytes)
+            if batch and batch_is_overflowed:
+                yield batch
+                batch = []
+                batch_size_in_bytes = 0
+            batch_size_in_bytes += record_size_in_bytes
+        batch.append(record)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+            batch_size_in_bytes = 0
+    if batch:
+        yield batch
+
+
+async def split_records_async(records: RecordsType, *,
+                              batch_size: int
+                              ) -> AsyncIterator[List[RecordType]]:
+    check_batch_size(batch_size)
+    if not isinstance(records, AsyncIterable):
+        for batch in split_records(records,
+                                   batch_size=batch_size):
+            yield batch
+        return
+    batch = []
+    async for record in records:
+        batch.append(record)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def estimate_record_size(record: RecordType) -> int:
+    # upper bound of record's literal size in query in bytes,
+    # each encoded character may be escaped
+    # and each value is quoted and separated
+    return sum(2 * len(str(value).encode()) + 4
+               for value in record)
+
+
+async def iterate_records(records_chunks: AsyncIterator[List[RecordType]],
+                          *,
+                          chunked: bool
+                          ) -> AsyncIterator[Union[RecordType,
+                                                   List[RecordType]]]:
+    try:
+        async for records_chunk in records_chunks:
+            if chunked:
+                yield records_chunk
+                continue
+            for record in records_chunk:
+                yield record
+    finally:
+        await records_chunks.aclose()
@@ -1,9 +1,22 @@
+from .caching import (QueriesCache,
+                      queries_cache,
+                      generate_query_key,
+                      start_query_build_span,
+                      to_hashable)
 from .deletion import generate_delete_query
+from .filters import (generate_filters_shape,
+                      split_inclusion_filters)
 from .reading import (generate_select_query,
-                      generate_group_wise_query)
+                      generate_select_query_args,
+                      generate_group_wise_query,
+                      generate_group_wise_query_args)
 from .saving import (generate_insert_query,
+                     generate_staging_table_query,
+                     generate_staged_insert_query,
                      generate_postgres_insert_returning_query)
-from .updating import generate_update_query
+from .updating import (generate_update_query,
+                       generate_update_query_args,
+                       generate_update_many_query)
 from .utils import (ALL_COLUMNS_ALIAS,
                     ORDERS_ALIASES)
 
@@ -0,0 +1,106 @@
+from collections import (OrderedDict,
+                         namedtuple)
+from typing import (Any,
+                    Callable,
+                    Hashable,
+                    Optional)
+
+from cetus.tracing import get_tracer
+
+DEFAULT_QUERIES_CACHE_SIZE = 1024
+
+CacheStatistics = namedtuple('CacheStatistics',
+                             ['hits', 'misses', 'evictions',
+                              'size', 'max_size'])
+
+
+class QueriesCache:
+    def __init__(self, max_size: int = DEFAULT_QUERIES_CACHE_SIZE
+                 ) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._queries = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[str]:
+        try:
+            query = self._queries[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._queries.move_to_end(key)
+        self.hits += 1
+        return query
+
+    def put(self, key: Hashable, query: str) -> None:
+        self._queries[key] = query
+        self._queries.move_to_end(key)
+        while len(self._queries) > self.max_size:
+            self._queries.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_generate(self, key: Hashable,
+                        generate: Callable[[], str]) -> str:
+        with get_tracer().start_span('query.build') as span:
+            query = self.get(key)
+            span.set_attribute('cached', query is not None)
+            if span.recording:
+                set_query_key_attributes(span, key)
+            if query is None:
+                query = generate()
+                self.put(key, query)
+            return query
+
+    def clear(self) -> None:
+        self._queries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    @property
+    def statistics(self) -> CacheStatistics:
+        return CacheStatistics(hits=self.hits,
+                               misses=self.misses,
+                               evictions=self.evictions,
+                               size=len(self._queries),
+                               max_size=self.max_size)
+
+
+queries_cache = QueriesCache()
+
+
+def generate_query_key(query_name: str,
+                       **shape: Any) -> Hashable:
+    # shape should not contain values which are bound as arguments,
+    # only parts which affect query text
+    return (query_name,
+            *[(parameter_name, to_hashable(parameter_value))
+              for parameter_name, parameter_value in shape.items()])
+
+
+def start_query_build_span(query_name: str, *,
+                           table_name: str):
+    # for queries which are not cached,
+    # e.g. with unique names or aggregate columns
+    return get_tracer().start_span('query.build',
+                                   cached=False,
+                                   query_name=query_name,
+                                   table=table_name)
+
+
+def set_query_key_attributes(span, key: Hashable) -> None:
+    if not isinstance(key, tuple):
+        return
+    query_name, *shape = key
+    span.set_attribute('query_name', query_name)
+    table_name = dict(shape).get('table_name')
+    if table_name is not None:
+        span.set_attribute('table', table_name)
+
+
+def to_hashable(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return frozenset((key, to_hashable(sub_value))
+                         for key, sub_value in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(map(to_hashable, value))
+    return value
@@ -1,12 +1,23 @@
-from typing import Optional
+from typing import (Optional,
+                    Union)
 
 from cetus.queries.filters import add_filters
-from cetus.types import FiltersType
+from cetus.types import (FiltersType,
+                         ParametrizedQueryType)
 
 
 def generate_delete_query(
         *, table_name: str,
-        filters: Optional[FiltersType]) -> str:
+        filters: Optional[FiltersType],
+        is_mysql: bool = False,
+        parametrized: bool = False
+        ) -> Union[str, ParametrizedQueryType]:
+    args = [] if parametrized else None
     query = f'DELETE FROM {table_name} '
-    query = add_filters(query, filters=filters)
+    query = add_filters(query,
+                        filters=filters,
+                        args=args,
+                        is_mysql=is_mysql)
+    if parametrized:
+        return query, args
     return query
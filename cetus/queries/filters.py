@@ -1,63 +1,248 @@
-from typing import Optional, Tuple, Any
+from functools import partial
+from typing import (Optional, Tuple,
+                    Any, Hashable,
+                    List)
 
 from cetus.types import (FiltersType,
-                         FilterType)
+                         FilterType,
+                         OrderingType,
+                         RecordType,
+                         ArgumentsType)
 from cetus.utils import join_str
 
-from .utils import normalize_value
+from .utils import (ORDERS_ALIASES,
+                    normalize_value,
+                    bind_value)
 
 LOGICAL_OPERATORS = {'AND', 'OR'}
 INCLUSION_OPERATORS = {'IN', 'NOT IN'}
 RANGE_OPERATORS = {'BETWEEN'}
+# in parametrized PostgreSQL queries
+# values lists are bound as single array argument
+ARRAY_INCLUSION_OPERATORS = {'IN': '= ANY',
+                             'NOT IN': '<> ALL'}
+# right-hand side of these operators
+# can't be a parameter placeholder
+IDENTITY_OPERATORS = {'IS', 'IS NOT'}
 COMPARISON_OPERATORS = {'=', '!=',
                         '<', '>',
                         '<=', '>=',
-                        'IS', 'IS NOT',
-                        'LIKE', 'NOT LIKE'}
+                        'LIKE', 'NOT LIKE'} | IDENTITY_OPERATORS
 PREDICATES = (INCLUSION_OPERATORS
               | RANGE_OPERATORS
               | COMPARISON_OPERATORS)
 
 
 def add_filters(query: str, *,
-                filters: Optional[Tuple[str, Any]]
+                filters: Optional[Tuple[str, Any]],
+                args: Optional[ArgumentsType] = None,
+                is_mysql: bool = False
                 ) -> str:
     if filters:
-        filters = filters_to_str(filters)
+        filters = filters_to_str(filters,
+                                 args=args,
+                                 is_mysql=is_mysql)
         query += f'WHERE {filters} '
     return query
 
 
-def filters_to_str(filters: FiltersType) -> str:
+def add_keyset_filters(query: str, *,
+                       filters: Optional[FiltersType],
+                       orderings: Optional[List[OrderingType]],
+                       cursor: Optional[RecordType],
+                       args: Optional[ArgumentsType] = None,
+                       is_mysql: bool = False
+                       ) -> str:
+    if cursor is None:
+        return add_filters(query,
+                           filters=filters,
+                           args=args,
+                           is_mysql=is_mysql)
+    conditions = []
+    if filters:
+        conditions.append(filters_to_str(filters,
+                                         args=args,
+                                         is_mysql=is_mysql))
+    conditions.append(keyset_to_str(orderings=orderings,
+                                    cursor=cursor,
+                                    args=args,
+                                    is_mysql=is_mysql))
+    conditions = 'AND'.join(f'({condition})'
+                            for condition in conditions)
+    return query + f'WHERE {conditions} '
+
+
+def keyset_to_str(*,
+                  orderings: Optional[List[OrderingType]],
+                  cursor: RecordType,
+                  args: Optional[ArgumentsType] = None,
+                  is_mysql: bool = False) -> str:
+    # based on article
+    # https://use-the-index-luke.com/no-offset
+    check_keyset_parameters(orderings=orderings,
+                            cursor=cursor)
+    _, order = orderings[0]
+    operator = '>' if order.upper() == ORDERS_ALIASES['ascending'] else '<'
+    columns = join_str(column_name
+                       for column_name, _ in orderings)
+    values = join_str(bind_value(value,
+                                 args=args,
+                                 is_mysql=is_mysql)
+                      for value in cursor)
+    return f'({columns}) {operator} ({values})'
+
+
+def check_keyset_parameters(
+        *,
+        orderings: Optional[List[OrderingType]],
+        cursor: RecordType) -> None:
+    if not orderings or len(orderings) != len(cursor):
+        err_msg = ('Invalid keyset pagination parameters: '
+                   '"cursor" should have value '
+                   'for each of "orderings" columns, '
+                   f'but found: "{cursor}" '
+                   f'for "{orderings}".')
+        raise ValueError(err_msg)
+    orders = {order.upper() for _, order in orderings}
+    if len(orders) > 1:
+        err_msg = ('Invalid keyset pagination parameters: '
+                   'row values comparison requires '
+                   'all of "orderings" to have the same order, '
+                   f'but found: "{orderings}".')
+        raise ValueError(err_msg)
+
+
+def filters_to_str(filters: FiltersType, *,
+                   args: Optional[ArgumentsType] = None,
+                   is_mysql: bool = False) -> str:
     operator, filter_ = filters
     if operator in LOGICAL_OPERATORS:
-        sub_filters = [filters_to_str(sub_filter)
+        sub_filters = [filters_to_str(sub_filter,
+                                      args=args,
+                                      is_mysql=is_mysql)
                        for sub_filter in filter_]
         return operator.join(f'({sub_filter})'
                              for sub_filter in sub_filters)
     elif operator in PREDICATES:
         res = predicate_to_str(predicate_name=operator,
-                               filter_=filter_)
+                               filter_=filter_,
+                               args=args,
+                               is_mysql=is_mysql)
         return res
     else:
-        err_msg = ('Invalid filters operator: '
-                   f'"{operator}" is not found '
-                   f'in logical operators '
-                   f'and predicates lists.')
-        raise ValueError(err_msg)
+        raise ValueError(generate_invalid_operator_message(operator))
 
 
 def predicate_to_str(
         *,
         predicate_name: str,
-        filter_: FilterType) -> str:
+        filter_: FilterType,
+        args: Optional[ArgumentsType] = None,
+        is_mysql: bool = False) -> str:
     column_name, value = filter_
+    bind = partial(bind_value,
+                   args=args,
+                   is_mysql=is_mysql)
     if predicate_name in INCLUSION_OPERATORS:
-        value = map(normalize_value, value)
+        if args is not None and not is_mysql:
+            value = bind(list(value))
+            predicate_name = ARRAY_INCLUSION_OPERATORS[predicate_name]
+            return f'{column_name} {predicate_name}({value})'
+        value = map(bind, value)
         value = f'({join_str(value)})'
     elif predicate_name in RANGE_OPERATORS:
-        value = map(normalize_value, value)
+        value = map(bind, value)
         value = ' AND '.join(value)
-    else:
+    elif predicate_name in IDENTITY_OPERATORS:
         value = normalize_value(value)
+    else:
+        value = bind(value)
     return f'{column_name} {predicate_name} {value}'
+
+
+def generate_filters_shape(filters: Optional[FiltersType], *,
+                           is_mysql: bool) -> Hashable:
+    # everything that affects parametrized filters string
+    # except for values bound as arguments
+    if not filters:
+        return None
+    operator, filter_ = filters
+    if operator in LOGICAL_OPERATORS:
+        return operator, tuple(generate_filters_shape(sub_filter,
+                                                      is_mysql=is_mysql)
+                               for sub_filter in filter_)
+    elif operator in PREDICATES:
+        column_name, value = filter_
+        if operator in INCLUSION_OPERATORS and not is_mysql:
+            return operator, column_name
+        elif operator in INCLUSION_OPERATORS | RANGE_OPERATORS:
+            return operator, column_name, len(value)
+        elif operator in IDENTITY_OPERATORS:
+            return operator, column_name, normalize_value(value)
+        return operator, column_name
+    else:
+        raise ValueError(generate_invalid_operator_message(operator))
+
+
+def generate_filters_args(filters: Optional[FiltersType], *,
+                          args: ArgumentsType,
+                          is_mysql: bool) -> ArgumentsType:
+    # should collect values in the same order
+    # as they are bound by `filters_to_str`
+    if not filters:
+        return args
+    operator, filter_ = filters
+    if operator in LOGICAL_OPERATORS:
+        for sub_filter in filter_:
+            generate_filters_args(sub_filter,
+                                  args=args,
+                                  is_mysql=is_mysql)
+    elif operator in INCLUSION_OPERATORS and not is_mysql:
+        _, value = filter_
+        args.append(list(value))
+    elif operator in INCLUSION_OPERATORS | RANGE_OPERATORS:
+        _, value = filter_
+        args.extend(value)
+    elif operator not in IDENTITY_OPERATORS:
+        _, value = filter_
+        args.append(value)
+    return args
+
+
+def split_inclusion_filters(filters: Optional[FiltersType], *,
+                            max_values_count: int
+                            ) -> List[Optional[FiltersType]]:
+    # splits first found `IN` predicate with too many values,
+    # results of filtering by each of returned filters
+    # are disjoint and give the original one in union,
+    # so only conjunctions are traversed
+    if not filters:
+        return [filters]
+    operator, filter_ = filters
+    if operator == 'IN':
+        column_name, values = filter_
+        # removing duplicates to keep results disjoint
+        values = list(dict.fromkeys(values))
+        if len(values) <= max_values_count:
+            return [filters]
+        return [(operator, (column_name,
+                            values[start:start + max_values_count]))
+                for start in range(0, len(values), max_values_count)]
+    if operator == 'AND':
+        for index, sub_filter in enumerate(filter_):
+            sub_filters = split_inclusion_filters(
+                sub_filter,
+                max_values_count=max_values_count)
+            if len(sub_filters) > 1:
+                return [(operator, [*filter_[:index],
+                                    sub_filter,
+                                    *filter_[index + 1:]])
+                        for sub_filter in sub_filters]
+    return [filters]
+
+
+def generate_invalid_operator_message(operator: str) -> str:
+    return ('Invalid filters operator: '
+            f'"{operator}" is not found '
+            f'in logical operators '
+            f'and predicates lists.')
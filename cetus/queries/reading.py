@@ -1,8 +1,12 @@
 from typing import (Any, Optional,
-                    List, Tuple)
+                    List, Tuple,
+                    Union)
 
 from cetus.types import (FiltersType,
-                         OrderingType)
+                         OrderingType,
+                         RecordType,
+                         ArgumentsType,
+                         ParametrizedQueryType)
 from cetus.utils import join_str
 
 from .utils import (ALL_COLUMNS_ALIAS,
@@ -10,8 +14,11 @@ from .utils import (ALL_COLUMNS_ALIAS,
                     add_orderings,
                     add_groupings,
                     add_pagination,
+                    add_pagination_args,
                     check_query_parameters)
-from cetus.queries.filters import add_filters
+from cetus.queries.filters import (add_filters,
+                                   add_keyset_filters,
+                                   generate_filters_args)
 
 
 def generate_select_query(
@@ -21,24 +28,70 @@ def generate_select_query(
         orderings: Optional[List[OrderingType]] = None,
         groupings: List[str] = None,
         limit: Optional[int] = None,
-        offset: Optional[int] = None) -> str:
+        offset: Optional[int] = None,
+        cursor: Optional[RecordType] = None,
+        is_mysql: bool = False,
+        parametrized: bool = False
+        ) -> Union[str, ParametrizedQueryType]:
+    # "cursor" contains last seen values of "orderings" columns,
+    # if specified rows are paginated by keyset
     check_query_parameters(columns_names=columns_names)
 
+    args = [] if parametrized else None
     columns = join_str(columns_names)
     query = (f'SELECT {columns} '
              f'FROM {table_name} ')
-    query = add_filters(query,
-                        filters=filters)
+    query = add_keyset_filters(query,
+                               filters=filters,
+                               orderings=orderings,
+                               cursor=cursor,
+                               args=args,
+                               is_mysql=is_mysql)
     query = add_orderings(query,
                           orderings=orderings)
     query = add_groupings(query,
                           groupings=groupings)
     query = add_pagination(query,
                            limit=limit,
-                           offset=offset)
+                           offset=offset,
+                           args=args,
+                           is_mysql=is_mysql)
+    if parametrized:
+        return query, args
     return query
 
 
+def generate_select_query_args(
+        *, filters: Optional[FiltersType] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        cursor: Optional[RecordType] = None,
+        is_mysql: bool) -> ArgumentsType:
+    args = generate_filters_args(filters,
+                                 args=[],
+                                 is_mysql=is_mysql)
+    if cursor is not None:
+        args.extend(cursor)
+    return add_pagination_args(args,
+                               limit=limit,
+                               offset=offset)
+
+
+def generate_group_wise_query_args(
+        *, filters: Optional[FiltersType] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        is_mysql: bool) -> ArgumentsType:
+    # in both MySQL and PostgreSQL group-wise queries
+    # filters precede pagination
+    args = generate_filters_args(filters,
+                                 args=[],
+                                 is_mysql=is_mysql)
+    return add_pagination_args(args,
+                               limit=limit,
+                               offset=offset)
+
+
 def generate_group_wise_query(
         *, table_name: str,
         columns_names: List[str],
@@ -49,10 +102,13 @@ def generate_group_wise_query(
         offset: Optional[int] = None,
         orderings: Optional[List[OrderingType]] = None,
         is_maximum: bool,
-        is_mysql: bool) -> str:
+        is_mysql: bool,
+        parametrized: bool = False
+        ) -> Union[str, ParametrizedQueryType]:
     check_query_parameters(columns_names=columns_names,
                            groupings=groupings)
 
+    args = [] if parametrized else None
     if is_mysql:
         query = generate_mysql_group_wise_query(
             table_name=table_name,
@@ -63,17 +119,22 @@ def generate_group_wise_query(
             limit=limit,
             offset=offset,
             orderings=orderings,
-            is_maximum=is_maximum)
+            is_maximum=is_maximum,
+            args=args)
     else:
         query = generate_postgres_group_wise_query(
             table_name=table_name,
             columns_names=columns_names,
             target_column_name=target_column_name,
+            filters=filters,
             groupings=groupings,
             limit=limit,
             offset=offset,
             orderings=orderings,
-            is_maximum=is_maximum)
+            is_maximum=is_maximum,
+            args=args)
+    if parametrized:
+        return query, args
     return query
 
 
@@ -86,7 +147,8 @@ def generate_mysql_group_wise_query(
         limit: Optional[int] = None,
         offset: Optional[int] = None,
         orderings: Optional[List[OrderingType]] = None,
-        is_maximum: bool) -> str:
+        is_maximum: bool,
+        args: Optional[ArgumentsType] = None) -> str:
     # based on article
     # http://mysql.rjweb.org/doc.php/groupwise_max
     columns = join_str(columns_names)
@@ -96,10 +158,14 @@ def generate_mysql_group_wise_query(
              f'{operator}({target_column_name}) AS {target_column_name} '
              f'FROM {table_name} ')
     query = add_filters(query,
-                        filters=filters)
+                        filters=filters,
+                        args=args,
+                        is_mysql=True)
     query = add_pagination(query,
                            limit=limit,
-                           offset=offset)
+                           offset=offset,
+                           args=args,
+                           is_mysql=True)
     query = add_groupings(query,
                           groupings=groupings)
     query = (f'SELECT {columns} '
@@ -120,7 +186,8 @@ def generate_postgres_group_wise_query(
         limit: Optional[int] = None,
         offset: Optional[int] = None,
         orderings: Optional[List[OrderingType]] = None,
-        is_maximum: bool) -> str:
+        is_maximum: bool,
+        args: Optional[ArgumentsType] = None) -> str:
     # based on article
     # https://explainextended.com/2009/11/26/postgresql-selecting-records-holding-group-wise-maximum/
     columns = join_str(columns_names)
@@ -132,7 +199,9 @@ def generate_postgres_group_wise_query(
     query = (f'SELECT DISTINCT ON ({groupings_str}) {ALL_COLUMNS_ALIAS} '
              f'FROM {table_name} ')
     query = add_filters(query,
-                        filters=filters)
+                        filters=filters,
+                        args=args,
+                        is_mysql=False)
     query = add_orderings(query,
                           orderings=group_wise_orderings)
     query = (f'SELECT {columns} '
@@ -141,7 +210,9 @@ def generate_postgres_group_wise_query(
                           orderings=orderings)
     query = add_pagination(query,
                            limit=limit,
-                           offset=offset)
+                           offset=offset,
+                           args=args,
+                           is_mysql=False)
     return query
 
 
@@ -1,13 +1,12 @@
 from typing import (Optional,
+                    Callable,
                     List)
 
 from cetus.utils import join_str
 
-from .utils import (check_query_parameters)
-
-# does nothing, added for symmetry with `asyncpg` version
-aiomysql_label_template = '%s'.format
-asyncpg_label_template = '${}'.format
+from .utils import (aiomysql_label_template,
+                    asyncpg_label_template,
+                    check_query_parameters)
 
 
 def generate_insert_query(
@@ -16,6 +15,7 @@ def generate_insert_query(
         columns_names: List[str],
         unique_columns_names: Optional[List[str]] = None,
         merge: bool,
+        records_count: int = 1,
         is_mysql: bool) -> str:
     check_query_parameters(columns_names=columns_names)
 
@@ -24,13 +24,15 @@ def generate_insert_query(
             table_name=table_name,
             columns_names=columns_names,
             unique_columns_names=unique_columns_names,
-            merge=merge)
+            merge=merge,
+            records_count=records_count)
     else:
         query = generate_postgres_insert_query(
             table_name=table_name,
             columns_names=columns_names,
             unique_columns_names=unique_columns_names,
-            merge=merge)
+            merge=merge,
+            records_count=records_count)
     return query
 
 
@@ -39,16 +41,29 @@ def generate_mysql_insert_query(
         table_name: str,
         columns_names: List[str],
         unique_columns_names: Optional[List[str]] = None,
-        merge: bool) -> str:
+        merge: bool,
+        records_count: int = 1) -> str:
     columns = join_str(columns_names)
-    columns_count = len(columns_names)
-    labels = join_str(aiomysql_label_template(ind + 1)
-                      for ind in range(columns_count))
+    values = generate_values_labels(
+        columns_count=len(columns_names),
+        records_count=records_count,
+        label_template=aiomysql_label_template)
     res = (f'INSERT INTO {table_name} ({columns}) '
-           f'VALUES ({labels}) ')
+           f'VALUES {values} ')
+    res += generate_mysql_on_duplicate_clause(
+        columns_names=columns_names,
+        unique_columns_names=unique_columns_names,
+        merge=merge)
+    return res
+
 
+def generate_mysql_on_duplicate_clause(
+        *,
+        columns_names: List[str],
+        unique_columns_names: Optional[List[str]] = None,
+        merge: bool) -> str:
     if not unique_columns_names:
-        return res
+        return ''
 
     if merge:
         updates = join_str(f'{column_name} = VALUES({column_name})'
@@ -56,8 +71,7 @@ def generate_mysql_insert_query(
     else:
         updates = join_str(f'{column_name} = VALUES({column_name})'
                            for column_name in columns_names)
-    res += f'ON DUPLICATE KEY UPDATE {updates} '
-    return res
+    return f'ON DUPLICATE KEY UPDATE {updates} '
 
 
 def generate_postgres_insert_query(
@@ -65,16 +79,29 @@ def generate_postgres_insert_query(
         table_name: str,
         columns_names: List[str],
         unique_columns_names: Optional[List[str]] = None,
-        merge: bool) -> str:
+        merge: bool,
+        records_count: int = 1) -> str:
     columns = join_str(columns_names)
-    columns_count = len(columns_names)
-    labels = join_str(asyncpg_label_template(ind + 1)
-                      for ind in range(columns_count))
+    values = generate_values_labels(
+        columns_count=len(columns_names),
+        records_count=records_count,
+        label_template=asyncpg_label_template)
     res = (f'INSERT INTO {table_name} ({columns}) '
-           f'VALUES ({labels}) ')
+           f'VALUES {values} ')
+    res += generate_postgres_on_conflict_clause(
+        columns_names=columns_names,
+        unique_columns_names=unique_columns_names,
+        merge=merge)
+    return res
 
+
+def generate_postgres_on_conflict_clause(
+        *,
+        columns_names: List[str],
+        unique_columns_names: Optional[List[str]] = None,
+        merge: bool) -> str:
     if not unique_columns_names:
-        return res
+        return ''
 
     if merge:
         updates = join_str(f'{column_name} = EXCLUDED.{column_name}'
@@ -85,8 +112,63 @@ def generate_postgres_insert_query(
     unique_columns = join_str(unique_columns_names)
     # WARNING: in PostgreSQL you should define unique constraint
     # on all of columns passed to `ON CONFLICT`
-    res += (f'ON CONFLICT ({unique_columns}) '
+    return (f'ON CONFLICT ({unique_columns}) '
             f'DO {on_conflict_action} ')
+
+
+def generate_staging_table_query(
+        *,
+        table_name: str,
+        staging_table_name: str,
+        columns_names: List[str],
+        is_mysql: bool) -> str:
+    # staging table has only inserted columns
+    # without constraints and defaults of the target one
+    check_query_parameters(columns_names=columns_names)
+
+    columns = join_str(columns_names)
+    if is_mysql:
+        return (f'CREATE TEMPORARY TABLE {staging_table_name} '
+                f'SELECT {columns} FROM {table_name} LIMIT 0')
+    return (f'CREATE TEMPORARY TABLE {staging_table_name} '
+            f'ON COMMIT DROP '
+            f'AS SELECT {columns} FROM {table_name} WITH NO DATA')
+
+
+def generate_staged_insert_query(
+        *,
+        table_name: str,
+        staging_table_name: str,
+        columns_names: List[str],
+        unique_columns_names: Optional[List[str]] = None,
+        merge: bool,
+        is_mysql: bool) -> str:
+    check_query_parameters(columns_names=columns_names)
+
+    columns = join_str(columns_names)
+    if not is_mysql and unique_columns_names and merge:
+        # PostgreSQL set-based `ON CONFLICT DO UPDATE` fails
+        # if the same row is affected by several records,
+        # so as with row-by-row upsert the last staged record wins,
+        # rows physical order of staging table is the order of loading
+        unique_columns = join_str(unique_columns_names)
+        res = (f'INSERT INTO {table_name} ({columns}) '
+               f'SELECT DISTINCT ON ({unique_columns}) {columns} '
+               f'FROM {staging_table_name} '
+               f'ORDER BY {unique_columns}, ctid DESC ')
+    else:
+        res = (f'INSERT INTO {table_name} ({columns}) '
+               f'SELECT {columns} FROM {staging_table_name} ')
+    if is_mysql:
+        res += generate_mysql_on_duplicate_clause(
+            columns_names=columns_names,
+            unique_columns_names=unique_columns_names,
+            merge=merge)
+    else:
+        res += generate_postgres_on_conflict_clause(
+            columns_names=columns_names,
+            unique_columns_names=unique_columns_names,
+            merge=merge)
     return res
 
 
@@ -96,7 +178,8 @@ def generate_postgres_insert_returning_query(
         columns_names: List[str],
         unique_columns_names: List[str] = None,
         returning_columns_names: List[str],
-        merge: bool = False) -> str:
+        merge: bool = False,
+        records_count: int = 1) -> str:
     check_query_parameters(
         columns_names=columns_names,
         returning_columns_names=returning_columns_names)
@@ -105,7 +188,24 @@ def generate_postgres_insert_returning_query(
         table_name=table_name,
         columns_names=columns_names,
         unique_columns_names=unique_columns_names,
-        merge=merge)
+        merge=merge,
+        records_count=records_count)
     returning_columns = join_str(returning_columns_names)
     res += f'RETURNING {returning_columns}'
     return res
+
+
+def generate_values_labels(*,
+                           columns_count: int,
+                           records_count: int,
+                           label_template: Callable[[int], str],
+                           labels_offset: int = 0) -> str:
+    records_labels = (
+        join_str(label_template(record_offset + column_ind + 1)
+                 for column_ind in range(columns_count))
+        for record_offset in range(labels_offset,
+                                   labels_offset
+                                   + records_count * columns_count,
+                                   columns_count))
+    return join_str(f'({record_labels})'
+                    for record_labels in records_labels)
@@ -1,20 +1,151 @@
-from typing import Optional
+from typing import (Optional,
+                    Union,
+                    Dict,
+                    List)
 
-from cetus.queries.filters import add_filters
+from cetus.queries.filters import (add_filters,
+                                   generate_filters_args)
 from cetus.types import (UpdatesType,
-                         FiltersType)
+                         FiltersType,
+                         ArgumentsType,
+                         ParametrizedQueryType)
 
-from .utils import add_updates
+from cetus.utils import join_str
+
+from .saving import generate_values_labels
+from .utils import (aiomysql_label_template,
+                    asyncpg_label_template,
+                    add_updates,
+                    check_query_parameters)
+
+UPDATES_VALUES_ALIAS = 'updates_values'
 
 
 def generate_update_query(
         *,
         table_name: str,
         updates: UpdatesType,
-        filters: Optional[FiltersType] = None) -> str:
+        filters: Optional[FiltersType] = None,
+        is_mysql: bool = False,
+        parametrized: bool = False
+        ) -> Union[str, ParametrizedQueryType]:
+    args = [] if parametrized else None
     query = f'UPDATE {table_name} '
     query = add_updates(query,
-                        updates=updates)
+                        updates=updates,
+                        args=args,
+                        is_mysql=is_mysql)
     query = add_filters(query,
-                        filters=filters)
+                        filters=filters,
+                        args=args,
+                        is_mysql=is_mysql)
+    if parametrized:
+        return query, args
     return query
+
+
+def generate_update_query_args(
+        *,
+        updates: UpdatesType,
+        filters: Optional[FiltersType] = None,
+        is_mysql: bool) -> ArgumentsType:
+    args = list(updates.values())
+    return generate_filters_args(filters,
+                                 args=args,
+                                 is_mysql=is_mysql)
+
+
+def generate_update_many_query(
+        *,
+        table_name: str,
+        key_columns_names: List[str],
+        update_columns_names: List[str],
+        records_count: int,
+        columns_types: Optional[Dict[str, str]] = None,
+        is_mysql: bool) -> str:
+    # records values are expected to be ordered
+    # as key columns followed by update columns
+    check_query_parameters(key_columns_names=key_columns_names,
+                           update_columns_names=update_columns_names)
+
+    if is_mysql:
+        return generate_mysql_update_many_query(
+            table_name=table_name,
+            key_columns_names=key_columns_names,
+            update_columns_names=update_columns_names,
+            records_count=records_count)
+    return generate_postgres_update_many_query(
+        table_name=table_name,
+        key_columns_names=key_columns_names,
+        update_columns_names=update_columns_names,
+        records_count=records_count,
+        columns_types=columns_types)
+
+
+def generate_mysql_update_many_query(
+        *,
+        table_name: str,
+        key_columns_names: List[str],
+        update_columns_names: List[str],
+        records_count: int) -> str:
+    columns_names = [*key_columns_names, *update_columns_names]
+    first_record_labels = join_str(
+        f'{aiomysql_label_template()} AS {column_name}'
+        for column_name in columns_names)
+    record_labels = join_str(aiomysql_label_template()
+                             for _ in columns_names)
+    values = ' UNION ALL '.join(
+        [f'SELECT {first_record_labels}',
+         *[f'SELECT {record_labels}'] * (records_count - 1)])
+    joint = ' AND '.join(f'{table_name}.{column_name} '
+                         f'= {UPDATES_VALUES_ALIAS}.{column_name}'
+                         for column_name in key_columns_names)
+    updates = join_str(f'{table_name}.{column_name} '
+                       f'= {UPDATES_VALUES_ALIAS}.{column_name}'
+                       for column_name in update_columns_names)
+    return (f'UPDATE {table_name} '
+            f'JOIN ({values}) AS {UPDATES_VALUES_ALIAS} '
+            f'ON {joint} '
+            f'SET {updates} ')
+
+
+def generate_postgres_update_many_query(
+        *,
+        table_name: str,
+        key_columns_names: List[str],
+        update_columns_names: List[str],
+        records_count: int,
+        columns_types: Optional[Dict[str, str]] = None) -> str:
+    # without explicit casts `VALUES` columns types are unknown,
+    # casting first row is enough
+    # since the rest ones are coerced to its types
+    columns_names = [*key_columns_names, *update_columns_names]
+    columns_types = columns_types or {}
+    columns_casts = [f'::{columns_types[column_name]}'
+                     if column_name in columns_types
+                     else ''
+                     for column_name in columns_names]
+    first_record_labels = join_str(
+        asyncpg_label_template(ind + 1) + column_cast
+        for ind, column_cast in enumerate(columns_casts))
+    values = f'({first_record_labels})'
+    if records_count > 1:
+        columns_count = len(columns_names)
+        rest_records_labels = generate_values_labels(
+            columns_count=columns_count,
+            records_count=records_count - 1,
+            label_template=asyncpg_label_template,
+            labels_offset=columns_count)
+        values += f', {rest_records_labels}'
+    values_columns = join_str(columns_names)
+    updates = join_str(f'{column_name} '
+                       f'= {UPDATES_VALUES_ALIAS}.{column_name}'
+                       for column_name in update_columns_names)
+    joint = ' AND '.join(f'{table_name}.{column_name} '
+                         f'= {UPDATES_VALUES_ALIAS}.{column_name}'
+                         for column_name in key_columns_names)
+    return (f'UPDATE {table_name} '
+            f'SET {updates} '
+            f'FROM (VALUES {values}) '
+            f'AS {UPDATES_VALUES_ALIAS} ({values_columns}) '
+            f'WHERE {joint} ')
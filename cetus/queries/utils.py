@@ -5,7 +5,8 @@ from typing import (Optional,
 
 from cetus.types import (ColumnValueType,
                          OrderingType,
-                         UpdatesType)
+                         UpdatesType,
+                         ArgumentsType)
 from cetus.utils import join_str
 
 ALL_COLUMNS_ALIAS = '*'
@@ -13,6 +14,10 @@ NULL_VALUE = 'NULL'
 ORDERS_ALIASES = dict(ascending='ASC',
                       descending='DESC')
 
+# does nothing, added for symmetry with `asyncpg` version
+aiomysql_label_template = '%s'.format
+asyncpg_label_template = '${}'.format
+
 
 def add_orderings(query: str, *,
                   orderings: List[OrderingType]
@@ -34,25 +39,67 @@ def add_groupings(query: str, *,
 
 def add_pagination(query: str, *,
                    limit: Optional[int],
-                   offset: Optional[int]
+                   offset: Optional[int],
+                   args: Optional[ArgumentsType] = None,
+                   is_mysql: bool = False
                    ) -> str:
     if limit is not None:
+        limit = bind_value(limit,
+                           args=args,
+                           is_mysql=is_mysql)
         query += f'LIMIT {limit} '
         if offset is not None:
+            offset = bind_value(offset,
+                                args=args,
+                                is_mysql=is_mysql)
             query += f'OFFSET {offset} '
     return query
 
 
 def add_updates(query: str, *,
-                updates: UpdatesType
+                updates: UpdatesType,
+                args: Optional[ArgumentsType] = None,
+                is_mysql: bool = False
                 ) -> str:
     keys = updates.keys()
-    values = map(normalize_value, updates.values())
+    values = [bind_value(value,
+                         args=args,
+                         is_mysql=is_mysql)
+              for value in updates.values()]
     updates_str = join_str(f'{key} = {value}'
                            for key, value in zip(keys, values))
     return query + f'SET {updates_str} '
 
 
+def add_pagination_args(args: ArgumentsType, *,
+                        limit: Optional[int],
+                        offset: Optional[int]) -> ArgumentsType:
+    if limit is not None:
+        args.append(limit)
+        if offset is not None:
+            args.append(offset)
+    return args
+
+
+def bind_value(value: ColumnValueType, *,
+               args: Optional[ArgumentsType],
+               is_mysql: bool) -> str:
+    # inlining value if query is not parametrized,
+    # otherwise collecting it as query argument
+    if args is None:
+        return normalize_value(value)
+    args.append(value)
+    return generate_label(len(args),
+                          is_mysql=is_mysql)
+
+
+def generate_label(number: int, *,
+                   is_mysql: bool) -> str:
+    if is_mysql:
+        return aiomysql_label_template(number)
+    return asyncpg_label_template(number)
+
+
 def normalize_value(value: ColumnValueType
                     ) -> str:
     if isinstance(value, (str, datetime)):
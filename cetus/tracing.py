@@ -0,0 +1,102 @@
+from time import perf_counter
+from typing import (Any,
+                    Optional,
+                    Callable,
+                    List,
+                    Dict)
+
+
+class Span:
+    recording = True
+
+    def __init__(self, name: str, *,
+                 attributes: Dict[str, Any],
+                 on_finish: Callable[['Span'], None]) -> None:
+        self.name = name
+        self.attributes = attributes
+        self.start = perf_counter()
+        self.end = None
+        self._on_finish = on_finish
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.end is None:
+            return None
+        return self.end - self.start
+
+    def set_attribute(self, name: str, value: Any) -> None:
+        self.attributes[name] = value
+
+    def finish(self) -> None:
+        # can be called several times, only the first one counts
+        if self.end is not None:
+            return
+        self.end = perf_counter()
+        self._on_finish(self)
+
+    def __enter__(self) -> 'Span':
+        return self
+
+    def __exit__(self, exception_type, exception, traceback) -> None:
+        # explicitly finished spans are not affected
+        # by exceptions raised after finishing
+        if self.end is not None:
+            return
+        if exception is not None:
+            self.set_attribute('error', repr(exception))
+        self.finish()
+
+
+class NoopSpan:
+    recording = False
+
+    def set_attribute(self, name: str, value: Any) -> None:
+        pass
+
+    def finish(self) -> None:
+        pass
+
+    def __enter__(self) -> 'NoopSpan':
+        return self
+
+    def __exit__(self, exception_type, exception, traceback) -> None:
+        pass
+
+
+NOOP_SPAN = NoopSpan()
+
+
+class Tracer:
+    # does nothing, spans can be used as context managers
+    # or finished explicitly
+    def start_span(self, name: str, **attributes: Any) -> NoopSpan:
+        return NOOP_SPAN
+
+
+class InMemoryTracer(Tracer):
+    # keeps finished spans, e.g. for tests and benchmarks
+    def __init__(self) -> None:
+        self.spans = []
+
+    def start_span(self, name: str, **attributes: Any) -> Span:
+        return Span(name,
+                    attributes=attributes,
+                    on_finish=self.spans.append)
+
+    def get_spans(self, name: str) -> List[Span]:
+        return [span for span in self.spans if span.name == name]
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+
+def set_tracer(tracer: Tracer) -> None:
+    global _tracer
+    _tracer = tracer
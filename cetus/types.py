@@ -4,12 +4,16 @@ from typing import (Any,
                     Union,
                     MutableMapping,
                     KT, VT,
+                    AsyncIterable,
                     Generator,
+                    Iterable,
                     Tuple,
+                    Type,
                     List)
 
 from aiomysql.pool import Pool as MySQLConnectionPool
 from aiomysql.sa.connection import SAConnection as MySQLConnection
+from asyncpg import Record as PostgresRecord
 from asyncpg.connection import Connection as PostgresConnection
 from asyncpg.pool import Pool as PostgresConnectionPool
 from asyncpg.transaction import Transaction as PostgresTransaction
@@ -24,6 +28,9 @@ ColumnValueType = Union[int, bool,
                         float, str,
                         datetime, None]
 RecordType = Tuple[ColumnValueType, ...]
+RecordsType = Union[Iterable[RecordType],
+                    AsyncIterable[RecordType]]
+PostgresRecordClassType = Type[PostgresRecord]
 
 FilterType = Tuple[str,
                    Union[
@@ -35,6 +42,8 @@ FilterType = Tuple[str,
 FiltersType = Tuple[str, Any]
 OrderingType = Tuple[str, str]
 UpdatesType = OrderedDictType[str, ColumnValueType]
+ArgumentsType = List[Any]
+ParametrizedQueryType = Tuple[str, ArgumentsType]
 
 MySQLConnectionType = MySQLConnection
 PostgresConnectionType = PostgresConnection
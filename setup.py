@@ -15,9 +15,12 @@ setup(name='cetus',
           'sqlalchemy>=1.0.12',
           # async
           'asyncio_extras>=1.3.0',  # async context managers
-          'asyncpg>=0.10.1',  # working with Postgres
+          'asyncpg>=0.22.0',  # working with Postgres
           'aiomysql>=0.0.9',  # working with MySQL
       ],
+      extras_require={
+          'numpy': ['numpy>=1.13.0'],  # columnar fetching
+      },
       setup_requires=['pytest-runner'],
       tests_require=['sqlalchemy-utils>=0.32.12',  # database creation/cleaning
                      'psycopg2>=2.6.2',  # working with Postgres
@@ -27,5 +30,6 @@ setup(name='cetus',
                      'pytest-asyncio',
                      'pytest-cov>=2.4.0',
                      'hypothesis>=3.6.1',
-                     'pytz'  # working with datetime objects in hypothesis
+                     'pytz',  # working with datetime objects in hypothesis
+                     'numpy>=1.13.0',  # columnar fetching
                      ])
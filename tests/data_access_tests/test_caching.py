@@ -0,0 +1,179 @@
+from asyncio import (AbstractEventLoop,
+                     Event,
+                     ensure_future,
+                     gather,
+                     sleep)
+from functools import partial
+from typing import (Any,
+                    List)
+
+import pytest
+from cetus.data_access import (RequestsCoalescer,
+                               ResultsCache,
+                               begin_transaction,
+                               get_connection,
+                               insert,
+                               fetch_records_count)
+from cetus.types import RecordType
+from sqlalchemy.engine.url import URL
+
+
+@pytest.mark.asyncio
+async def test_results_cache(table_name: str,
+                             table_columns_names: List[str],
+                             table_records: List[RecordType],
+                             is_mysql: bool,
+                             db_uri: URL,
+                             event_loop: AbstractEventLoop) -> None:
+    results_cache = ResultsCache()
+
+    async with get_connection(db_uri=db_uri,
+                              is_mysql=is_mysql,
+                              loop=event_loop) as connection:
+        records_counts = [
+            await fetch_records_count(table_name=table_name,
+                                      results_cache=results_cache,
+                                      is_mysql=is_mysql,
+                                      connection=connection)
+            for _ in range(2)]
+        await insert(table_name=table_name,
+                     columns_names=table_columns_names,
+                     records=table_records,
+                     is_mysql=is_mysql,
+                     connection=connection)
+        records_count = await fetch_records_count(
+            table_name=table_name,
+            results_cache=results_cache,
+            is_mysql=is_mysql,
+            connection=connection)
+
+    assert records_counts == [0, 0]
+    assert records_count == len(table_records)
+    statistics = results_cache.statistics
+    assert statistics.hits == 1
+    assert statistics.misses == 2
+    assert statistics.invalidations == 1
+    assert statistics.size == 1
+
+
+def test_results_cache_eviction() -> None:
+    results_cache = ResultsCache(max_size=2)
+
+    for key in range(3):
+        results_cache.put(key, [(key,)],
+                          table_name='table')
+
+    assert results_cache.get(0) is None
+    assert results_cache.get(2) == [(2,)]
+    statistics = results_cache.statistics
+    assert statistics.evictions == 1
+    assert statistics.size == 2
+    assert statistics.bytes > 0
+
+    expiring_results_cache = ResultsCache(ttl=0)
+    expiring_results_cache.put(0, [(0,)],
+                               table_name='table')
+
+    assert expiring_results_cache.get(0) is None
+    assert expiring_results_cache.statistics.expirations == 1
+
+
+@pytest.mark.asyncio
+async def test_requests_coalescer(event_loop: AbstractEventLoop) -> None:
+    requests_count = 3
+    coalescer = RequestsCoalescer()
+    released = Event()
+    calls_counts = []
+
+    async def fetch_result(result: Any) -> Any:
+        calls_counts.append(1)
+        await released.wait()
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def run_requests(result: Any) -> List[Any]:
+        released.clear()
+        calls_counts.clear()
+        tasks = [ensure_future(coalescer.run(
+            'key',
+            partial(fetch_result, result),
+            table_name='table'))
+            for _ in range(requests_count)]
+        while not calls_counts:
+            await sleep(0)
+        released.set()
+        return await gather(*tasks,
+                            return_exceptions=True)
+
+    results = await run_requests([0])
+
+    assert len(calls_counts) == 1
+    assert results == [[0]] * requests_count
+    assert coalescer.statistics.coalesced_count == requests_count - 1
+
+    error = ValueError()
+    errors = await run_requests(error)
+
+    assert len(calls_counts) == 1
+    assert errors == [error] * requests_count
+    assert (coalescer.statistics.coalesced_count
+            == 2 * (requests_count - 1))
+
+    # the rest of callers retry when the first one is cancelled
+    released.clear()
+    calls_counts.clear()
+    first_task, *rest_tasks = [
+        ensure_future(coalescer.run('key',
+                                    partial(fetch_result, [0]),
+                                    table_name='table'))
+        for _ in range(requests_count)]
+    while not calls_counts:
+        await sleep(0)
+    first_task.cancel()
+    released.set()
+    rest_results = await gather(*rest_tasks)
+
+    assert first_task.cancelled()
+    assert len(calls_counts) == 2
+    assert rest_results == [[0]] * (requests_count - 1)
+    assert coalescer.statistics.in_flight_count == 0
+
+
+@pytest.mark.asyncio
+async def test_results_cache_transactions(
+        table_name: str,
+        table_columns_names: List[str],
+        table_records: List[RecordType],
+        is_mysql: bool,
+        db_uri: URL,
+        event_loop: AbstractEventLoop) -> None:
+    results_cache = ResultsCache()
+
+    async with get_connection(db_uri=db_uri,
+                              is_mysql=is_mysql,
+                              loop=event_loop) as writing_connection, \
+            get_connection(db_uri=db_uri,
+                           is_mysql=is_mysql,
+                           loop=event_loop) as reading_connection:
+        async with begin_transaction(connection=writing_connection,
+                                     is_mysql=is_mysql):
+            await insert(table_name=table_name,
+                         columns_names=table_columns_names,
+                         records=table_records,
+                         is_mysql=is_mysql,
+                         connection=writing_connection)
+            uncommitted_records_count = await fetch_records_count(
+                table_name=table_name,
+                results_cache=results_cache,
+                is_mysql=is_mysql,
+                connection=writing_connection)
+            records_count = await fetch_records_count(
+                table_name=table_name,
+                results_cache=results_cache,
+                is_mysql=is_mysql,
+                connection=reading_connection)
+
+    assert uncommitted_records_count == len(table_records)
+    assert records_count == 0
+    assert results_cache.statistics.hits == 0
@@ -0,0 +1,50 @@
+from asyncio import AbstractEventLoop
+from typing import List
+
+import pytest
+from cetus.data_access import get_connection
+from cetus.types import RecordType
+from sqlalchemy import Table
+from sqlalchemy.engine.url import URL
+from tests.utils import (insert,
+                         records_to_dicts)
+
+np = pytest.importorskip('numpy')
+
+from cetus.data_access.columnar import fetch_columns  # noqa: E402
+
+
+@pytest.mark.asyncio
+async def test_fetch_columns(
+        table: Table,
+        table_name: str,
+        table_columns_names: List[str],
+        table_records: List[RecordType],
+        is_mysql: bool,
+        db_uri: URL,
+        event_loop: AbstractEventLoop) -> None:
+    table_records_dicts = records_to_dicts(
+        records=table_records,
+        table=table)
+    insert(records_dicts=table_records_dicts,
+           table=table,
+           db_uri=db_uri)
+
+    async with get_connection(db_uri=db_uri,
+                              is_mysql=is_mysql,
+                              loop=event_loop) as connection:
+        columns = await fetch_columns(table_name=table_name,
+                                      columns_names=table_columns_names,
+                                      prefetch=1,
+                                      is_mysql=is_mysql,
+                                      connection=connection)
+
+    assert list(columns) == table_columns_names
+    assert all(isinstance(column, np.ndarray)
+               for column in columns.values())
+    assert all(len(column) == len(table_records)
+               for column in columns.values())
+    records = list(zip(*(column.tolist()
+                         for column in columns.values())))
+    assert all(table_record in records
+               for table_record in table_records)
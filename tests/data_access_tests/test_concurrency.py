@@ -0,0 +1,166 @@
+from asyncio import AbstractEventLoop
+from functools import partial
+from typing import List
+
+import pytest
+from cetus.data_access import (get_connection_pool,
+                               get_postgres_snapshot_connection_pool,
+                               run_concurrently,
+                               fetch_partitioned,
+                               fetch,
+                               fetch_records_count)
+from cetus.types import RecordType
+from hypothesis import strategies
+from sqlalchemy import Table
+from sqlalchemy.engine.url import URL
+from tests.utils import (insert,
+                         records_to_dicts)
+
+
+@pytest.mark.asyncio
+async def test_run_concurrently(
+        table: Table,
+        table_name: str,
+        table_columns_names: List[str],
+        table_records: List[RecordType],
+        is_mysql: bool,
+        db_uri: URL,
+        event_loop: AbstractEventLoop) -> None:
+    table_records_dicts = records_to_dicts(
+        records=table_records,
+        table=table)
+    insert(records_dicts=table_records_dicts,
+           table=table,
+           db_uri=db_uri)
+
+    async with get_connection_pool(db_uri=db_uri,
+                                   is_mysql=is_mysql,
+                                   min_size=1,
+                                   max_size=2,
+                                   loop=event_loop) as connection_pool:
+        records_count, records = await run_concurrently(
+            [partial(fetch_records_count,
+                     table_name=table_name,
+                     is_mysql=is_mysql),
+             partial(fetch,
+                     table_name=table_name,
+                     columns_names=table_columns_names,
+                     is_mysql=is_mysql)],
+            max_concurrency=2,
+            connection_pool=connection_pool)
+
+    assert records_count == len(table_records)
+    assert all(table_record in records
+               for table_record in table_records)
+
+    with pytest.raises(ValueError):
+        async with get_connection_pool(
+                db_uri=db_uri,
+                is_mysql=is_mysql,
+                min_size=1,
+                max_size=2,
+                loop=event_loop) as connection_pool:
+            await run_concurrently(
+                [partial(fetch_records_count,
+                         table_name=table_name,
+                         is_mysql=is_mysql),
+                 partial(fetch,
+                         table_name=table_name,
+                         columns_names=[],
+                         is_mysql=is_mysql)],
+                connection_pool=connection_pool)
+
+
+@pytest.mark.asyncio
+async def test_fetch_partitioned(
+        table: Table,
+        table_name: str,
+        table_columns_names: List[str],
+        table_primary_key: str,
+        table_records: List[RecordType],
+        is_mysql: bool,
+        db_uri: URL,
+        event_loop: AbstractEventLoop) -> None:
+    table_records_dicts = records_to_dicts(
+        records=table_records,
+        table=table)
+    insert(records_dicts=table_records_dicts,
+           table=table,
+           db_uri=db_uri)
+    partitions_count = strategies.integers(min_value=1,
+                                           max_value=4).example()
+    primary_key_index = table_columns_names.index(table_primary_key)
+
+    async with get_connection_pool(db_uri=db_uri,
+                                   is_mysql=is_mysql,
+                                   min_size=1,
+                                   max_size=partitions_count + 1,
+                                   loop=event_loop) as connection_pool:
+        records = [record
+                   async for record in fetch_partitioned(
+                       table_name=table_name,
+                       columns_names=table_columns_names,
+                       key_column_name=table_primary_key,
+                       partitions_count=partitions_count,
+                       is_mysql=is_mysql,
+                       connection_pool=connection_pool)]
+        ordered_records = [record
+                           async for record in fetch_partitioned(
+                               table_name=table_name,
+                               columns_names=table_columns_names,
+                               key_column_name=table_primary_key,
+                               partitions_count=partitions_count,
+                               ordered=True,
+                               is_mysql=is_mysql,
+                               connection_pool=connection_pool)]
+
+    assert len(records) == len(table_records)
+    assert all(table_record in records
+               for table_record in table_records)
+    assert len(ordered_records) == len(records)
+    assert all(record in ordered_records
+               for record in records)
+    primary_key_values = [record[primary_key_index]
+                          for record in ordered_records]
+    assert primary_key_values == sorted(primary_key_values)
+
+
+@pytest.mark.asyncio
+async def test_fetch_partitioned_snapshot(
+        table: Table,
+        table_name: str,
+        table_columns_names: List[str],
+        table_primary_key: str,
+        table_records: List[RecordType],
+        is_mysql: bool,
+        db_uri: URL,
+        event_loop: AbstractEventLoop) -> None:
+    if is_mysql:
+        # exporting snapshots is supported only by Postgres
+        return
+
+    partitions_count = 2
+    async with get_connection_pool(db_uri=db_uri,
+                                   is_mysql=is_mysql,
+                                   min_size=1,
+                                   max_size=partitions_count + 2,
+                                   loop=event_loop) as connection_pool:
+        async with get_postgres_snapshot_connection_pool(
+                connection_pool) as snapshot_connection_pool:
+            table_records_dicts = records_to_dicts(
+                records=table_records,
+                table=table)
+            insert(records_dicts=table_records_dicts,
+                   table=table,
+                   db_uri=db_uri)
+            records = [record
+                       async for record in fetch_partitioned(
+                           table_name=table_name,
+                           columns_names=table_columns_names,
+                           key_column_name=table_primary_key,
+                           partitions_count=partitions_count,
+                           is_mysql=is_mysql,
+                           connection_pool=snapshot_connection_pool)]
+
+    # rows inserted after snapshot export are not visible
+    assert records == []
@@ -0,0 +1,64 @@
+from asyncio import AbstractEventLoop
+from typing import List
+
+import pytest
+from cetus.data_access import (PreparedStatementsRegistry,
+                               get_connection_pool,
+                               fetch_row_prepared)
+from cetus.types import RecordType
+from sqlalchemy import Table
+from sqlalchemy.engine.url import URL
+from tests.utils import (insert,
+                         records_to_dicts)
+
+
+@pytest.mark.asyncio
+async def test_prepared_statements(
+        table: Table,
+        table_name: str,
+        table_records: List[RecordType],
+        is_mysql: bool,
+        db_uri: URL,
+        event_loop: AbstractEventLoop) -> None:
+    table_records_dicts = records_to_dicts(
+        records=table_records,
+        table=table)
+    insert(records_dicts=table_records_dicts,
+           table=table,
+           db_uri=db_uri)
+    registry = PreparedStatementsRegistry(
+        {'count': f'SELECT COUNT(*) FROM {table_name}'})
+    acquisitions_count = 3
+
+    async with get_connection_pool(db_uri=db_uri,
+                                   is_mysql=is_mysql,
+                                   min_size=1,
+                                   max_size=1,
+                                   init=registry.prepare,
+                                   loop=event_loop) as connection_pool:
+        records_counts = []
+        for _ in range(acquisitions_count):
+            async with connection_pool.acquire() as connection:
+                records_count, = await fetch_row_prepared(
+                    'count',
+                    registry=registry,
+                    is_mysql=is_mysql,
+                    connection=connection)
+                records_counts.append(records_count)
+
+    assert records_counts == [len(table_records)] * acquisitions_count
+    assert registry.statistics.hits == acquisitions_count
+    if not is_mysql:
+        assert registry.statistics.misses == 1
+
+    async with get_connection_pool(db_uri=db_uri,
+                                   is_mysql=is_mysql,
+                                   min_size=1,
+                                   max_size=1,
+                                   loop=event_loop) as connection_pool:
+        async with connection_pool.acquire() as connection:
+            with pytest.raises(ValueError):
+                await fetch_row_prepared('unknown',
+                                         registry=registry,
+                                         is_mysql=is_mysql,
+                                         connection=connection)
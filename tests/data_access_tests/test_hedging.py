@@ -0,0 +1,58 @@
+from asyncio import AbstractEventLoop
+from functools import partial
+from typing import List
+
+import pytest
+from cetus.data_access import (LatencyTracker,
+                               ReadsHedger,
+                               get_connection_pool,
+                               fetch_records_count)
+from cetus.types import RecordType
+from sqlalchemy import Table
+from sqlalchemy.engine.url import URL
+from tests.utils import (insert,
+                         records_to_dicts)
+
+
+@pytest.mark.asyncio
+async def test_reads_hedger(
+        table: Table,
+        table_name: str,
+        table_records: List[RecordType],
+        is_mysql: bool,
+        db_uri: URL,
+        event_loop: AbstractEventLoop) -> None:
+    table_records_dicts = records_to_dicts(
+        records=table_records,
+        table=table)
+    insert(records_dicts=table_records_dicts,
+           table=table,
+           db_uri=db_uri)
+    requests_count = 5
+    hedger = ReadsHedger(
+        latency_tracker=LatencyTracker(min_latencies_count=1),
+        is_mysql=is_mysql)
+
+    async with get_connection_pool(db_uri=db_uri,
+                                   is_mysql=is_mysql,
+                                   min_size=1,
+                                   max_size=3,
+                                   loop=event_loop) as connection_pool:
+        records_counts = [
+            await hedger.run(partial(fetch_records_count,
+                                     table_name=table_name,
+                                     is_mysql=is_mysql),
+                             connection_pools=[connection_pool,
+                                               connection_pool])
+            for _ in range(requests_count)]
+        await hedger.wait_cancellations()
+
+    statistics = hedger.statistics
+    assert records_counts == [len(table_records)] * requests_count
+    assert statistics.requests_count == requests_count
+    assert statistics.hedges_wins_count <= statistics.hedges_count
+    assert 0 <= statistics.hedge_rate <= 1
+    assert statistics.hedge_delay is not None
+
+    with pytest.raises(ValueError):
+        LatencyTracker(percentile=0)
@@ -0,0 +1,122 @@
+from asyncio import AbstractEventLoop
+from typing import List
+
+import pytest
+from cetus.data_access import (QueriesMonitor,
+                               get_connection,
+                               get_connection_pool,
+                               fetch,
+                               queries_monitor,
+                               slow_queries_log,
+                               generate_query_fingerprint)
+from cetus.types import RecordType
+from sqlalchemy import Table
+from sqlalchemy.engine.url import URL
+from tests.utils import (insert,
+                         records_to_dicts)
+
+
+def test_generate_query_fingerprint() -> None:
+    fingerprint = generate_query_fingerprint(
+        'SELECT a FROM t WHERE (a IN ($1, $2))AND(b = \'c\') LIMIT 10')
+
+    assert fingerprint == ('SELECT a FROM t '
+                           'WHERE (a IN (...))AND(b = ?) LIMIT ?')
+    assert generate_query_fingerprint(
+        'SELECT a FROM t WHERE (a IN (%s))AND(b = %s) LIMIT 1'
+    ) == fingerprint
+    assert generate_query_fingerprint(
+        'INSERT INTO t (a) SELECT a FROM cetus_staging_0123abcd'
+    ) == generate_query_fingerprint(
+        'INSERT INTO t (a) SELECT a FROM cetus_staging_4567ef'
+    )
+
+
+def test_queries_monitor_overflow() -> None:
+    monitor = QueriesMonitor(max_fingerprints_count=1)
+
+    for column_name in ['a', 'b', 'c', 'a']:
+        monitor.record(f'SELECT {column_name} FROM t',
+                       latency=0.)
+
+    snapshot = monitor.snapshot()
+    assert snapshot.keys() == {'SELECT a FROM t', '<other>'}
+    assert snapshot['SELECT a FROM t'].calls_count == 2
+    assert snapshot['<other>'].calls_count == 2
+
+
+@pytest.mark.asyncio
+async def test_queries_monitor(
+        table: Table,
+        table_name: str,
+        table_columns_names: List[str],
+        table_records: List[RecordType],
+        is_mysql: bool,
+        db_uri: URL,
+        event_loop: AbstractEventLoop) -> None:
+    table_records_dicts = records_to_dicts(
+        records=table_records,
+        table=table)
+    insert(records_dicts=table_records_dicts,
+           table=table,
+           db_uri=db_uri)
+    queries_monitor.reset()
+    snapshots = []
+    queries_monitor.add_exporter(snapshots.append)
+
+    try:
+        async with get_connection(db_uri=db_uri,
+                                  is_mysql=is_mysql,
+                                  loop=event_loop) as connection:
+            await fetch(table_name=table_name,
+                        columns_names=table_columns_names,
+                        is_mysql=is_mysql,
+                        connection=connection)
+        queries_monitor.export()
+    finally:
+        queries_monitor.exporters.remove(snapshots.append)
+
+    snapshot, = snapshots
+    statistics, = [statistics
+                   for fingerprint, statistics in snapshot.items()
+                   if table_name in fingerprint]
+    assert statistics.calls_count == 1
+    assert statistics.errors_count == 0
+    assert statistics.rows_count == len(table_records)
+    assert 0 < statistics.p50 <= statistics.p95 <= statistics.p99
+
+
+@pytest.mark.asyncio
+async def test_slow_queries_log(
+        table: Table,
+        table_name: str,
+        table_columns_names: List[str],
+        is_mysql: bool,
+        db_uri: URL,
+        event_loop: AbstractEventLoop) -> None:
+    slow_queries_log.clear()
+
+    async with get_connection_pool(db_uri=db_uri,
+                                   is_mysql=is_mysql,
+                                   min_size=1,
+                                   max_size=2,
+                                   loop=event_loop) as connection_pool:
+        # every query is considered slow
+        slow_queries_log.threshold = 0
+        slow_queries_log.connection_pool = connection_pool
+        try:
+            async with connection_pool.acquire() as connection:
+                await fetch(table_name=table_name,
+                            columns_names=table_columns_names,
+                            is_mysql=is_mysql,
+                            connection=connection)
+            await slow_queries_log.wait_explains()
+        finally:
+            slow_queries_log.threshold = None
+            slow_queries_log.connection_pool = None
+
+    slow_query, = [slow_query
+                   for slow_query in slow_queries_log.entries
+                   if table_name in slow_query.query]
+    assert slow_query.duration >= 0
+    assert slow_query.plan is not None
@@ -0,0 +1,63 @@
+from asyncio import (AbstractEventLoop,
+                     sleep)
+from typing import List
+
+import pytest
+from cetus.data_access import (ResultsCache,
+                               get_connection,
+                               listen_invalidations,
+                               install_invalidation_triggers,
+                               uninstall_invalidation_triggers)
+from cetus.types import RecordType
+from sqlalchemy import Table
+from sqlalchemy.engine.url import URL
+from tests.utils import (insert,
+                         records_to_dicts)
+
+# in seconds
+NOTIFICATION_WAITING_INTERVAL = 0.01
+MAX_NOTIFICATION_WAITING_INTERVALS_COUNT = 100
+
+
+@pytest.mark.asyncio
+async def test_invalidations_listener(table: Table,
+                                      table_name: str,
+                                      table_records: List[RecordType],
+                                      is_mysql: bool,
+                                      db_uri: URL,
+                                      event_loop: AbstractEventLoop
+                                      ) -> None:
+    if is_mysql:
+        # notifications are supported only by Postgres
+        return
+
+    results_cache = ResultsCache()
+    async with get_connection(db_uri=db_uri,
+                              is_mysql=is_mysql,
+                              loop=event_loop) as connection:
+        await install_invalidation_triggers(tables_names=[table_name],
+                                            connection=connection)
+        try:
+            async with listen_invalidations(
+                    db_uri=db_uri,
+                    tables_names=[table_name],
+                    loop=event_loop) as listener:
+                results_cache.put('key', [],
+                                  table_name=table_name)
+                # written outside of data access functions,
+                # so cached results are invalidated only by notification
+                insert(records_dicts=records_to_dicts(records=table_records,
+                                                      table=table),
+                       table=table,
+                       db_uri=db_uri)
+                for _ in range(MAX_NOTIFICATION_WAITING_INTERVALS_COUNT):
+                    if listener.notifications_count:
+                        break
+                    await sleep(NOTIFICATION_WAITING_INTERVAL)
+        finally:
+            await uninstall_invalidation_triggers(tables_names=[table_name],
+                                                  connection=connection)
+
+    assert listener.notifications_count >= 1
+    assert results_cache.get('key') is None
+    assert results_cache.statistics.invalidations == 1
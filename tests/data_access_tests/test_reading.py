@@ -2,8 +2,11 @@ from asyncio import AbstractEventLoop
 from typing import List
 
 import pytest
+from asyncpg import Record
 from cetus.data_access import (get_connection,
                                fetch,
+                               fetch_pages,
+                               fetch_stream,
                                group_wise_fetch,
                                fetch_records_count,
                                group_wise_fetch_records_count,
@@ -118,6 +121,161 @@ async def test_fetch(
                         connection=connection)
 
 
+@pytest.mark.asyncio
+async def test_fetch_native(
+        table: Table,
+        table_name: str,
+        table_columns_names: List[str],
+        table_records: List[RecordType],
+        is_mysql: bool,
+        db_uri: URL,
+        event_loop: AbstractEventLoop) -> None:
+    table_records_dicts = records_to_dicts(
+        records=table_records,
+        table=table)
+    insert(records_dicts=table_records_dicts,
+           table=table,
+           db_uri=db_uri)
+
+    async with get_connection(db_uri=db_uri,
+                              is_mysql=is_mysql,
+                              loop=event_loop) as connection:
+        records = await fetch(table_name=table_name,
+                              columns_names=table_columns_names,
+                              native=True,
+                              is_mysql=is_mysql,
+                              connection=connection)
+
+    assert all(table_record in map(tuple, records)
+               for table_record in table_records)
+
+    if is_mysql:
+        with pytest.raises(ValueError):
+            async with get_connection(db_uri=db_uri,
+                                      is_mysql=is_mysql,
+                                      loop=event_loop) as connection:
+                await fetch(table_name=table_name,
+                            columns_names=table_columns_names,
+                            record_class=Record,
+                            is_mysql=is_mysql,
+                            connection=connection)
+        return
+
+    class TableRecord(Record):
+        pass
+
+    async with get_connection(db_uri=db_uri,
+                              is_mysql=is_mysql,
+                              loop=event_loop) as connection:
+        records = await fetch(table_name=table_name,
+                              columns_names=table_columns_names,
+                              record_class=TableRecord,
+                              is_mysql=is_mysql,
+                              connection=connection)
+
+    assert all(isinstance(record, TableRecord)
+               for record in records)
+
+
+@pytest.mark.asyncio
+async def test_fetch_pages(
+        table: Table,
+        table_name: str,
+        table_columns_names: List[str],
+        table_primary_key: str,
+        table_records: List[RecordType],
+        is_mysql: bool,
+        db_uri: URL,
+        event_loop: AbstractEventLoop) -> None:
+    table_records_dicts = records_to_dicts(
+        records=table_records,
+        table=table)
+    insert(records_dicts=table_records_dicts,
+           table=table,
+           db_uri=db_uri)
+    page_size = strategies.integers(min_value=1,
+                                    max_value=len(table_records)).example()
+
+    async with get_connection(db_uri=db_uri,
+                              is_mysql=is_mysql,
+                              loop=event_loop) as connection:
+        pages = [page
+                 async for page in fetch_pages(
+                     table_name=table_name,
+                     columns_names=table_columns_names,
+                     orderings=[(table_primary_key, 'ASC')],
+                     page_size=page_size,
+                     is_mysql=is_mysql,
+                     connection=connection)]
+
+    records = [record
+               for page in pages
+               for record in page]
+    assert all(0 < len(page) <= page_size
+               for page in pages)
+    assert len(records) == len(table_records)
+    assert all(table_record in records
+               for table_record in table_records)
+
+    with pytest.raises(ValueError):
+        async with get_connection(db_uri=db_uri,
+                                  is_mysql=is_mysql,
+                                  loop=event_loop) as connection:
+            async for _ in fetch_pages(table_name=table_name,
+                                       columns_names=table_columns_names,
+                                       orderings=[],
+                                       is_mysql=is_mysql,
+                                       connection=connection):
+                pass
+
+
+@pytest.mark.asyncio
+async def test_fetch_stream(
+        table: Table,
+        table_name: str,
+        table_columns_names: List[str],
+        table_records: List[RecordType],
+        is_mysql: bool,
+        db_uri: URL,
+        event_loop: AbstractEventLoop) -> None:
+    table_records_dicts = records_to_dicts(
+        records=table_records,
+        table=table)
+    insert(records_dicts=table_records_dicts,
+           table=table,
+           db_uri=db_uri)
+    prefetch = strategies.integers(min_value=1,
+                                   max_value=len(table_records)).example()
+
+    async with get_connection(db_uri=db_uri,
+                              is_mysql=is_mysql,
+                              loop=event_loop) as connection:
+        records = [record
+                   async for record in fetch_stream(
+                       table_name=table_name,
+                       columns_names=table_columns_names,
+                       prefetch=prefetch,
+                       is_mysql=is_mysql,
+                       connection=connection)]
+        records_chunks = [records_chunk
+                          async for records_chunk in fetch_stream(
+                              table_name=table_name,
+                              columns_names=table_columns_names,
+                              prefetch=prefetch,
+                              chunked=True,
+                              is_mysql=is_mysql,
+                              connection=connection)]
+
+    assert len(records) == len(table_records)
+    assert all(table_record in records
+               for table_record in table_records)
+    assert all(0 < len(records_chunk) <= prefetch
+               for records_chunk in records_chunks)
+    assert [record
+            for records_chunk in records_chunks
+            for record in records_chunk] == records
+
+
 @pytest.fixture(scope='function')
 def is_group_wise_maximum():
     return strategies.booleans().example()
@@ -0,0 +1,70 @@
+from asyncio import AbstractEventLoop
+from functools import partial
+from typing import List
+
+import pytest
+from cetus.data_access import (get_routing_connection_pool,
+                               fetch_records_count,
+                               insert)
+from cetus.types import RecordType
+from sqlalchemy import Table
+from sqlalchemy.engine.url import URL
+
+
+@pytest.mark.asyncio
+async def test_routing_connection_pool(
+        table: Table,
+        table_name: str,
+        table_columns_names: List[str],
+        table_records: List[RecordType],
+        is_mysql: bool,
+        db_uri: URL,
+        event_loop: AbstractEventLoop) -> None:
+    # the same database is used as a replica without lag
+    async with get_routing_connection_pool(
+            primary_db_uri=db_uri,
+            replicas_db_uris=[db_uri],
+            is_mysql=is_mysql,
+            min_size=1,
+            max_size=2,
+            loop=event_loop) as connection_pool:
+        await connection_pool.run(partial(insert,
+                                          table_name=table_name,
+                                          columns_names=table_columns_names,
+                                          records=table_records,
+                                          is_mysql=is_mysql))
+        records_count = await connection_pool.run(
+            partial(fetch_records_count,
+                    table_name=table_name,
+                    is_mysql=is_mysql))
+        replica, = connection_pool.replicas
+
+    assert records_count == len(table_records)
+    assert replica.lag == 0
+    assert replica.outstanding_requests_count == 0
+
+
+@pytest.mark.asyncio
+async def test_hedging_connection_pools(is_mysql: bool,
+                                        db_uri: URL,
+                                        event_loop: AbstractEventLoop
+                                        ) -> None:
+    async with get_routing_connection_pool(
+            primary_db_uri=db_uri,
+            replicas_db_uris=[db_uri, db_uri],
+            is_mysql=is_mysql,
+            min_size=1,
+            max_size=2,
+            loop=event_loop) as connection_pool:
+        hedging_connection_pools = (
+            connection_pool.get_hedging_connection_pools())
+        for replica in connection_pool.replicas:
+            replica.lag = float('inf')
+        stale_hedging_connection_pools = (
+            connection_pool.get_hedging_connection_pools())
+
+    # original call and hedge go to different replicas
+    assert (sorted(map(id, hedging_connection_pools))
+            == sorted(map(id, connection_pool.replicas)))
+    assert (stale_hedging_connection_pools
+            == [connection_pool.primary_connection_pool])
@@ -6,9 +6,12 @@ from cetus.data_access import (get_connection,
                                insert,
                                insert_returning)
 from cetus.types import RecordType
+from hypothesis import strategies
 from sqlalchemy import Table
 from sqlalchemy.engine.url import URL
-from tests.utils import fetch
+from tests.utils import (insert as insert_records_dicts,
+                         fetch,
+                         records_to_dicts)
 
 
 @pytest.mark.asyncio
@@ -36,6 +39,212 @@ async def test_insert(table: Table,
                for table_record in table_records)
 
 
+@pytest.fixture(scope='function')
+def batch_size(table_records: List[RecordType]) -> int:
+    return strategies.integers(min_value=1,
+                               max_value=len(table_records)).example()
+
+
+@pytest.mark.asyncio
+async def test_insert_batches(table: Table,
+                              table_name: str,
+                              table_columns_names: List[str],
+                              table_records: List[RecordType],
+                              batch_size: int,
+                              is_mysql: bool,
+                              db_uri: URL,
+                              event_loop: AbstractEventLoop
+                              ) -> None:
+    async with get_connection(db_uri=db_uri,
+                              is_mysql=is_mysql,
+                              loop=event_loop) as connection:
+        await insert(table_name=table_name,
+                     columns_names=table_columns_names,
+                     records=table_records,
+                     batch_size=batch_size,
+                     is_mysql=is_mysql,
+                     connection=connection)
+
+    records = fetch(table=table,
+                    db_uri=db_uri)
+
+    assert len(records) == len(table_records)
+    assert all(table_record in records
+               for table_record in table_records)
+
+
+@pytest.mark.asyncio
+async def test_insert_batches_duplicates(table: Table,
+                                         table_name: str,
+                                         table_columns_names: List[str],
+                                         table_primary_key: str,
+                                         table_records: List[RecordType],
+                                         is_mysql: bool,
+                                         db_uri: URL,
+                                         event_loop: AbstractEventLoop
+                                         ) -> None:
+    if len(table_records) < 2:
+        return
+    primary_key_index = table_columns_names.index(table_primary_key)
+    first_record, second_record, *_ = table_records
+    # the same primary key as of the first record
+    duplicate_record = (second_record[:primary_key_index]
+                        + (first_record[primary_key_index],)
+                        + second_record[primary_key_index + 1:])
+
+    async with get_connection(db_uri=db_uri,
+                              is_mysql=is_mysql,
+                              loop=event_loop) as connection:
+        await insert(table_name=table_name,
+                     columns_names=table_columns_names,
+                     unique_columns_names=[table_primary_key],
+                     records=[first_record, duplicate_record],
+                     merge=True,
+                     batch_size=2,
+                     is_mysql=is_mysql,
+                     connection=connection)
+
+    records = fetch(table=table,
+                    db_uri=db_uri)
+
+    assert len(records) == 1
+    # in PostgreSQL the last record wins
+    if not is_mysql:
+        assert duplicate_record in records
+
+
+@pytest.mark.asyncio
+async def test_insert_copy(table: Table,
+                           table_name: str,
+                           table_columns_names: List[str],
+                           table_records: List[RecordType],
+                           is_mysql: bool,
+                           db_uri: URL,
+                           event_loop: AbstractEventLoop
+                           ) -> None:
+    if is_mysql:
+        with pytest.raises(ValueError):
+            async with get_connection(db_uri=db_uri,
+                                      is_mysql=is_mysql,
+                                      loop=event_loop) as connection:
+                await insert(table_name=table_name,
+                             columns_names=table_columns_names,
+                             records=table_records,
+                             use_copy=True,
+                             is_mysql=is_mysql,
+                             connection=connection)
+        return
+
+    async with get_connection(db_uri=db_uri,
+                              is_mysql=is_mysql,
+                              loop=event_loop) as connection:
+        with pytest.raises(ValueError):
+            await insert(table_name=table_name,
+                         columns_names=table_columns_names,
+                         unique_columns_names=table_columns_names[:1],
+                         records=table_records,
+                         use_copy=True,
+                         is_mysql=is_mysql,
+                         connection=connection)
+        await insert(table_name=table_name,
+                     columns_names=table_columns_names,
+                     records=iter(table_records),
+                     use_copy=True,
+                     is_mysql=is_mysql,
+                     connection=connection)
+
+    records = fetch(table=table,
+                    db_uri=db_uri)
+
+    assert len(records) == len(table_records)
+    assert all(table_record in records
+               for table_record in table_records)
+
+
+@pytest.mark.asyncio
+async def test_insert_staged(table: Table,
+                             table_name: str,
+                             table_columns_names: List[str],
+                             table_primary_key: str,
+                             table_records: List[RecordType],
+                             is_mysql: bool,
+                             db_uri: URL,
+                             event_loop: AbstractEventLoop
+                             ) -> None:
+    existing_records = table_records[:len(table_records) // 2]
+    insert_records_dicts(records_dicts=records_to_dicts(
+        records=existing_records,
+        table=table),
+        table=table,
+        db_uri=db_uri)
+
+    async with get_connection(db_uri=db_uri,
+                              is_mysql=is_mysql,
+                              loop=event_loop) as connection:
+        with pytest.raises(ValueError):
+            await insert(table_name=table_name,
+                         columns_names=table_columns_names,
+                         records=table_records,
+                         staged=True,
+                         is_mysql=is_mysql,
+                         connection=connection)
+        await insert(table_name=table_name,
+                     columns_names=table_columns_names,
+                     unique_columns_names=[table_primary_key],
+                     records=table_records,
+                     merge=True,
+                     staged=True,
+                     is_mysql=is_mysql,
+                     connection=connection)
+
+    records = fetch(table=table,
+                    db_uri=db_uri)
+
+    assert len(records) == len(table_records)
+    assert all(table_record in records
+               for table_record in table_records)
+
+
+@pytest.mark.asyncio
+async def test_insert_staged_duplicates(table: Table,
+                                        table_name: str,
+                                        table_columns_names: List[str],
+                                        table_primary_key: str,
+                                        table_records: List[RecordType],
+                                        is_mysql: bool,
+                                        db_uri: URL,
+                                        event_loop: AbstractEventLoop
+                                        ) -> None:
+    if len(table_records) < 2:
+        return
+    primary_key_index = table_columns_names.index(table_primary_key)
+    first_record, second_record, *_ = table_records
+    # the same primary key as of the first record
+    duplicate_record = (second_record[:primary_key_index]
+                        + (first_record[primary_key_index],)
+                        + second_record[primary_key_index + 1:])
+
+    async with get_connection(db_uri=db_uri,
+                              is_mysql=is_mysql,
+                              loop=event_loop) as connection:
+        await insert(table_name=table_name,
+                     columns_names=table_columns_names,
+                     unique_columns_names=[table_primary_key],
+                     records=[first_record, duplicate_record],
+                     merge=True,
+                     staged=True,
+                     is_mysql=is_mysql,
+                     connection=connection)
+
+    records = fetch(table=table,
+                    db_uri=db_uri)
+
+    assert len(records) == 1
+    # in PostgreSQL the last record wins
+    if not is_mysql:
+        assert duplicate_record in records
+
+
 @pytest.mark.asyncio
 async def test_insert_returning(table_name: str,
                                 table_columns_names: List[str],
@@ -59,3 +268,92 @@ async def test_insert_returning(table_name: str,
 
     assert all(table_record in records
                for table_record in table_records)
+    assert records == table_records
+
+
+@pytest.mark.asyncio
+async def test_insert_returning_generated(
+        table_name: str,
+        table_columns_names: List[str],
+        table_primary_key: str,
+        table_records: List[RecordType],
+        batch_size: int,
+        is_mysql: bool,
+        db_uri: URL,
+        event_loop: AbstractEventLoop) -> None:
+    primary_key_index = table_columns_names.index(table_primary_key)
+    columns_names = [column_name
+                     for column_name in table_columns_names
+                     if column_name != table_primary_key]
+    records_without_primary_keys = [
+        record[:primary_key_index] + record[primary_key_index + 1:]
+        for record in table_records]
+    if not columns_names:
+        return
+
+    async with get_connection(db_uri=db_uri,
+                              is_mysql=is_mysql,
+                              loop=event_loop) as connection:
+        records = await insert_returning(
+            table_name=table_name,
+            columns_names=columns_names,
+            returning_columns_names=columns_names,
+            primary_key=table_primary_key,
+            records=records_without_primary_keys,
+            batch_size=batch_size,
+            connection=connection,
+            is_mysql=is_mysql)
+
+    assert records == records_without_primary_keys
+
+
+@pytest.mark.asyncio
+async def test_insert_returning_duplicates(
+        table: Table,
+        table_name: str,
+        table_columns_names: List[str],
+        table_primary_key: str,
+        table_records: List[RecordType],
+        is_mysql: bool,
+        db_uri: URL,
+        event_loop: AbstractEventLoop) -> None:
+    if is_mysql or len(table_records) < 3:
+        return
+    primary_key_index = table_columns_names.index(table_primary_key)
+    first_record, second_record, third_record, *_ = table_records
+    # the same primary key as of the first record
+    duplicate_record = (second_record[:primary_key_index]
+                        + (first_record[primary_key_index],)
+                        + second_record[primary_key_index + 1:])
+    insert_records_dicts(records_dicts=records_to_dicts(
+        records=[first_record],
+        table=table),
+        table=table,
+        db_uri=db_uri)
+
+    async with get_connection(db_uri=db_uri,
+                              is_mysql=is_mysql,
+                              loop=event_loop) as connection:
+        merged_records = await insert_returning(
+            table_name=table_name,
+            columns_names=table_columns_names,
+            unique_columns_names=[table_primary_key],
+            returning_columns_names=table_columns_names,
+            records=[first_record, duplicate_record],
+            merge=True,
+            batch_size=2,
+            connection=connection,
+            is_mysql=is_mysql)
+        skipped_records = await insert_returning(
+            table_name=table_name,
+            columns_names=table_columns_names,
+            unique_columns_names=[table_primary_key],
+            returning_columns_names=table_columns_names,
+            records=[first_record, third_record],
+            batch_size=2,
+            connection=connection,
+            is_mysql=is_mysql)
+
+    assert merged_records == [first_record, duplicate_record]
+    # existing row is not affected by `ON CONFLICT DO NOTHING`
+    assert skipped_records == [None, third_record]
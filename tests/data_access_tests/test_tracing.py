@@ -0,0 +1,59 @@
+from asyncio import AbstractEventLoop
+from typing import List
+
+import pytest
+from cetus.data_access import (acquire_connection,
+                               get_connection_pool,
+                               fetch)
+from cetus.tracing import (InMemoryTracer,
+                           Tracer,
+                           set_tracer)
+from cetus.types import RecordType
+from sqlalchemy import Table
+from sqlalchemy.engine.url import URL
+from tests.utils import (insert,
+                         records_to_dicts)
+
+
+@pytest.mark.asyncio
+async def test_tracing(
+        table: Table,
+        table_name: str,
+        table_columns_names: List[str],
+        table_records: List[RecordType],
+        is_mysql: bool,
+        db_uri: URL,
+        event_loop: AbstractEventLoop) -> None:
+    table_records_dicts = records_to_dicts(
+        records=table_records,
+        table=table)
+    insert(records_dicts=table_records_dicts,
+           table=table,
+           db_uri=db_uri)
+    tracer = InMemoryTracer()
+    set_tracer(tracer)
+
+    try:
+        async with get_connection_pool(db_uri=db_uri,
+                                       is_mysql=is_mysql,
+                                       min_size=1,
+                                       max_size=1,
+                                       loop=event_loop) as connection_pool:
+            async with acquire_connection(connection_pool) as connection:
+                records = await fetch(table_name=table_name,
+                                      columns_names=table_columns_names,
+                                      is_mysql=is_mysql,
+                                      connection=connection)
+    finally:
+        set_tracer(Tracer())
+
+    pool_creation_span, = tracer.get_spans('connection_pool.create')
+    acquisition_span, = tracer.get_spans('connection_pool.acquire')
+    query_building_span, = tracer.get_spans('query.build')
+    round_trip_span, = tracer.get_spans('query.round_trip')
+    decoding_span, = tracer.get_spans('rows.decode')
+    assert all(span.duration >= 0
+               for span in tracer.spans)
+    assert query_building_span.attributes['table'] == table_name
+    assert round_trip_span.attributes['query']
+    assert decoding_span.attributes['rows'] == len(records)
@@ -4,12 +4,17 @@ from typing import List
 
 import pytest
 from cetus.data_access import (get_connection,
+                               get_connection_pool,
+                               get_postgres_snapshot_connection_pool,
                                begin_transaction,
+                               fetch_records_count,
                                insert)
 from cetus.types import RecordType
 from sqlalchemy.engine.url import URL
 from sqlalchemy.schema import Table
-from tests.utils import fetch
+from tests.utils import (fetch,
+                         records_to_dicts)
+from tests.utils import insert as insert_synchronously
 
 
 @pytest.mark.asyncio
@@ -38,3 +43,38 @@ async def test_transactions(table: Table,
         records = fetch(table=table,
                         db_uri=db_uri)
         assert not records
+
+
+@pytest.mark.asyncio
+async def test_snapshot_transactions(table: Table,
+                                     table_name: str,
+                                     table_records: List[RecordType],
+                                     is_mysql: bool,
+                                     db_uri: URL,
+                                     event_loop: AbstractEventLoop
+                                     ) -> None:
+    if is_mysql:
+        # exporting snapshots is supported only by Postgres
+        return
+
+    async with get_connection_pool(db_uri=db_uri,
+                                   is_mysql=is_mysql,
+                                   min_size=1,
+                                   max_size=3,
+                                   loop=event_loop) as connection_pool:
+        async with get_postgres_snapshot_connection_pool(
+                connection_pool) as snapshot_connection_pool:
+            table_records_dicts = records_to_dicts(
+                records=table_records,
+                table=table)
+            insert_synchronously(records_dicts=table_records_dicts,
+                                 table=table,
+                                 db_uri=db_uri)
+
+            async with snapshot_connection_pool.acquire() as connection:
+                records_count = await fetch_records_count(
+                    table_name=table_name,
+                    is_mysql=is_mysql,
+                    connection=connection)
+
+    assert records_count == 0
@@ -4,7 +4,8 @@ from typing import List
 
 import pytest
 from cetus.data_access import (get_connection,
-                               update)
+                               update,
+                               update_many)
 from cetus.types import (RecordType,
                          UpdatesType)
 from sqlalchemy.engine.url import URL
@@ -61,3 +62,75 @@ async def test_update(table: Table,
     assert all(is_sub_dictionary(sub_dictionary=table_records_updates,
                                  super_dictionary=record_dict)
                for record_dict in records_dicts)
+
+
+@pytest.fixture(scope='function')
+def table_records_many_updates(table: Table,
+                               table_primary_key: str,
+                               table_unique_columns: List[str],
+                               table_records: List[RecordType]
+                               ) -> List[UpdatesType]:
+    records_dicts = records_to_dicts(records=table_records,
+                                     table=table)
+    res = []
+    for record_dict in records_dicts:
+        record_updates = OrderedDict()
+        record_updates[table_primary_key] = record_dict[table_primary_key]
+        for key, value in record_dict.items():
+            if key in table_unique_columns:
+                continue
+            value_strategy = values_strategies_by_python_types[type(value)]
+            record_updates[key] = value_strategy.example()
+        res.append(record_updates)
+    return res
+
+
+@pytest.mark.asyncio
+async def test_update_many(table: Table,
+                           table_name: str,
+                           table_primary_key: str,
+                           table_records_many_updates: List[UpdatesType],
+                           table_records: List[RecordType],
+                           is_mysql: bool,
+                           db_uri: URL,
+                           event_loop: AbstractEventLoop
+                           ) -> None:
+    table_records_dicts = records_to_dicts(records=table_records,
+                                           table=table)
+    insert(records_dicts=table_records_dicts,
+           table=table,
+           db_uri=db_uri)
+    columns_names = list(table_records_many_updates[0].keys())
+    if len(columns_names) == 1:
+        return
+
+    async with get_connection(db_uri=db_uri,
+                              is_mysql=is_mysql,
+                              loop=event_loop) as connection:
+        await update_many(table_name=table_name,
+                          key_columns_names=columns_names[:1],
+                          update_columns_names=columns_names[1:],
+                          records=[tuple(record_updates.values())
+                                   for record_updates
+                                   in table_records_many_updates],
+                          is_mysql=is_mysql,
+                          connection=connection)
+        # columns types are checked only for PostgreSQL
+        if not is_mysql:
+            with pytest.raises(ValueError):
+                await update_many(
+                    table_name=table_name,
+                    key_columns_names=columns_names[:1],
+                    update_columns_names=[columns_names[1] + '_unknown'],
+                    records=[],
+                    is_mysql=is_mysql,
+                    connection=connection)
+
+    records = fetch(table=table,
+                    db_uri=db_uri)
+    records_dicts = records_to_dicts(records=records,
+                                     table=table)
+    assert all(any(is_sub_dictionary(sub_dictionary=record_updates,
+                                     super_dictionary=record_dict)
+                   for record_dict in records_dicts)
+               for record_updates in table_records_many_updates)
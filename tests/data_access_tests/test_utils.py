@@ -4,7 +4,10 @@ from hypothesis.searchstrategy import SearchStrategy
 from sqlalchemy.engine.url import URL
 
 from cetus.data_access import is_db_uri_mysql
-from cetus.data_access.utils import MYSQL_DRIVER_NAME_PREFIX
+from cetus.data_access.utils import (MYSQL_DRIVER_NAME_PREFIX,
+                                      are_plain_columns_names,
+                                      estimate_record_size,
+                                      split_records)
 
 
 def extend_mysql_db_uri_like_strings_strategy(
@@ -41,3 +44,24 @@ def test_is_db_uri_mysql(mysql_empty_db_uri: URL,
     assert mysql_empty_db_uri_is_mysql
     non_mysql_empty_db_uri_is_mysql = is_db_uri_mysql(non_mysql_empty_db_uri)
     assert not non_mysql_empty_db_uri_is_mysql
+
+
+def test_are_plain_columns_names() -> None:
+    assert are_plain_columns_names(['id', 'table.name', '*'])
+    assert not are_plain_columns_names(['id', 'COUNT(*) AS count_1'])
+    assert not are_plain_columns_names(['DISTINCT name'])
+
+
+def test_split_records() -> None:
+    records = [(index,) for index in range(5)]
+
+    assert list(split_records(records,
+                              batch_size=2)) == [records[:2],
+                                                 records[2:4],
+                                                 records[4:]]
+    with pytest.raises(ValueError):
+        list(split_records(records,
+                           batch_size=0))
+
+    # multi-byte characters are estimated in bytes
+    assert estimate_record_size(('\u00e9',)) > estimate_record_size(('e',))
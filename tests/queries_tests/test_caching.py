@@ -0,0 +1,89 @@
+from typing import List
+
+import pytest
+from hypothesis import strategies
+
+from cetus.queries import (QueriesCache,
+                           generate_select_query,
+                           generate_select_query_args,
+                           start_query_build_span)
+from cetus.tracing import (InMemoryTracer,
+                           Tracer,
+                           set_tracer)
+from cetus.types import FiltersType
+from tests.strategies import filters_strategy
+from tests.strategies.utils import identifiers_strategy
+
+queries_keys_strategy = strategies.lists(identifiers_strategy,
+                                         min_size=2,
+                                         unique=True)
+
+
+@pytest.fixture(scope='function')
+def queries_keys() -> List[str]:
+    return queries_keys_strategy.example()
+
+
+def test_queries_cache(queries_keys: List[str]) -> None:
+    max_size = len(queries_keys) - 1
+    queries_cache = QueriesCache(max_size=max_size)
+
+    for key in queries_keys:
+        query = queries_cache.get_or_generate(key, key.upper)
+        assert query == key.upper()
+
+    statistics = queries_cache.statistics
+    assert statistics.hits == 0
+    assert statistics.misses == len(queries_keys)
+    assert statistics.evictions == 1
+    assert statistics.size == max_size
+
+    last_key = queries_keys[-1]
+    assert queries_cache.get(last_key) == last_key.upper()
+    assert queries_cache.statistics.hits == 1
+
+    first_key = queries_keys[0]
+    assert queries_cache.get(first_key) is None
+
+
+@pytest.fixture(scope='function')
+def filters() -> FiltersType:
+    return filters_strategy.example()
+
+
+@pytest.fixture(scope='function')
+def is_mysql() -> bool:
+    return strategies.booleans().example()
+
+
+def test_select_query_args(filters: FiltersType,
+                           is_mysql: bool) -> None:
+    query, args = generate_select_query(table_name='table',
+                                        columns_names=['column'],
+                                        filters=filters,
+                                        limit=10,
+                                        offset=20,
+                                        is_mysql=is_mysql,
+                                        parametrized=True)
+
+    assert args == generate_select_query_args(filters=filters,
+                                              limit=10,
+                                              offset=20,
+                                              is_mysql=is_mysql)
+
+
+def test_query_build_span() -> None:
+    tracer = InMemoryTracer()
+    set_tracer(tracer)
+
+    try:
+        with start_query_build_span('delete',
+                                    table_name='table'):
+            pass
+    finally:
+        set_tracer(Tracer())
+
+    span, = tracer.get_spans('query.build')
+    assert span.attributes['cached'] is False
+    assert span.attributes['query_name'] == 'delete'
+    assert span.attributes['table'] == 'table'
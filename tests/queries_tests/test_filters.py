@@ -8,8 +8,10 @@ from cetus.queries.filters import (LOGICAL_OPERATORS,
                                    PREDICATES,
                                    INCLUSION_OPERATORS,
                                    RANGE_OPERATORS,
+                                   IDENTITY_OPERATORS,
                                    predicate_to_str,
-                                   filters_to_str)
+                                   filters_to_str,
+                                   split_inclusion_filters)
 from cetus.queries.utils import normalize_value
 from cetus.types import (ColumnValueType,
                          FiltersType,
@@ -69,6 +71,38 @@ def test_predicate_to_str(predicate: Tuple[str, FilterType]
             assert normalized_sub_value in predicate_str
 
 
+@pytest.fixture(scope='function')
+def is_mysql() -> bool:
+    return strategies.booleans().example()
+
+
+def test_parametrized_predicate_to_str(predicate: Tuple[str, FilterType],
+                                       is_mysql: bool
+                                       ) -> None:
+    predicate_name, filter_ = predicate
+    column_name, value = filter_
+    args = []
+    predicate_str = predicate_to_str(
+        predicate_name=predicate_name,
+        filter_=filter_,
+        args=args,
+        is_mysql=is_mysql)
+
+    assert isinstance(predicate_str, str)
+    assert predicate_str.startswith(column_name)
+    if predicate_name in INCLUSION_OPERATORS and not is_mysql:
+        assert args == [list(value)]
+    elif predicate_name in INCLUSION_OPERATORS | RANGE_OPERATORS:
+        assert args == list(value)
+    elif predicate_name in IDENTITY_OPERATORS:
+        assert not args
+    else:
+        assert args == [value]
+    label = '%s' if is_mysql else f'${len(args)}'
+    if args:
+        assert label in predicate_str
+
+
 @pytest.fixture(scope='function')
 def filters() -> FiltersType:
     return filters_strategy.example()
@@ -95,3 +129,42 @@ def test_filters_to_str(filters: FiltersType,
 
     with pytest.raises(ValueError):
         filters_to_str(invalid_filters)
+
+
+def test_parametrized_filters_to_str(filters: FiltersType,
+                                     is_mysql: bool
+                                     ) -> None:
+    args = []
+    filters_str = filters_to_str(filters,
+                                 args=args,
+                                 is_mysql=is_mysql)
+    other_args = []
+    other_filters_str = filters_to_str(filters,
+                                       args=other_args,
+                                       is_mysql=is_mysql)
+
+    assert isinstance(filters_str, str)
+    assert filters_str == other_filters_str
+    assert args == other_args
+
+
+def test_split_inclusion_filters() -> None:
+    values = list(range(10))
+    filters = ('AND', [('=', ('a', 1)),
+                       ('IN', ('b', values + values))])
+
+    filters_chunks = split_inclusion_filters(filters,
+                                             max_values_count=3)
+
+    assert len(filters_chunks) == 4
+    assert split_inclusion_filters(filters,
+                                   max_values_count=10) == [filters]
+    chunks_values = []
+    for operator, (equality_filter, inclusion_filter) in filters_chunks:
+        assert operator == 'AND'
+        assert equality_filter == ('=', ('a', 1))
+        inclusion_operator, (column_name, chunk_values) = inclusion_filter
+        assert inclusion_operator == 'IN'
+        assert column_name == 'b'
+        chunks_values += chunk_values
+    assert chunks_values == values